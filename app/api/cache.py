@@ -0,0 +1,115 @@
+"""
+API routes and middleware for the response cache.
+"""
+import json
+import re
+from urllib.parse import parse_qsl, urlencode
+from fastapi import APIRouter
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.api.dependencies import is_not_modified, parse_include
+from app.schemas.cache import CacheStats
+from app.services.response_cache import CACHED_TABLES, ResponseCache, response_cache
+
+
+router = APIRouter()
+
+# Catalog lists, single resources and batch gets, e.g. /api/v1/films/, /api/v1/films/1 and /api/v1/films/batch
+CACHED_PATH = re.compile(r"^/api/v1/(characters|films|starships)/(\d+|batch)?$")
+
+# Response headers stored with cached bodies
+CACHED_HEADERS = (b"content-type", b"etag", b"last-modified")
+
+class ResponseCacheMiddleware:
+    """
+    Serve GET requests of the catalog endpoints from the response cache.
+
+    Hits are answered before routing, so they open no database session. The
+    key holds the path, the sorted query string and the data versions of the
+    resource and the relationships in `include`; the versions are read before
+    the request runs, so a response that raced a write is stored under the
+    versions it may predate and is never served after the bump. If the shared
+    tier cannot return the versions in time, the request bypasses the cache.
+
+    Cached responses keep their `ETag` and `Last-Modified`, and hits honor
+    conditional requests with 304 Not Modified.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        match = CACHED_PATH.match(scope["path"]) if scope["type"] == "http" and scope["method"] == "GET" else None
+        if match is None or not self.cache.enabled:
+            await self.app(scope, receive, send)
+            return
+        query = parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+        include = dict(query).get("include")
+        relations = CACHED_TABLES if include is None else parse_include(include)
+        # Unknown names are rejected by the route; keying on every table keeps such keys safe regardless
+        tables = {match[1], *relations} if set(relations) <= set(CACHED_TABLES) else set(CACHED_TABLES)
+        key = await self.cache.key(f"{scope['path']}?{urlencode(sorted(query))}", tables)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            headers, body = _unpack(cached)
+            if _not_modified(scope, headers):
+                status_code, body = 304, b""
+                headers = [(name, value) for name, value in headers if name != b"content-type"]
+            else:
+                status_code = 200
+                headers.append((b"content-length", str(len(body)).encode()))
+            await send({"type": "http.response.start", "status": status_code,
+                        "headers": [*headers, (b"x-cache", b"HIT")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        status_code = None
+        headers = []
+        chunks = []
+
+        async def send_and_store(message: Message) -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [(name, value) for name, value in message.get("headers", []) if name in CACHED_HEADERS]
+                message["headers"] = [*message.get("headers", []), (b"x-cache", b"MISS")]
+            elif message["type"] == "http.response.body" and status_code == 200:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self.cache.put(key, _pack(headers, b"".join(chunks)))
+            await send(message)
+
+        await self.app(scope, receive, send_and_store)
+
+def _pack(headers: list[tuple[bytes, bytes]], body: bytes) -> bytes:
+    return json.dumps([[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers]).encode() + b"\n" + body
+
+def _unpack(value: bytes) -> tuple[list[tuple[bytes, bytes]], bytes]:
+    headers, body = value.split(b"\n", 1)
+    return [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(headers)], body
+
+def _not_modified(scope: Scope, headers: list[tuple[bytes, bytes]]) -> bool:
+    request = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+    response = {name.decode("latin-1"): value.decode("latin-1") for name, value in headers}
+    return is_not_modified(request.get("if-none-match"), request.get("if-modified-since"),
+                           response.get("etag"), response.get("last-modified"))
+
+@router.get(
+    "/",
+    response_model=CacheStats,
+    summary="Get the response cache statistics",
+    description="Report the hits and misses of the response cache in the serving worker, and the current data versions that key cached responses."
+)
+async def api_cache_stats() -> CacheStats:
+    return CacheStats(
+        enabled=response_cache.enabled,
+        shared=response_cache.shared is not None,
+        ttl_seconds=response_cache.ttl,
+        entries=len(response_cache.local),
+        versions=await response_cache.versions() or {},
+        **response_cache.stats,
+    )
@@ -2,40 +2,81 @@
 API routes for managing Star Wars characters.
 """
 from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.orm import Session
-from app.db.deps import get_db
-from app.api.dependencies import enforce_json_content_type
-from app.schemas.character import PaginatedCharacters, CharacterRead, CharacterCreate
-from app.services.character_service import create_character, list_characters, get_character
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.deps import get_db, get_write_db
+from app.api.dependencies import batch_ids, conditional_get, enforce_json_content_type, get_suggest_index, include_relations
+from app.schemas.character import PaginatedCharacters, CharacterRead, CharacterCreate, BatchCharacters
+from app.services.suggest_service import SuggestIndex
+from app.services.character_service import CHARACTER_RELATIONS, create_character, list_characters, get_character, batch_get_characters
 
 
 router = APIRouter()
 
+# Shared by the routes and their conditional GET dependency, so `include` is parsed once
+include_characters = include_relations(*CHARACTER_RELATIONS)
+
 @router.get(
     "/",
     response_model=PaginatedCharacters,
+    responses={
+        304: {"description": "Not modified since the ETag or date in the conditional headers"},
+    },
+    dependencies=[Depends(conditional_get("characters", include_characters))],
     summary="List all characters",
-    description="Retrieve a paginated list of all characters in the database. Supports optional pagination with `skip` and `limit`, and `name` search."
+    description="Retrieve a paginated list of all characters in the database. Supports optional pagination with `skip` and `limit` or `cursor`, `name` search, height and mass ranges, and sorting. Relationships are limited to those named in `include`, and `count` selects how `total` is computed."
 )
-def api_list_characters(
+async def api_list_characters(
         skip: int = Query(0, ge=0, description="Number of records to skip"),
         limit: int = Query(10, le=100, description="Maximum number of records to return"),
         name: str = Query(None, description="Search by name"),
-        db: Session = Depends(get_db)
+        min_height: float = Query(None, description="Minimum height in centimeters"),
+        max_height: float = Query(None, description="Maximum height in centimeters"),
+        min_mass: float = Query(None, description="Minimum mass in kilograms"),
+        max_mass: float = Query(None, description="Maximum mass in kilograms"),
+        sort: str = Query(None, pattern="^-?(id|name|height|mass)$",
+                          description="Sort by id, name, height or mass; prefix with - for descending"),
+        cursor: str = Query(None, description="Cursor from `nextCursor` of the previous page; replaces `skip`"),
+        include: tuple[str, ...] = Depends(include_characters),
+        count: str = Query("exact", pattern="^(exact|estimated|none)$",
+                           description="Total to return: exact, estimated (possibly stale for searches) or none"),
+        db: AsyncSession = Depends(get_db)
 ) -> PaginatedCharacters:
-    return list_characters(db, skip, limit, name)
+    return await list_characters(db, skip, limit, name, min_height, max_height, min_mass, max_mass, sort, cursor, include, count)
+
+@router.get(
+    "/batch",
+    response_model=BatchCharacters,
+    responses={
+        304: {"description": "Not modified since the ETag or date in the conditional headers"},
+    },
+    dependencies=[Depends(conditional_get("characters", include_characters))],
+    summary="Get characters by IDs",
+    description="Retrieve up to 100 characters by their IDs in one request, with the relationships named in `include` (all by default) loaded in one batched query each. The response has one entry per distinct ID, in request order, holding the character as `item` or, for IDs without one, an `error`."
+)
+async def api_batch_get_characters(
+        ids: tuple[int, ...] = Depends(batch_ids),
+        include: tuple[str, ...] = Depends(include_characters),
+        db: AsyncSession = Depends(get_db)
+) -> BatchCharacters:
+    return await batch_get_characters(db, ids, include)
 
 @router.get(
     "/{character_id}",
     response_model=CharacterRead,
     responses={
+        304: {"description": "Not modified since the ETag or date in the conditional headers"},
         404: {"description": "Character not found"},
     },
+    dependencies=[Depends(conditional_get("characters", include_characters))],
     summary="Get a character by ID",
-    description="Retrieve a single character by their unique ID. Includes related films and starships if available."
+    description="Retrieve a single character by their unique ID. Includes related films and starships named in `include` (all by default)."
 )
-def api_get_character(character_id: int, db: Session = Depends(get_db)) -> CharacterRead:
-    return get_character(db, character_id)
+async def api_get_character(
+        character_id: int,
+        include: tuple[str, ...] = Depends(include_characters),
+        db: AsyncSession = Depends(get_db)
+) -> CharacterRead:
+    return await get_character(db, character_id, include)
 
 @router.post(
     "/",
@@ -45,6 +86,11 @@ def api_get_character(character_id: int, db: Session = Depends(get_db)) -> Chara
     summary="Create a new character",
     description="Create a new character with optional height, mass, associated films, and starships. Returns the created character object."
 )
-def api_create_character(character_in: CharacterCreate, db: Session = Depends(get_db)) -> CharacterRead:
-    character = create_character(db, character_in)
+async def api_create_character(
+        character_in: CharacterCreate,
+        db: AsyncSession = Depends(get_write_db),
+        index: SuggestIndex = Depends(get_suggest_index)
+) -> CharacterRead:
+    character = await create_character(db, character_in)
+    index.add("character", character.id, character.name)
     return character
@@ -1,8 +1,16 @@
 """
-Common API dependencies, such as content-type enforcement.
+Common API dependencies, such as content-type enforcement and conditional requests.
 """
-from fastapi import Header, HTTPException, status
-from typing import Optional
+import hashlib
+import re
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, Optional
+from app.db.counts import get_table_versions
+from app.db.deps import get_db
+from app.services.batch import MAX_BATCH_IDS, MAX_ID
+from app.services.suggest_service import SuggestIndex
 
 
 def enforce_json_content_type(content_type: Optional[str] = Header(None)):
@@ -17,3 +25,115 @@ def enforce_json_content_type(content_type: Optional[str] = Header(None)):
             status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
             detail="Content-Type must be application/json"
         )
+
+def parse_include(include: str) -> tuple[str, ...]:
+    """
+    Split a comma-separated `include` value into distinct, stripped names.
+    """
+    return tuple(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+
+def include_relations(*relations: str) -> Callable[..., tuple[str, ...]]:
+    """
+    Return a dependency that parses the comma-separated `include` query parameter
+    into the `relations` to load. All of them are loaded when it is absent, none
+    when it is empty.
+
+    Raises:
+        HTTPException: If `include` names an unknown relation.
+    """
+    def dependency(include: Optional[str] = Query(
+            None, description=f"Comma-separated relationships to include ({', '.join(relations)}); all by default"
+    )) -> tuple[str, ...]:
+        if include is None:
+            return relations
+        names = parse_include(include)
+        unknown = [name for name in names if name not in relations]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown include: {', '.join(unknown)}"
+            )
+        return names
+    return dependency
+
+def batch_ids(ids: str = Query(
+        ..., description=f"Comma-separated IDs to retrieve, at most {MAX_BATCH_IDS}", examples=["1,2,3"]
+)) -> tuple[int, ...]:
+    """
+    Dependency that parses the comma-separated `ids` query parameter of batch gets.
+
+    Raises:
+        HTTPException: If an ID is not an integer up to MAX_ID or there are more than MAX_BATCH_IDS.
+    """
+    names = [name.strip() for name in ids.split(",") if name.strip()]
+    # At most 19 ASCII digits: int() rejects some Unicode digits, such as "²", and very long numbers
+    invalid = [name for name in names if not re.fullmatch(r"\d{1,19}", name, re.ASCII) or int(name) > MAX_ID]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid ids: {', '.join(invalid)}"
+        )
+    if len(names) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_BATCH_IDS} ids can be retrieved at once"
+        )
+    return tuple(int(name) for name in names)
+
+def conditional_get(table: str, include: Callable[..., tuple[str, ...]]) -> Callable:
+    """
+    Return a dependency that makes a GET route of `table` conditional.
+
+    The `ETag` and `Last-Modified` of a response are derived from the URL and
+    the data versions of `table` and of the relations returned by `include`
+    (the same dependency as the route's), which every write to those tables
+    bumps. A request whose `If-None-Match` (or, without it, `If-Modified-Since`)
+    matches is answered with 304 Not Modified before the route queries anything else.
+
+    Raises:
+        HTTPException: 304 if the client's copy is current.
+    """
+    async def dependency(
+            request: Request,
+            response: Response,
+            relations: tuple[str, ...] = Depends(include),
+            db: AsyncSession = Depends(get_db)
+    ) -> None:
+        versions = await get_table_versions(db, (table, *relations))
+        if not versions:
+            return
+        url = f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+        state = ";".join(f"{name}:{version}" for name, (version, _) in sorted(versions.items()))
+        headers = {
+            "ETag": f'"{hashlib.sha1(f"{url}|{state}".encode()).hexdigest()}"',
+            "Last-Modified": format_datetime(max(modified for _, modified in versions.values()), usegmt=True),
+        }
+        if is_not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since"),
+                           headers["ETag"], headers["Last-Modified"]):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+    return dependency
+
+def is_not_modified(if_none_match: str | None, if_modified_since: str | None, etag: str | None,
+                    last_modified: str | None) -> bool:
+    """
+    Return whether a response with `etag` and `last_modified` is current for a
+    client that sent the given conditional headers. `If-Modified-Since` only
+    counts without `If-None-Match`.
+    """
+    if if_none_match is not None:
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+def get_suggest_index(request: Request) -> SuggestIndex:
+    """
+    Dependency that returns the suggestion index of the serving worker.
+    """
+    return request.app.state.suggest_index
@@ -2,40 +2,75 @@
 API routes for managing Star Wars films.
 """
 from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.orm import Session
-from app.db.deps import get_db
-from app.api.dependencies import enforce_json_content_type
-from app.schemas.film import PaginatedFilms, FilmRead, FilmCreate
-from app.services.film_service import list_films, get_film, create_film
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.deps import get_db, get_write_db
+from app.api.dependencies import batch_ids, conditional_get, enforce_json_content_type, get_suggest_index, include_relations
+from app.schemas.film import PaginatedFilms, FilmRead, FilmCreate, BatchFilms
+from app.services.suggest_service import SuggestIndex
+from app.services.film_service import FILM_RELATIONS, list_films, get_film, create_film, batch_get_films
 
 
 router = APIRouter()
 
+# Shared by the routes and their conditional GET dependency, so `include` is parsed once
+include_films = include_relations(*FILM_RELATIONS)
+
 @router.get(
     "/",
     response_model=PaginatedFilms,
+    responses={
+        304: {"description": "Not modified since the ETag or date in the conditional headers"},
+    },
+    dependencies=[Depends(conditional_get("films", include_films))],
     summary="List all films",
-    description="Retrieve a paginated list of all films in the database. Supports optional pagination with `skip` and `limit`, and `title` search."
+    description="Retrieve a paginated list of all films in the database. Supports optional pagination with `skip` and `limit` or `cursor`, and `title` search. Relationships are limited to those named in `include`, and `count` selects how `total` is computed."
 )
-def api_list_films(
+async def api_list_films(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, le=100),
         title: str = Query(None, description="Search by title"),
-        db: Session = Depends(get_db)
+        cursor: str = Query(None, description="Cursor from `nextCursor` of the previous page; replaces `skip`"),
+        include: tuple[str, ...] = Depends(include_films),
+        count: str = Query("exact", pattern="^(exact|estimated|none)$",
+                           description="Total to return: exact, estimated (possibly stale for searches) or none"),
+        db: AsyncSession = Depends(get_db)
 ) -> PaginatedFilms:
-    return list_films(db, skip, limit, title)
+    return await list_films(db, skip, limit, title, cursor, include, count)
+
+@router.get(
+    "/batch",
+    response_model=BatchFilms,
+    responses={
+        304: {"description": "Not modified since the ETag or date in the conditional headers"},
+    },
+    dependencies=[Depends(conditional_get("films", include_films))],
+    summary="Get films by IDs",
+    description="Retrieve up to 100 films by their IDs in one request, with the relationships named in `include` (all by default) loaded in one batched query each. The response has one entry per distinct ID, in request order, holding the film as `item` or, for IDs without one, an `error`."
+)
+async def api_batch_get_films(
+        ids: tuple[int, ...] = Depends(batch_ids),
+        include: tuple[str, ...] = Depends(include_films),
+        db: AsyncSession = Depends(get_db)
+) -> BatchFilms:
+    return await batch_get_films(db, ids, include)
 
 @router.get(
     "/{film_id}",
     response_model=FilmRead,
     responses={
+        304: {"description": "Not modified since the ETag or date in the conditional headers"},
         404: {"description": "Character not found"},
     },
+    dependencies=[Depends(conditional_get("films", include_films))],
     summary="Get a film by ID",
-    description="Retrieve a single film by their unique ID. Includes related characters and starships if available."
+    description="Retrieve a single film by their unique ID. Includes related characters and starships named in `include` (all by default)."
 )
-def api_get_films(film_id: int, db: Session = Depends(get_db)) -> FilmRead:
-    return get_film(db, film_id)
+async def api_get_films(
+        film_id: int,
+        include: tuple[str, ...] = Depends(include_films),
+        db: AsyncSession = Depends(get_db)
+) -> FilmRead:
+    return await get_film(db, film_id, include)
 
 
 @router.post(
@@ -46,6 +81,11 @@ def api_get_films(film_id: int, db: Session = Depends(get_db)) -> FilmRead:
     summary="Create a new film",
     description="Create a new film with optional opening, director, producer, release date, associated characters, and starships. Returns the created film object."
 )
-def api_create_film(film_in: FilmCreate, db: Session = Depends(get_db)):
-    film = create_film(db, film_in)
+async def api_create_film(
+        film_in: FilmCreate,
+        db: AsyncSession = Depends(get_write_db),
+        index: SuggestIndex = Depends(get_suggest_index)
+):
+    film = await create_film(db, film_in)
+    index.add("film", film.id, film.title)
     return film
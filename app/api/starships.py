@@ -2,40 +2,75 @@
 API routes for managing Star Wars starships.
 """
 from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.orm import Session
-from app.db.deps import get_db
-from app.api.dependencies import enforce_json_content_type
-from app.schemas.starship import PaginatedStarships, StarshipRead, StarshipCreate
-from app.services.starship_service import get_starship, list_starships, create_starship
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.deps import get_db, get_write_db
+from app.api.dependencies import batch_ids, conditional_get, enforce_json_content_type, get_suggest_index, include_relations
+from app.schemas.starship import PaginatedStarships, StarshipRead, StarshipCreate, BatchStarships
+from app.services.suggest_service import SuggestIndex
+from app.services.starship_service import STARSHIP_RELATIONS, get_starship, list_starships, create_starship, batch_get_starships
 
 
 router = APIRouter()
 
+# Shared by the routes and their conditional GET dependency, so `include` is parsed once
+include_starships = include_relations(*STARSHIP_RELATIONS)
+
 @router.get(
     "/",
     response_model=PaginatedStarships,
+    responses={
+        304: {"description": "Not modified since the ETag or date in the conditional headers"},
+    },
+    dependencies=[Depends(conditional_get("starships", include_starships))],
     summary="List all starships",
-    description="Retrieve a paginated list of all starships in the database. Supports optional pagination with `skip` and `limit`, and `name` search."
+    description="Retrieve a paginated list of all starships in the database. Supports optional pagination with `skip` and `limit` or `cursor`, and `name` search. Relationships are limited to those named in `include`, and `count` selects how `total` is computed."
 )
-def api_list_starships(
+async def api_list_starships(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, le=100),
         name: str = Query(None, description="Search by name"),
-        db: Session = Depends(get_db)
+        cursor: str = Query(None, description="Cursor from `nextCursor` of the previous page; replaces `skip`"),
+        include: tuple[str, ...] = Depends(include_starships),
+        count: str = Query("exact", pattern="^(exact|estimated|none)$",
+                           description="Total to return: exact, estimated (possibly stale for searches) or none"),
+        db: AsyncSession = Depends(get_db)
 ) -> PaginatedStarships:
-    return list_starships(db, skip, limit, name)
+    return await list_starships(db, skip, limit, name, cursor, include, count)
+
+@router.get(
+    "/batch",
+    response_model=BatchStarships,
+    responses={
+        304: {"description": "Not modified since the ETag or date in the conditional headers"},
+    },
+    dependencies=[Depends(conditional_get("starships", include_starships))],
+    summary="Get starships by IDs",
+    description="Retrieve up to 100 starships by their IDs in one request, with the relationships named in `include` (all by default) loaded in one batched query each. The response has one entry per distinct ID, in request order, holding the starship as `item` or, for IDs without one, an `error`."
+)
+async def api_batch_get_starships(
+        ids: tuple[int, ...] = Depends(batch_ids),
+        include: tuple[str, ...] = Depends(include_starships),
+        db: AsyncSession = Depends(get_db)
+) -> BatchStarships:
+    return await batch_get_starships(db, ids, include)
 
 @router.get(
     "/{starship_id}",
     response_model=StarshipRead,
     responses={
+        304: {"description": "Not modified since the ETag or date in the conditional headers"},
         404: {"description": "Character not found"},
     },
+    dependencies=[Depends(conditional_get("starships", include_starships))],
     summary="Get a starship by ID",
-    description="Retrieve a single starship by their unique ID. Includes related characters and films if available."
+    description="Retrieve a single starship by their unique ID. Includes related characters and films named in `include` (all by default)."
 )
-def api_get_starship(starship_id: int, db: Session = Depends(get_db)) -> StarshipRead:
-    return get_starship(db, starship_id)
+async def api_get_starship(
+        starship_id: int,
+        include: tuple[str, ...] = Depends(include_starships),
+        db: AsyncSession = Depends(get_db)
+) -> StarshipRead:
+    return await get_starship(db, starship_id, include)
 
 @router.post(
     "/",
@@ -45,6 +80,11 @@ def api_get_starship(starship_id: int, db: Session = Depends(get_db)) -> Starshi
     summary="Create a new starship",
     description="Create a new starship with optional model, starship class, associated characters, and films. Returns the created starship object."
 )
-def api_create_starship(starship_in: StarshipCreate, db: Session = Depends(get_db)) -> StarshipRead:
-    starship = create_starship(db, starship_in)
+async def api_create_starship(
+        starship_in: StarshipCreate,
+        db: AsyncSession = Depends(get_write_db),
+        index: SuggestIndex = Depends(get_suggest_index)
+) -> StarshipRead:
+    starship = await create_starship(db, starship_in)
+    index.add("starship", starship.id, starship.name)
     return starship
@@ -0,0 +1,23 @@
+"""
+API routes for typeahead suggestions.
+"""
+from fastapi import APIRouter, Depends, Query
+from app.api.dependencies import get_suggest_index
+from app.schemas.suggest import Suggestion
+from app.services.suggest_service import SuggestIndex
+
+
+router = APIRouter()
+
+@router.get(
+    "/",
+    response_model=list[Suggestion],
+    summary="Suggest characters, starships and films",
+    description="Retrieve characters, starships and films with a word starting with `q`, served from an in-memory index without querying the database. Up to `limit` suggestions are returned in alphabetical order."
+)
+async def api_suggest(
+        q: str = Query(..., description="Prefix to complete"),
+        limit: int = Query(10, ge=1, le=50),
+        index: SuggestIndex = Depends(get_suggest_index)
+) -> list[Suggestion]:
+    return index.suggest(q, limit)
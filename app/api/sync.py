@@ -0,0 +1,24 @@
+"""
+API routes for inspecting SWAPI syncs.
+"""
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.deps import get_db
+from app.schemas.sync import SyncStatus
+from app.services.sync_scheduler import get_last_sync_run
+
+
+router = APIRouter()
+
+@router.get(
+    "/status",
+    response_model=SyncStatus,
+    summary="Get the sync status",
+    description="Retrieve the most recent sync run and, if background sync is enabled, the scheduler state of the serving worker."
+)
+async def api_sync_status(request: Request, db: AsyncSession = Depends(get_db)) -> SyncStatus:
+    scheduler = getattr(request.app.state, "sync_scheduler", None)
+    return SyncStatus(
+        last_run=await get_last_sync_run(db),
+        scheduler=scheduler.status() if scheduler else None,
+    )
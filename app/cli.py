@@ -1,157 +1,229 @@
 """
-CLI tool for initializing the database and syncing data from SWAPI.
+CLI tool for initializing the database, syncing data from SWAPI, and managing snapshots.
 
 Usage:
     python -m app.cli init-db [--drop]
-    python -m app.cli sync-all
+    python -m app.cli sync-all [--base-url URL ...] [--max-connections N] [--max-per-host N] [--max-retries N]
+                              [--hedge-delay SECONDS] [--batch-size N] [--since DATE] [--full] [--timings] [--metrics]
+                              [--shadow | --in-place]
+    python -m app.cli export-snapshot PATH [--format ndjson|sqlite]
+    python -m app.cli import-snapshot PATH
+    python -m app.cli seed [--films N] [--starships N] [--people N] [--seed S]
+    python -m app.cli fake-swapi [--films N] [--starships N] [--people N] [--seed S] [--page-size N] [--port P]
 """
 import asyncio
+import json
+from datetime import datetime
+from typing import List
 import typer
+import uvicorn
+from app.db.migrations import migrate, schema_version
 from app.db.session import Base, engine, SessionLocal
-from app.models import Character
-from app.models.film import Film
-from app.models.starship import Starship
-from app.services.swapi_client import fetch_characters, fetch_films, fetch_starships
+from app.fake_swapi import create_app as create_fake_swapi
+from app.services import snapshot_service
+from app.services.response_cache import CACHED_TABLES, response_cache
+from app.services.shadow_sync import run_shadow_sync
+from app.services.snapshot_service import SNAPSHOT_FORMATS
+from app.services.swapi_client import (
+    BASE_URLS, MAX_CONNECTIONS, MAX_CONNECTIONS_PER_HOST, MAX_RETRIES, FetchScheduler, RequestTiming,
+    fetch_characters, fetch_films, fetch_starships
+)
+from app.services.sync_service import (
+    BATCH_SIZE, run_sync, upsert_films, upsert_starships, upsert_characters, write_payloads
+)
+from app.services.sync_metrics import SyncMetrics
+from app.services.synthetic import SyntheticDataset
 
 cli = typer.Typer()
 
 @cli.command()
 def init_db(drop: bool = typer.Option(False, "--drop", help="Drop existing tables before creating")) -> None:
     """
-    Initialize the database schema.
+    Initialize the database schema, or upgrade an existing database to the current one.
     Use --drop to reset the database before creating tables.
     """
     if drop:
         Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+        schema_version.drop(bind=engine, checkfirst=True)
+    applied = migrate(engine)
+    response_cache.bump(*CACHED_TABLES)
+    for name in applied:
+        print(f"Applied migration {name}")
     print("Database initialized" + (" (dropped and recreated)" if drop else ""))
 
-def extract_id_from_url(url: str) -> int:
-    """
-    Extract the numeric ID from a SWAPI resource URL.
-    Example: "https://swapi.info/api/films/1/" → 1
-    """
-    return int(url.rstrip("/").split("/")[-1])
-
-async def sync_films_logic(db) -> None:
+async def sync_films_logic(db) -> dict:
     """
     Fetch and store films from SWAPI.
-    If the film already exists, it is updated.
+    New films are inserted and changed ones updated in bulk.
     """
     films = await fetch_films()
-    for film in films:
-        film_id = extract_id_from_url(film["url"])
-        existing = db.query(Film).filter_by(id=film_id).first()
-        if existing:
-            existing.title = film["title"]
-            existing.episode_id = film["episode_id"]
-            existing.opening_crawl = film["opening_crawl"]
-            existing.producer = film["producer"]
-            existing.director = film["director"]
-            existing.release_date = film["release_date"]
-        else:
-            db.add(Film(
-                id=film_id,
-                title=film["title"],
-                episode_id=film["episode_id"],
-                opening_crawl=film["opening_crawl"],
-                producer=film["producer"],
-                director=film["director"],
-                release_date=film["release_date"]
-            ))
+    stats = upsert_films(db, films)
     db.commit()
+    response_cache.bump("films")
+    return stats
 
-async def sync_starships_logic(db) -> None:
+async def sync_starships_logic(db) -> dict:
     """
     Fetch and store starships from SWAPI, including related films.
     """
     starships = await fetch_starships()
-    for s in starships:
-        starship_id = extract_id_from_url(s["url"])
-        existing = db.query(Starship).filter_by(id=starship_id).first()
-
-        if existing:
-            existing.name = s["name"]
-            existing.model = s["model"]
-            existing.starship_class = s["starship_class"]
-            starship_obj = existing
-        else:
-            starship_obj = Starship(
-                id=starship_id,
-                name=s["name"],
-                model=s["model"],
-                starship_class=s["starship_class"]
-            )
-            db.add(starship_obj)
-            db.commit()
-            db.refresh(starship_obj)
-
-        # Link to Films
-        films = []
-        for film_url in s.get("films", []):
-            film_id = extract_id_from_url(film_url)
-            film = db.query(Film).filter_by(id=film_id).first()
-            if film:
-                films.append(film)
-        starship_obj.films = films
+    stats = upsert_starships(db, starships)
     db.commit()
+    response_cache.bump("starships")
+    return stats
 
-
-async def sync_characters_logic(db) -> None:
+async def sync_characters_logic(db) -> dict:
     """
     Fetch and store characters from SWAPI, including related films and starships.
     """
     characters = await fetch_characters()
-    for c in characters:
-        char_id = extract_id_from_url(c["url"])
-        existing = db.query(Character).filter_by(id=char_id).first()
-
-        if existing:
-            existing.name = c["name"]
-            existing.height = c["height"]
-            existing.mass = c["mass"]
-            char_obj = existing
-        else:
-            char_obj = Character(
-                id=char_id,
-                name=c["name"],
-                height=c["height"],
-                mass=c["mass"]
-            )
-            db.add(char_obj)
-            db.commit()
-            db.refresh(char_obj)
+    stats = upsert_characters(db, characters)
+    db.commit()
+    response_cache.bump("characters")
+    return stats
 
-        # Link to Films
-        films = []
-        for film_url in c.get("films", []):
-            film_id = extract_id_from_url(film_url)
-            film = db.query(Film).filter_by(id=film_id).first()
-            if film:
-                films.append(film)
-        char_obj.films = films
+def format_stats(resource: str, stats: dict) -> str:
+    """
+    Format upsert statistics for CLI output.
+    """
+    if stats.get("not_modified"):
+        return f"{resource}: not modified"
+    line = f"{resource}: {stats['inserted']} inserted, {stats['updated']} updated, {stats['unchanged']} unchanged"
+    if "links_inserted" in stats:
+        line += f"; links {stats['links_inserted']} added, {stats['links_deleted']} removed"
+    return line
 
-        # Link to Starships
-        starships = []
-        for starship_url in c.get("starships", []):
-            starship_id = extract_id_from_url(starship_url)
-            starship = db.query(Starship).filter_by(id=starship_id).first()
-            if starship:
-                starships.append(starship)
-        char_obj.starships = starships
-    db.commit()
+def format_timing(timing: RequestTiming) -> str:
+    """
+    Format a request timing for CLI output.
+    """
+    outcome = timing.status if timing.error is None else timing.error
+    total = f"{timing.total:.3f}s" if timing.total is not None else "-"
+    flags = " (hedge)" if timing.hedged else ""
+    return (f"GET {timing.url} attempt={timing.attempt}{flags} -> {outcome} "
+            f"start={timing.started:.3f}s headers={timing.elapsed:.3f}s total={total}")
 
 @cli.command()
-def sync_all():
+def sync_all(
+        base_urls: List[str] = typer.Option(BASE_URLS, "--base-url",
+                                            help="SWAPI base URL to sync from; repeat to add mirrors"),
+        max_connections: int = typer.Option(MAX_CONNECTIONS, "--max-connections", min=1,
+                                            help="Maximum concurrent connections to SWAPI"),
+        max_per_host: int = typer.Option(MAX_CONNECTIONS_PER_HOST, "--max-per-host", min=1,
+                                         help="Maximum concurrent requests per upstream host"),
+        max_retries: int = typer.Option(MAX_RETRIES, "--max-retries", min=0,
+                                        help="Retries for failed, throttled (429) or 5xx requests"),
+        hedge_delay: float = typer.Option(None, "--hedge-delay", min=0,
+                                          help="Seconds before a slow request is also sent to the next mirror"),
+        timings: bool = typer.Option(False, "--timings", help="Print per-request timings"),
+        metrics: bool = typer.Option(False, "--metrics", help="Print per-phase sync metrics as JSON"),
+        batch_size: int = typer.Option(BATCH_SIZE, "--batch-size", min=1, help="Rows written per bulk statement"),
+        since: datetime = typer.Option(None, "--since", help="Only fetch resources modified since this date (UTC)"),
+        full: bool = typer.Option(False, "--full", help="Ignore the validators stored by the previous sync"),
+        shadow: bool = typer.Option(True, "--shadow/--in-place",
+                                    help="Sync into a side database file and apply it in one short transaction"),
+):
     """
     Sync films, starships, and characters from SWAPI into the local database.
+    All resources are fetched concurrently and written in a single transaction.
+    Only resources and rows that changed since the previous sync are written.
+    Every run is recorded with its metrics in the `sync_runs` table.
+    By default the sync is built in a side database file, so API readers never
+    block on it or see a partially synced dataset.
     """
+    scheduler = FetchScheduler(base_urls, max_per_host=max_per_host, max_retries=max_retries, hedge_delay=hedge_delay)
+    sync_metrics = SyncMetrics(trace_memory=metrics)
     db = SessionLocal()
-    asyncio.run(sync_films_logic(db))
-    asyncio.run(sync_starships_logic(db))
-    asyncio.run(sync_characters_logic(db))
-    db.close()
+    try:
+        sync = run_shadow_sync if shadow else run_sync
+        stats = asyncio.run(sync(
+            db, max_connections=max_connections, batch_size=batch_size, since=since, full=full, scheduler=scheduler,
+            metrics=sync_metrics
+        ))
+    finally:
+        db.close()
+        if timings:
+            for timing in scheduler.timings:
+                print(format_timing(timing))
+    if metrics:
+        print(json.dumps(sync_metrics.to_dict(), indent=2))
+        return
+    for resource, resource_stats in stats.items():
+        print(format_stats(resource.capitalize(), resource_stats))
     print("All data synced")
 
+@cli.command()
+def export_snapshot(
+        path: str = typer.Argument(..., help="Snapshot file to write"),
+        snapshot_format: str = typer.Option("ndjson", "--format", help="Snapshot format: ndjson (gzip) or sqlite"),
+):
+    """
+    Export the full dataset to a snapshot file.
+    """
+    if snapshot_format not in SNAPSHOT_FORMATS:
+        raise typer.BadParameter(f"must be one of: {', '.join(SNAPSHOT_FORMATS)}", param_hint="--format")
+    db = SessionLocal()
+    try:
+        counts = snapshot_service.export_snapshot(db, path, snapshot_format)
+    finally:
+        db.close()
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"Snapshot written to {path}")
+
+@cli.command()
+def import_snapshot(path: str = typer.Argument(..., help="Snapshot file to load")):
+    """
+    Replace the full dataset with the contents of a snapshot file.
+    """
+    db = SessionLocal()
+    try:
+        counts = snapshot_service.import_snapshot(db, path)
+    finally:
+        db.close()
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"Snapshot loaded from {path}")
+
+@cli.command()
+def seed(
+        films: int = typer.Option(6, "--films", min=0, help="Number of films to generate"),
+        starships: int = typer.Option(36, "--starships", min=0, help="Number of starships to generate"),
+        people: int = typer.Option(82, "--people", min=0, help="Number of characters to generate"),
+        random_seed: int = typer.Option(0, "--seed", help="Seed of the synthetic dataset"),
+        batch_size: int = typer.Option(BATCH_SIZE, "--batch-size", min=1, help="Rows written per bulk statement"),
+):
+    """
+    Bulk-generate a synthetic dataset directly into the database.
+    Produces the same data as `fake-swapi` with the same sizes and seed.
+    """
+    dataset = SyntheticDataset(films, starships, people, random_seed)
+    db = SessionLocal()
+    try:
+        stats = write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts}, batch_size)
+        db.commit()
+        response_cache.bump(*CACHED_TABLES)
+    finally:
+        db.close()
+    for resource, resource_stats in stats.items():
+        print(format_stats(resource.capitalize(), resource_stats))
+    print("Database seeded")
+
+@cli.command()
+def fake_swapi(
+        films: int = typer.Option(6, "--films", min=0, help="Number of films to serve"),
+        starships: int = typer.Option(36, "--starships", min=0, help="Number of starships to serve"),
+        people: int = typer.Option(82, "--people", min=0, help="Number of people to serve"),
+        random_seed: int = typer.Option(0, "--seed", help="Seed of the synthetic dataset"),
+        page_size: int = typer.Option(None, "--page-size", min=1, help="Serve paginated responses of this size"),
+        host: str = typer.Option("127.0.0.1", "--host", help="Host to bind"),
+        port: int = typer.Option(9000, "--port", help="Port to bind"),
+):
+    """
+    Serve a synthetic dataset with the SWAPI URL layout for load testing.
+    Sync from it with `sync-all --base-url http://HOST:PORT/api`.
+    """
+    uvicorn.run(create_fake_swapi(films, starships, people, random_seed, page_size), host=host, port=port)
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,116 @@
+"""
+Row counts and data versions of the catalog tables.
+Triggers keep the number of rows of each counted table in the `row_counts`
+table, in the same transaction as every insert and delete, so unfiltered list
+totals are a primary key lookup instead of a table scan. The same triggers, and
+one on update, bump the table's `version` and `modified_at` on every change, for
+conditional requests and cache invalidation. SQLite counts with row-level
+triggers, PostgreSQL with statement-level triggers over the transition table.
+"""
+from datetime import datetime, timezone
+from typing import Iterable
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, event, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+row_counts = Table(
+    "row_counts",
+    MetaData(),
+    Column("table_name", String, primary_key=True),
+    Column("row_count", Integer, nullable=False),
+    Column("version", Integer, nullable=False, server_default="0"),
+    Column("modified_at", DateTime(timezone=True)),
+)
+
+# Names of the tables counted in `row_counts`, filled in by `register_count`
+COUNTED_TABLES: list[str] = []
+
+_POSTGRESQL_FUNCTION = """
+CREATE OR REPLACE FUNCTION count_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed integer := (SELECT count(*) FROM changed_rows);
+BEGIN
+    -- Statement-level triggers also fire for statements that change no rows
+    IF changed > 0 THEN
+        UPDATE row_counts SET
+            row_count = row_count + CASE TG_OP WHEN 'INSERT' THEN changed WHEN 'DELETE' THEN -changed ELSE 0 END,
+            version = version + 1,
+            modified_at = now()
+        WHERE table_name = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END $$
+"""
+
+# Current time in the format SQLAlchemy reads back as a datetime
+_SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def register_count(target: Table) -> None:
+    """
+    Count the rows of `target` in `row_counts` whenever the table is created.
+    """
+    COUNTED_TABLES.append(target.name)
+    event.listen(target, "after_create", lambda target, connection, **kw: create_row_count(connection, target.name))
+    event.listen(target, "before_drop", lambda target, connection, **kw: drop_row_count(connection, target.name))
+
+def create_row_count(conn: Connection, table_name: str) -> None:
+    """
+    Create (or replace) the counting triggers of a table and count its existing rows.
+    """
+    row_counts.create(conn, checkfirst=True)
+    if conn.dialect.name == "sqlite":
+        now = _SQLITE_NOW
+        for trigger, event_name, delta in (("insert", "INSERT", "+ 1"), ("delete", "DELETE", "- 1"),
+                                           ("update", "UPDATE", "")):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {table_name}_count_{trigger}")
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER {table_name}_count_{trigger} AFTER {event_name} ON {table_name} "
+                f"BEGIN UPDATE row_counts SET row_count = row_count {delta}, version = version + 1, "
+                f"modified_at = {now} WHERE table_name = '{table_name}'; END"
+            )
+    elif conn.dialect.name == "postgresql":
+        now = "now()"
+        conn.exec_driver_sql(_POSTGRESQL_FUNCTION)
+        for trigger, event_name, transition in (("insert", "INSERT", "NEW"), ("delete", "DELETE", "OLD"),
+                                                ("update", "UPDATE", "NEW")):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {table_name}_count_{trigger} ON {table_name}")
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER {table_name}_count_{trigger} AFTER {event_name} ON {table_name} "
+                f"REFERENCING {transition} TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION count_rows()"
+            )
+    else:
+        return
+    conn.exec_driver_sql(
+        f"INSERT INTO row_counts (table_name, row_count, version, modified_at) "
+        f"SELECT '{table_name}', count(*), 1, {now} FROM {table_name} WHERE true "
+        f"ON CONFLICT (table_name) DO UPDATE SET row_count = excluded.row_count, "
+        f"version = row_counts.version + 1, modified_at = excluded.modified_at"
+    )
+
+def drop_row_count(conn: Connection, table_name: str) -> None:
+    """
+    Forget the count of a table that is about to be dropped; its triggers go with it.
+    """
+    if inspect(conn).has_table(row_counts.name):
+        conn.execute(row_counts.delete().where(row_counts.c.table_name == table_name))
+
+async def get_row_count(db: AsyncSession, table_name: str) -> int | None:
+    """
+    Return the number of rows of a counted table, or None if it is not counted.
+    """
+    return await db.scalar(select(row_counts.c.row_count).where(row_counts.c.table_name == table_name))
+
+async def get_table_versions(db: AsyncSession, table_names: Iterable[str]) -> dict[str, tuple[int, datetime]]:
+    """
+    Return the data version and the time of the last change (in UTC) of each counted table in `table_names`.
+    """
+    rows = await db.execute(
+        select(row_counts.c.table_name, row_counts.c.version, row_counts.c.modified_at)
+        .where(row_counts.c.table_name.in_(list(table_names)))
+    )
+    return {
+        table_name: (version, modified_at.replace(tzinfo=timezone.utc) if modified_at.tzinfo is None
+                     else modified_at.astimezone(timezone.utc))
+        for table_name, version, modified_at in rows
+    }
@@ -1,13 +1,15 @@
 """
-Database dependency for FastAPI routes.
-Provides a SQLAlchemy session using dependency injection.
+Database dependencies for FastAPI routes.
+Provide async SQLAlchemy sessions using dependency injection: `get_db` for
+reads and `get_write_db` for handlers that write.
 """
-from app.db.session import SessionLocal
+from app.db.session import AsyncReadSessionLocal, AsyncSessionLocal
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+async def get_write_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,158 @@
+"""
+Versioned schema migrations.
+`create_all` only creates missing tables, so changes to existing tables ship as
+numbered migrations that upgrade existing databases in place. The version of a
+database is stored in the `schema_version` table.
+"""
+from typing import Callable
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, MetaData, Table, bindparam, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from app.db.counts import COUNTED_TABLES, create_row_count, row_counts
+from app.db.search import SEARCH_COLUMNS, create_search_index
+from app.db.session import Base
+from app.models.character import parse_measure
+import app.models  # noqa: F401 - registers the tables on Base.metadata
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, nullable=False),
+)
+
+
+def add_content_hash_columns(conn: Connection) -> None:
+    """
+    Add the `content_hash` column used by sync to skip unchanged rows.
+    """
+    for table in ("films", "starships", "characters"):
+        columns = {column["name"] for column in inspect(conn).get_columns(table)}
+        if "content_hash" not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN content_hash VARCHAR")
+
+def key_association_tables(conn: Connection) -> None:
+    """
+    Rebuild the association tables with composite primary keys and reverse-direction
+    indexes, dropping duplicate and incomplete links.
+    """
+    metadata = MetaData()
+    # Referenced tables, only as far as the foreign keys need them
+    for referenced in ("films", "starships", "characters"):
+        Table(referenced, metadata, Column("id", Integer, primary_key=True))
+    for name, owner, owner_table, target, target_table in (
+            ("character_film", "character_id", "characters", "film_id", "films"),
+            ("character_starship", "character_id", "characters", "starship_id", "starships"),
+            ("starship_film", "starship_id", "starships", "film_id", "films"),
+    ):
+        table = Table(
+            name,
+            metadata,
+            Column(owner, Integer, ForeignKey(f"{owner_table}.id"), primary_key=True),
+            Column(target, Integer, ForeignKey(f"{target_table}.id"), primary_key=True),
+            Index(f"ix_{name}_{target}", target, owner),
+        )
+        conn.exec_driver_sql(f"ALTER TABLE {name} RENAME TO {name}_old")
+        table.create(conn)
+        conn.exec_driver_sql(
+            f"INSERT INTO {name} ({owner}, {target}) SELECT DISTINCT {owner}, {target} FROM {name}_old "
+            f"WHERE {owner} IS NOT NULL AND {target} IS NOT NULL"
+        )
+        conn.exec_driver_sql(f"DROP TABLE {name}_old")
+
+def add_search_indexes(conn: Connection) -> None:
+    """
+    Create the full-text search indexes and index the existing rows.
+    """
+    for table_name in SEARCH_COLUMNS:
+        create_search_index(conn, table_name)
+
+def add_measure_columns(conn: Connection) -> None:
+    """
+    Add indexed numeric copies of character height and mass and parse the existing values.
+    """
+    columns = {column["name"] for column in inspect(conn).get_columns("characters")}
+    for name in ("height_num", "mass_num"):
+        if name not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE characters ADD COLUMN {name} FLOAT")
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_characters_{name} ON characters ({name})")
+    rows = [
+        {"row_id": id_, "height_num": parse_measure(height), "mass_num": parse_measure(mass)}
+        for id_, height, mass in conn.exec_driver_sql("SELECT id, height, mass FROM characters")
+    ]
+    if rows:
+        characters = Table("characters", MetaData(), Column("id", Integer, primary_key=True),
+                           Column("height_num", Float), Column("mass_num", Float))
+        conn.execute(characters.update().where(characters.c.id == bindparam("row_id")), rows)
+
+def add_row_counts(conn: Connection) -> None:
+    """
+    Create the `row_counts` table and its triggers, and count the existing rows.
+    """
+    for table_name in COUNTED_TABLES:
+        create_row_count(conn, table_name)
+
+def add_table_versions(conn: Connection) -> None:
+    """
+    Add the data `version` and `modified_at` columns to `row_counts`, and replace
+    the counting triggers with ones that also maintain them.
+    """
+    columns = {column["name"] for column in inspect(conn).get_columns(row_counts.name)}
+    if "version" not in columns:
+        conn.exec_driver_sql(f"ALTER TABLE {row_counts.name} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+    if "modified_at" not in columns:
+        modified_at = row_counts.c.modified_at.type.compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f"ALTER TABLE {row_counts.name} ADD COLUMN modified_at {modified_at}")
+    for table_name in COUNTED_TABLES:
+        create_row_count(conn, table_name)
+
+def add_name_sort_index(conn: Connection) -> None:
+    """
+    Index characters by (name, id) for name-sorted pages.
+    """
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_characters_name_id ON characters (name, id)")
+
+# Migrations in order; a database at version N has had the first N applied
+MIGRATIONS: list[Callable[[Connection], None]] = [
+    add_content_hash_columns,
+    key_association_tables,
+    add_search_indexes,
+    add_measure_columns,
+    add_row_counts,
+    add_table_versions,
+    add_name_sort_index,
+]
+
+def get_version(conn: Connection) -> int | None:
+    """
+    Return the schema version of the database, or None if it is not versioned.
+    """
+    if not inspect(conn).has_table(schema_version.name):
+        return None
+    return conn.scalar(select(schema_version.c.version))
+
+def migrate(engine: Engine) -> list[str]:
+    """
+    Bring the database at `engine` up to the current schema.
+
+    A new database gets the current schema and is stamped with the latest
+    version. A database created before versioning counts as version 0. Each
+    pending migration runs in its own transaction, together with the version
+    bump, and missing tables are created afterwards.
+    Returns the names of the applied migrations.
+    """
+    with engine.begin() as conn:
+        version = get_version(conn)
+        if version is None:
+            existing = inspect(conn).has_table("films")
+            schema_version.create(conn)
+            version = 0 if existing else len(MIGRATIONS)
+            conn.execute(schema_version.insert().values(version=version))
+
+    applied = []
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        with engine.begin() as conn:
+            migration(conn)
+            conn.execute(schema_version.update().values(version=number))
+        applied.append(migration.__name__)
+
+    Base.metadata.create_all(bind=engine)
+    return applied
@@ -0,0 +1,87 @@
+"""
+Full-text search on the name columns of the catalog tables.
+SQLite keeps an FTS5 index per table in sync through triggers, PostgreSQL a
+generated tsvector column with a GIN index. Searches match every word of the
+search text as a prefix and order results by relevance.
+"""
+import re
+from sqlalchemy import Table, column, event, func, literal_column, table
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+# Searchable column by table name, filled in by `register_search`
+SEARCH_COLUMNS: dict[str, str] = {}
+
+
+def register_search(target: Table, column_name: str) -> None:
+    """
+    Index `column_name` of `target` for full-text search whenever the table is created.
+    """
+    SEARCH_COLUMNS[target.name] = column_name
+    event.listen(target, "after_create", lambda target, connection, **kw: create_search_index(connection, target.name))
+    event.listen(target, "before_drop", lambda target, connection, **kw: drop_search_index(connection, target.name))
+
+def create_search_index(conn: Connection, table_name: str) -> None:
+    """
+    Create the full-text index of a table and index its existing rows.
+    """
+    name = SEARCH_COLUMNS[table_name]
+    if conn.dialect.name == "sqlite":
+        index = f"{table_name}_fts"
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5({name}, content='{table_name}', content_rowid='id')"
+        )
+        delete = f"INSERT INTO {index} ({index}, rowid, {name}) VALUES ('delete', old.id, old.{name});"
+        insert = f"INSERT INTO {index} (rowid, {name}) VALUES (new.id, new.{name});"
+        for trigger, event_name, body in (
+                ("insert", "INSERT", insert),
+                ("delete", "DELETE", delete),
+                ("update", f"UPDATE OF {name}", delete + " " + insert),
+        ):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {index}_{trigger} AFTER {event_name} ON {table_name} BEGIN {body} END"
+            )
+        conn.exec_driver_sql(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+    elif conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(
+            f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('simple', coalesce({name}, ''))) STORED"
+        )
+        conn.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_vector ON {table_name} USING GIN (search_vector)"
+        )
+
+def drop_search_index(conn: Connection, table_name: str) -> None:
+    """
+    Drop the full-text index of a table that is about to be dropped.
+    """
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {table_name}_fts")
+
+def search(query: Select, model, text: str, dialect: str) -> Select:
+    """
+    Restrict `query` to rows of `model` whose searchable column has a word
+    starting with each word of `text`, best matches first.
+    Falls back to a case-insensitive substring match on other databases and
+    for text without words.
+    """
+    table_name = model.__tablename__
+    words = re.findall(r"[^\W_]+", text.lower())
+    if not words or dialect not in ("sqlite", "postgresql"):
+        target = getattr(model, SEARCH_COLUMNS[table_name])
+        return query.where(func.lower(target).contains(text.lower(), autoescape=True))
+
+    if dialect == "sqlite":
+        index = table(f"{table_name}_fts", column("rowid"), column("rank"), column(f"{table_name}_fts"))
+        match = " ".join(f'"{word}"*' for word in words)
+        return (
+            query.join(index, index.c.rowid == model.id)
+            .where(index.c[f"{table_name}_fts"].op("MATCH")(match))
+            .order_by(index.c.rank, model.id)
+        )
+
+    vector = literal_column(f"{table_name}.search_vector")
+    tsquery = func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
+    # Normalization 1 divides the rank by the log of the length, preferring shorter names like bm25 does
+    rank = func.ts_rank(vector, tsquery, 1)
+    return query.where(vector.op("@@")(tsquery)).order_by(rank.desc(), model.id)
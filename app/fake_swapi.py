@@ -0,0 +1,102 @@
+"""
+Local fake-SWAPI server for load testing.
+
+Serves a synthetic dataset (see app.services.synthetic) with the same URL
+layout as SWAPI, either as one streamed JSON list per resource or, when a page
+size is set, as paginated `{count, next, previous, results}` pages.
+
+Run with:
+    python -m app.cli fake-swapi --people 100000
+or:
+    FAKE_SWAPI_PEOPLE=100000 uvicorn app.fake_swapi:app --port 9000
+"""
+import hashlib
+import json
+import os
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from app.services.synthetic import SyntheticDataset
+
+RESOURCES = ("films", "starships", "people")
+
+# Number of records serialized per chunk of a streamed list response
+_CHUNK_RECORDS = 1000
+
+
+def create_app(
+        films: int = 6,
+        starships: int = 36,
+        people: int = 82,
+        seed: int = 0,
+        page_size: int | None = None
+) -> FastAPI:
+    """
+    Create a fake-SWAPI app serving a synthetic dataset of the given size.
+    Responses carry an ETag and honour `If-None-Match`.
+    """
+    fake = FastAPI(title="Fake SWAPI")
+    dataset_key = f"{films}:{starships}:{people}:{seed}"
+
+    def dataset(request: Request) -> SyntheticDataset:
+        base_url = str(request.base_url).rstrip("/") + "/api"
+        return SyntheticDataset(films, starships, people, seed, base_url)
+
+    def etag(resource: str, page: int | None) -> str:
+        return '"' + hashlib.sha1(f"{dataset_key}:{resource}:{page}:{page_size}".encode()).hexdigest() + '"'
+
+    @fake.get("/api/{resource}")
+    @fake.get("/api/{resource}/")
+    def list_resource(resource: str, request: Request, page: int | None = None):
+        if resource not in RESOURCES:
+            raise HTTPException(status_code=404, detail="Not found")
+        tag = etag(resource, page)
+        if request.headers.get("if-none-match") == tag:
+            return Response(status_code=304, headers={"ETag": tag})
+        data = dataset(request)
+
+        if page_size is None:
+            def body():
+                yield "["
+                count = data.counts[resource]
+                for start in range(1, count + 1, _CHUNK_RECORDS):
+                    chunk = ",".join(json.dumps(r) for r in data.records(resource, start, start + _CHUNK_RECORDS))
+                    yield ("," if start > 1 else "") + chunk
+                yield "]"
+            return StreamingResponse(body(), media_type="application/json", headers={"ETag": tag})
+
+        page = page or 1
+        count = data.counts[resource]
+        start = (page - 1) * page_size + 1
+        url = f"{data.base_url}/{resource}/"
+        return Response(
+            content=json.dumps({
+                "count": count,
+                "next": f"{url}?page={page + 1}" if start + page_size <= count else None,
+                "previous": f"{url}?page={page - 1}" if page > 1 else None,
+                "results": list(data.records(resource, start, start + page_size)),
+            }),
+            media_type="application/json",
+            headers={"ETag": tag},
+        )
+
+    @fake.get("/api/{resource}/{index}")
+    @fake.get("/api/{resource}/{index}/")
+    def get_record(resource: str, index: int, request: Request):
+        data = dataset(request)
+        if resource not in RESOURCES or not 1 <= index <= data.counts[resource]:
+            raise HTTPException(status_code=404, detail="Not found")
+        return data.record(resource, index)
+
+    return fake
+
+def _env_int(name: str, default: int | None) -> int | None:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+app = create_app(
+    films=_env_int("FAKE_SWAPI_FILMS", 6),
+    starships=_env_int("FAKE_SWAPI_STARSHIPS", 36),
+    people=_env_int("FAKE_SWAPI_PEOPLE", 82),
+    seed=_env_int("FAKE_SWAPI_SEED", 0),
+    page_size=_env_int("FAKE_SWAPI_PAGE_SIZE", None),
+)
@@ -1,10 +1,37 @@
 """
 Main application entrypoint.
 
-Initializes the FastAPI app and registers the API v1 router.
+Initializes the FastAPI app, registers the API v1 router, and runs the
+suggestion index and the optional background sync scheduler for the
+lifetime of the app. GET requests of the catalog endpoints go through the
+response cache.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.api_v1 import api_v1_router
+from app.api.cache import ResponseCacheMiddleware
+from app.db.deps import get_db
+from app.services.suggest_service import SuggestIndex
+from app.services.sync_scheduler import create_scheduler
 
-app = FastAPI(title="Star Wars API", version="1.0")
-app.include_router(api_v1_router, prefix="/api/v1")
\ No newline at end of file
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load through the same (possibly overridden) session dependency as the routes
+    suggest_index = SuggestIndex(app.dependency_overrides.get(get_db, get_db))
+    app.state.suggest_index = suggest_index
+    await suggest_index.start()
+    scheduler = create_scheduler()
+    app.state.sync_scheduler = scheduler
+    if scheduler:
+        scheduler.start()
+    try:
+        yield
+    finally:
+        if scheduler:
+            await scheduler.stop()
+        await suggest_index.stop()
+
+app = FastAPI(title="Star Wars API", version="1.0", lifespan=lifespan)
+app.include_router(api_v1_router, prefix="/api/v1")
+app.add_middleware(ResponseCacheMiddleware)
@@ -3,4 +3,6 @@ Imports all SQLAlchemy models for easy access elsewhere in the application.
 """
 from .character import Character
 from .film import Film
-from .starship import Starship
\ No newline at end of file
+from .starship import Starship
+from .sync_state import SyncState
+from .sync_run import SyncRun
@@ -1,37 +1,61 @@
 """
 SQLAlchemy model for Star Wars starships, along with many-to-many association tables
 """
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Float, Index, Integer, String, Table, ForeignKey
 from sqlalchemy.orm import relationship
+from app.db.counts import register_count
+from app.db.search import register_search
 from app.db.session import Base
 
 
-# Association table for many-to-many relationship between Characters and Films
+# Association table for many-to-many relationship between Characters and Films.
+# The primary key serves lookups by character, the index lookups by film
 character_film = Table(
     "character_film",
     Base.metadata,
-    Column("character_id", Integer, ForeignKey("characters.id")),
-    Column("film_id", Integer, ForeignKey("films.id")),
+    Column("character_id", Integer, ForeignKey("characters.id"), primary_key=True),
+    Column("film_id", Integer, ForeignKey("films.id"), primary_key=True),
+    Index("ix_character_film_film_id", "film_id", "character_id"),
 )
 
 # Association table for many-to-many relationship between Characters and Starships
 character_starship = Table(
     "character_starship",
     Base.metadata,
-    Column("character_id", Integer, ForeignKey("characters.id")),
-    Column("starship_id", Integer, ForeignKey("starships.id")),
+    Column("character_id", Integer, ForeignKey("characters.id"), primary_key=True),
+    Column("starship_id", Integer, ForeignKey("starships.id"), primary_key=True),
+    Index("ix_character_starship_starship_id", "starship_id", "character_id"),
 )
 
+def parse_measure(value: str | None) -> float | None:
+    """
+    Parse a SWAPI measure such as "172" or "1,358"; returns None for "unknown", "n/a" and the like.
+    """
+    try:
+        return float(value.replace(",", ""))
+    except (AttributeError, ValueError):
+        return None
+
 class Character(Base):
     """
     SQLAlchemy model representing a character
     """
     __tablename__ = "characters"
+    # Serves name-sorted pages, which continue after a (name, id) cursor
+    __table_args__ = (Index("ix_characters_name_id", "name", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     height = Column(String)
     mass = Column(String)
+    # Parsed `height` and `mass`, NULL when unknown, for range filters and sorting
+    height_num = Column(Float, index=True)
+    mass_num = Column(Float, index=True)
+    # Hash of the synced SWAPI fields and relationships, used to skip unchanged rows
+    content_hash = Column(String)
 
     films = relationship("Film", secondary=character_film, back_populates="characters")
-    starships = relationship("Starship", secondary=character_starship, back_populates="characters")
\ No newline at end of file
+    starships = relationship("Starship", secondary=character_starship, back_populates="characters")
+
+register_search(Character.__table__, "name")
+register_count(Character.__table__)
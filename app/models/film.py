@@ -3,6 +3,8 @@ SQLAlchemy model for Star Wars films
 """
 from sqlalchemy import Column, Integer, String, Date
 from sqlalchemy.orm import relationship
+from app.db.counts import register_count
+from app.db.search import register_search
 from app.db.session import Base
 from app.models.starship import starship_film_association
 from app.models.character import character_film
@@ -21,6 +23,10 @@ class Film(Base):
     director = Column(String)
     producer = Column(String)
     release_date = Column(String)
+    content_hash = Column(String)
 
     starships = relationship("Starship", secondary=starship_film_association, back_populates="films")
     characters = relationship("Character", secondary=character_film, back_populates="films")
+
+register_search(Film.__table__, "title")
+register_count(Film.__table__)
@@ -1,8 +1,10 @@
 """
 SQLAlchemy model for Star Wars starships, along with many-to-many association tables
 """
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, Table, ForeignKey
 from sqlalchemy.orm import relationship
+from app.db.counts import register_count
+from app.db.search import register_search
 from app.db.session import Base
 from app.models.character import character_starship
 
@@ -11,8 +13,9 @@ from app.models.character import character_starship
 starship_film_association = Table(
     "starship_film",
     Base.metadata,
-    Column("starship_id", Integer, ForeignKey("starships.id")),
-    Column("film_id", Integer, ForeignKey("films.id")),
+    Column("starship_id", Integer, ForeignKey("starships.id"), primary_key=True),
+    Column("film_id", Integer, ForeignKey("films.id"), primary_key=True),
+    Index("ix_starship_film_film_id", "film_id", "starship_id"),
 )
 
 class Starship(Base):
@@ -25,6 +28,10 @@ class Starship(Base):
     name = Column(String, nullable=False)
     model = Column(String)
     starship_class = Column(String)
+    content_hash = Column(String)
 
     films = relationship("Film", secondary=starship_film_association, back_populates="starships")
     characters = relationship("Character", secondary=character_starship, back_populates="starships")
+
+register_search(Starship.__table__, "name")
+register_count(Starship.__table__)
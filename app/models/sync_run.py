@@ -0,0 +1,24 @@
+"""
+SQLAlchemy model for recorded sync runs
+"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from app.db.session import Base
+
+
+class SyncRun(Base):
+    """
+    SQLAlchemy model representing one sync run and its metrics
+    """
+    __tablename__ = "sync_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+    status = Column(String, nullable=False)
+    error = Column(String)
+    wall_seconds = Column(Float)
+    statements = Column(Integer)
+    bytes_downloaded = Column(Integer)
+    peak_memory_bytes = Column(Integer)
+    # Full per-resource, per-phase metrics as emitted by `sync-all --metrics`
+    metrics = Column(JSON)
@@ -0,0 +1,17 @@
+"""
+SQLAlchemy model for per-resource SWAPI sync state
+"""
+from sqlalchemy import Column, String, DateTime
+from app.db.session import Base
+
+
+class SyncState(Base):
+    """
+    SQLAlchemy model storing the HTTP validators of the last successful sync of a resource
+    """
+    __tablename__ = "sync_state"
+
+    resource = Column(String, primary_key=True)
+    etag = Column(String)
+    last_modified = Column(String)
+    synced_at = Column(DateTime)
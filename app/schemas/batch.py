@@ -0,0 +1,28 @@
+from typing import Generic, TypeVar, List
+from pydantic import ConfigDict
+from pydantic.alias_generators import to_camel
+from pydantic.generics import GenericModel
+
+T = TypeVar("T")
+
+class BatchItem(GenericModel, Generic[T]):
+    """
+    One requested ID of a batch get: the item, or the error it could not be read with.
+    """
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True
+    )
+    id: int
+    item: T | None = None
+    error: str | None = None
+
+class BatchResponse(GenericModel, Generic[T]):
+    """
+    Generic batch get schema with one entry per requested ID, in request order.
+    """
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True
+    )
+    items: List[BatchItem[T]]
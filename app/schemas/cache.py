@@ -0,0 +1,18 @@
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
+
+
+class CacheStats(BaseModel):
+    """Schema for the response cache statistics of the serving worker"""
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True
+    )
+    enabled: bool
+    shared: bool
+    ttl_seconds: float
+    entries: int
+    local_hits: int
+    shared_hits: int
+    misses: int
+    versions: dict[str, int]
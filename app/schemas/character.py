@@ -1,6 +1,7 @@
 from typing import List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from pydantic.alias_generators import to_camel
+from app.schemas.relations import loaded_attributes
 
 
 class CharacterBase(BaseModel):
@@ -24,9 +25,14 @@ class CharacterCreate(BaseModel):
     starship_ids: List[int] = Field(default_factory=list, example=[3])
 
 class CharacterRead(CharacterBase):
-    """Schema for reading character data with relationships"""
-    films: List['FilmBase'] = Field(..., description="List of films the character appeared in")
-    starships: List['StarshipBase'] = Field(..., description="List of starships the character piloted")
+    """Schema for reading character data with relationships, null when not included"""
+    films: List['FilmBase'] | None = Field(None, description="List of films the character appeared in")
+    starships: List['StarshipBase'] | None = Field(None, description="List of starships the character piloted")
+
+    @model_validator(mode="before")
+    @classmethod
+    def skip_unloaded_relationships(cls, data):
+        return loaded_attributes(data)
 
 # Resolve circular references by importing after class definition
 from app.schemas.film import FilmBase
@@ -36,3 +42,7 @@ CharacterRead.model_rebuild()
 # Pagination helper type for character responses
 from app.schemas.pagination import PaginatedResponse
 PaginatedCharacters = PaginatedResponse[CharacterRead]
+
+# Batch get helper type for character responses
+from app.schemas.batch import BatchResponse
+BatchCharacters = BatchResponse[CharacterRead]
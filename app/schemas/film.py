@@ -1,6 +1,7 @@
 from typing import Optional, List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from pydantic.alias_generators import to_camel
+from app.schemas.relations import loaded_attributes
 
 
 class FilmBase(BaseModel):
@@ -29,9 +30,14 @@ class FilmCreate(BaseModel):
     starship_ids: List[int] = Field(default_factory=list, example=[3])
 
 class FilmRead(FilmBase):
-    """Schema for reading film data with relationships"""
-    characters: List['CharacterBase'] = Field(..., description='List of characters')
-    starships: List['StarshipBase'] = Field(..., description="List of starships")
+    """Schema for reading film data with relationships, null when not included"""
+    characters: List['CharacterBase'] | None = Field(None, description='List of characters')
+    starships: List['StarshipBase'] | None = Field(None, description="List of starships")
+
+    @model_validator(mode="before")
+    @classmethod
+    def skip_unloaded_relationships(cls, data):
+        return loaded_attributes(data)
 
 # Resolve circular references by importing after class definition
 from app.schemas.character import CharacterBase
@@ -41,3 +47,7 @@ FilmRead.model_rebuild()
 # Pagination helper type for character responses
 from app.schemas.pagination import PaginatedResponse
 PaginatedFilms = PaginatedResponse[FilmRead]
+
+# Batch get helper type for film responses
+from app.schemas.batch import BatchResponse
+BatchFilms = BatchResponse[FilmRead]
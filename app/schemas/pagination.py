@@ -9,10 +9,13 @@ class PaginatedResponse(GenericModel, Generic[T]):
     """
     Generic pagination schema to wrap lists of items with total count.
     Uses Pydantic generics for flexible typing.
+    `next_cursor` continues after the last item, or is None on the last page.
+    `total` is None when the count was not requested.
     """
     model_config = ConfigDict(
         alias_generator=to_camel,
         populate_by_name=True
     )
-    total: int
+    total: int | None = None
     items: List[T]
+    next_cursor: str | None = None
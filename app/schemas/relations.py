@@ -0,0 +1,13 @@
+from sqlalchemy import inspect
+
+
+def loaded_attributes(data):
+    """
+    Return the loaded attributes of an ORM instance as a dict, so that
+    relationships left out of a query read as missing instead of lazy loading.
+    Other data is returned unchanged.
+    """
+    if not hasattr(data, "_sa_instance_state"):
+        return data
+    state = inspect(data)
+    return {key: getattr(data, key) for key in state.mapper.attrs.keys() if key not in state.unloaded}
@@ -1,6 +1,7 @@
 from typing import List, Optional
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from pydantic.alias_generators import to_camel
+from app.schemas.relations import loaded_attributes
 
 
 class StarshipBase(BaseModel):
@@ -23,9 +24,14 @@ class StarshipCreate(BaseModel):
     character_ids: List[int] = Field(default_factory=list, example=[1])
 
 class StarshipRead(StarshipBase):
-    """Schema for reading starship data with relationships"""
-    films: List['FilmBase'] = Field(..., description="List of films the character appeared in")
-    characters: List['CharacterBase'] = Field(..., description="List of characters the character appeared in")
+    """Schema for reading starship data with relationships, null when not included"""
+    films: List['FilmBase'] | None = Field(None, description="List of films the character appeared in")
+    characters: List['CharacterBase'] | None = Field(None, description="List of characters the character appeared in")
+
+    @model_validator(mode="before")
+    @classmethod
+    def skip_unloaded_relationships(cls, data):
+        return loaded_attributes(data)
 
 # Resolve circular references by importing after class definition
 from app.schemas.film import FilmBase, CharacterBase
@@ -34,3 +40,7 @@ StarshipRead.model_rebuild()
 # Pagination helper type for character responses
 from app.schemas.pagination import PaginatedResponse
 PaginatedStarships = PaginatedResponse[StarshipRead]
+
+# Batch get helper type for starship responses
+from app.schemas.batch import BatchResponse
+BatchStarships = BatchResponse[StarshipRead]
@@ -0,0 +1,10 @@
+from typing import Literal
+from pydantic import BaseModel, ConfigDict
+
+
+class Suggestion(BaseModel):
+    """Schema for a typeahead suggestion"""
+    model_config = ConfigDict(from_attributes=True)
+    type: Literal["character", "starship", "film"]
+    id: int
+    name: str
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic.alias_generators import to_camel
+
+
+class SyncRunRead(BaseModel):
+    """Schema for reading a recorded sync run"""
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True
+    )
+    id: int
+    status: str
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    wall_seconds: Optional[float] = None
+    statements: Optional[int] = None
+    bytes_downloaded: Optional[int] = None
+
+class SchedulerStatus(BaseModel):
+    """Schema for the background sync scheduler state of the serving worker"""
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True
+    )
+    interval_seconds: float
+    is_leader: bool
+    running: bool
+    last_started: Optional[datetime] = None
+    last_finished: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+class SyncStatus(BaseModel):
+    """Schema for the sync status"""
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True
+    )
+    last_run: Optional[SyncRunRead] = Field(None, description="Most recent sync run of any worker")
+    scheduler: Optional[SchedulerStatus] = Field(None, description="Scheduler of this worker, if enabled")
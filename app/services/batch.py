@@ -0,0 +1,26 @@
+"""
+Batch gets of catalog rows by ID.
+"""
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# IDs accepted by one batch get
+MAX_BATCH_IDS = 100
+# Largest ID the databases can bind, a signed 64-bit integer
+MAX_ID = 2 ** 63 - 1
+
+
+async def batch_get(db: AsyncSession, model, ids: Iterable[int], options=()) -> dict:
+    """
+    Load the rows of `model` with the given IDs in one query, applying `options`
+    such as batched relationship loading.
+    Returns one entry per distinct ID in request order, holding either the row
+    or a not found error.
+    """
+    ids = list(dict.fromkeys(ids))
+    rows = {row.id: row for row in await db.scalars(select(model).where(model.id.in_(ids)).options(*options))}
+    return {"items": [
+        {"id": id_, "item": rows[id_]} if id_ in rows else {"id": id_, "error": f"{model.__name__} not found"}
+        for id_ in ids
+    ]}
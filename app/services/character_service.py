@@ -2,53 +2,95 @@
 Service layer for Star Wars characters.
 Handles database logic for listing, retrieving, and creating characters.
 """
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+import asyncio
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
+from app.db.search import search
 from app.models import Film, Starship, Character
+from app.models.character import parse_measure
 from app.schemas.character import CharacterCreate
+from app.services.batch import batch_get
+from app.services.pagination import paginate
+from app.services.response_cache import response_cache
 
+# Relationships a character can be read with, all loaded unless `include` names fewer
+CHARACTER_RELATIONS = ("films", "starships")
 
-def list_characters(db: Session, skip: int = 0, limit: int = 10, name: str | None = None):
+# Sort keys of the characters list, descending when prefixed with "-"
+CHARACTER_SORTS = {
+    "id": Character.id,
+    "name": Character.name,
+    "height": Character.height_num,
+    "mass": Character.mass_num,
+}
+
+
+async def list_characters(db: AsyncSession, skip: int = 0, limit: int = 10, name: str | None = None,
+                          min_height: float | None = None, max_height: float | None = None,
+                          min_mass: float | None = None, max_mass: float | None = None, sort: str | None = None,
+                          cursor: str | None = None, include: Iterable[str] = CHARACTER_RELATIONS,
+                          count: str = "exact"):
     """
-    Retrieve a paginated list of characters, optionally filtered by name (case-insensitive).
+    Retrieve a paginated list of characters, optionally filtered by name (case-insensitive)
+    and by height and mass ranges (inclusive), and sorted by a key of `CHARACTER_SORTS`.
+    Characters with an unknown height or mass are excluded by its range and sorted last.
+    Pages continue from `skip` or from the `cursor` of the previous page.
+    Relationships not named in `include` are left unloaded.
+    `count` selects an "exact", "estimated" or no ("none") total.
     """
-    query = db.query(Character).options(
-        joinedload(Character.films),
-        joinedload(Character.starships)
-    )
+    query = select(Character)
     if name:
-        query = query.filter(func.lower(Character.name).ilike(f"%{name.lower()}%"))
+        query = search(query, Character, name, db.get_bind().dialect.name)
+    for column, low, high in (
+            (Character.height_num, min_height, max_height),
+            (Character.mass_num, min_mass, max_mass),
+    ):
+        if low is not None:
+            query = query.where(column >= low)
+        if high is not None:
+            query = query.where(column <= high)
 
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
-    return {"total": total, "items": items}
+    return await paginate(
+        db, query, skip, limit, cursor, sort, CHARACTER_SORTS, ranked=bool(name),
+        options=[selectinload(getattr(Character, name)) for name in include], count=count,
+        filters=(name, min_height, max_height, min_mass, max_mass),
+    )
 
-def get_character(db: Session, character_id: int) -> Character:
+async def get_character(db: AsyncSession, character_id: int, include: Iterable[str] = CHARACTER_RELATIONS) -> Character:
     """
-    Retrieve a single character by ID, including related films and starships.
+    Retrieve a single character by ID, including the related films and starships named in `include`.
     Raises 404 if not found.
     """
-    character = (
-        db.query(Character)
-        .options(joinedload(Character.films), joinedload(Character.starships))
-        .filter(Character.id == character_id)
-        .first()
+    character = await db.scalar(
+        select(Character)
+        .options(*(selectinload(getattr(Character, name)) for name in include))
+        .where(Character.id == character_id)
     )
     if not character:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Character not found")
     return character
 
-def create_character(db: Session, character_in: CharacterCreate) -> Character:
+async def batch_get_characters(db: AsyncSession, ids: Iterable[int], include: Iterable[str] = CHARACTER_RELATIONS) -> dict:
+    """
+    Retrieve the characters with the given IDs in one query, loading the relationships
+    named in `include` with one batched query each. IDs without a character are
+    reported per item.
+    """
+    return await batch_get(db, Character, ids, [selectinload(getattr(Character, name)) for name in include])
+
+async def create_character(db: AsyncSession, character_in: CharacterCreate) -> Character:
     """
     Create a new character and associate it with existing films and starships.
     Validates that all related film and starship IDs exist.
     """
-    films = db.query(Film).filter(Film.id.in_(character_in.film_ids)).all()
+    films = (await db.scalars(select(Film).where(Film.id.in_(character_in.film_ids)))).all()
     if len(films) != len(set(character_in.film_ids)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or more films not found")
 
-    starships = db.query(Starship).filter(Starship.id.in_(character_in.starship_ids)).all()
+    starships = (await db.scalars(select(Starship).where(Starship.id.in_(character_in.starship_ids)))).all()
     if len(starships) != len(set(character_in.starship_ids)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or more starships not found")
 
@@ -57,10 +99,12 @@ def create_character(db: Session, character_in: CharacterCreate) -> Character:
         name=character_in.name,
         height=character_in.height,
         mass=character_in.mass,
+        height_num=parse_measure(character_in.height),
+        mass_num=parse_measure(character_in.mass),
         films=films,
         starships=starships
     )
     db.add(character)
-    db.commit()
-    db.refresh(character)
-    return character
+    await db.commit()
+    await asyncio.to_thread(response_cache.bump, "characters")
+    return await get_character(db, character.id)
@@ -2,53 +2,73 @@
 Service layer for Star Wars films.
 Handles database logic for listing, retrieving, and creating films.
 """
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+import asyncio
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
+from app.db.search import search
 from app.models import Film, Starship, Character
 from app.schemas.film import FilmCreate
+from app.services.batch import batch_get
+from app.services.pagination import paginate
+from app.services.response_cache import response_cache
 
+# Relationships a film can be read with, all loaded unless `include` names fewer
+FILM_RELATIONS = ("characters", "starships")
 
-def list_films(db: Session, skip: int = 0, limit: int = 10, title: str | None = None):
+
+async def list_films(db: AsyncSession, skip: int = 0, limit: int = 10, title: str | None = None,
+                     cursor: str | None = None, include: Iterable[str] = FILM_RELATIONS,
+                     count: str = "exact"):
     """
     Retrieve a paginated list of films, optionally filtered by title (case-insensitive).
+    Pages continue from `skip` or from the `cursor` of the previous page.
+    Relationships not named in `include` are left unloaded.
+    `count` selects an "exact", "estimated" or no ("none") total.
     """
-    query = db.query(Film).options(
-        joinedload(Film.characters),
-        joinedload(Film.starships)
-    )
+    query = select(Film)
     if title:
-        query = query.filter(func.lower(Film.title).ilike(f"%{title.lower()}%"))
+        query = search(query, Film, title, db.get_bind().dialect.name)
 
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
-    return {"total": total, "items": items}
+    return await paginate(
+        db, query, skip, limit, cursor, ranked=bool(title),
+        options=[selectinload(getattr(Film, name)) for name in include], count=count, filters=(title,),
+    )
 
-def get_film(db: Session, film_id: int) -> Film:
+async def get_film(db: AsyncSession, film_id: int, include: Iterable[str] = FILM_RELATIONS) -> Film:
     """
-    Retrieve a single film by ID, including related characters and starships.
+    Retrieve a single film by ID, including the related characters and starships named in `include`.
     Raises 404 if not found.
     """
-    film = (
-        db.query(Film)
-        .options(joinedload(Film.characters), joinedload(Film.starships))
-        .filter(Film.id == film_id)
-        .first()
+    film = await db.scalar(
+        select(Film)
+        .options(*(selectinload(getattr(Film, name)) for name in include))
+        .where(Film.id == film_id)
     )
     if not film:
         raise HTTPException(status_code=404, detail="Film not found")
     return film
 
-def create_film(db: Session, film_in: FilmCreate) -> Film:
+async def batch_get_films(db: AsyncSession, ids: Iterable[int], include: Iterable[str] = FILM_RELATIONS) -> dict:
+    """
+    Retrieve the films with the given IDs in one query, loading the relationships
+    named in `include` with one batched query each. IDs without a film are
+    reported per item.
+    """
+    return await batch_get(db, Film, ids, [selectinload(getattr(Film, name)) for name in include])
+
+async def create_film(db: AsyncSession, film_in: FilmCreate) -> Film:
     """
     Create a new film and associate it with existing characters and starships.
     Validates that all related character and starship IDs exist.
     """
-    characters = db.query(Character).filter(Character.id.in_(film_in.character_ids)).all()
+    characters = (await db.scalars(select(Character).where(Character.id.in_(film_in.character_ids)))).all()
     if len(characters) != len(set(film_in.character_ids)):
         raise HTTPException(status_code=404, detail="One or more characters not found")
 
-    starships = db.query(Starship).filter(Starship.id.in_(film_in.starship_ids)).all()
+    starships = (await db.scalars(select(Starship).where(Starship.id.in_(film_in.starship_ids)))).all()
     if len(starships) != len(set(film_in.starship_ids)):
         raise HTTPException(status_code=404, detail="One or more starships not found")
 
@@ -64,6 +84,6 @@ def create_film(db: Session, film_in: FilmCreate) -> Film:
         starships=starships
     )
     db.add(film)
-    db.commit()
-    db.refresh(film)
-    return film
+    await db.commit()
+    await asyncio.to_thread(response_cache.bump, "films")
+    return await get_film(db, film.id)
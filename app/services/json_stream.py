@@ -0,0 +1,186 @@
+"""
+Incremental parser for JSON arrays.
+Decodes the items of a top-level JSON array as text chunks arrive, so large
+SWAPI responses never have to be held in memory as a whole.
+"""
+import json
+import re
+
+_WHITESPACE = re.compile(r"\s*")
+# What ends or changes the scan of an item: inside a string, inside an array
+# or object, and after a top-level scalar
+_STRING_SPECIAL = re.compile(r'["\\]')
+_BRACKET = re.compile(r'["{}\[\]]')
+_SCALAR_END = re.compile(r"[\s,\]]")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JsonArrayParser:
+    """
+    Push parser for a top-level JSON array.
+
+    Feed it text chunks with `feed()`, which returns the items completed by each
+    chunk, and call `close()` once the input is exhausted. Only the current
+    partial item is buffered between chunks.
+
+    An item that does not decode from a single chunk is scanned for its end
+    as chunks arrive, resuming where the previous chunk left off, and decoded
+    once complete, so a large item costs time linear in its size and a
+    malformed one fails as soon as it ends.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        # One of: "start", "first", "item", "separator", "end"
+        self._state = "start"
+        # Chunks of the item being scanned, and the state of the scan: the
+        # closers of the open arrays and objects, and whether it is inside a
+        # string or just after a backslash
+        self._partial: list[str] | None = None
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> list:
+        """
+        Consume a chunk of text and return the array items it completed.
+        Raises ValueError on malformed input.
+        """
+        items = []
+        if self._partial is not None:
+            end = self._scan(text, 0)
+            self._partial.append(text)
+            if end is None:
+                return items
+            buffer, self._partial = "".join(self._partial), None
+            pos = len(buffer) - len(text) + end
+            items.append(self._decode(buffer, 0, pos))
+            self._state = "separator"
+        else:
+            buffer = self._buffer + text
+            pos = 0
+
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got: {buffer[pos:pos + 80]!r}")
+                self._state = "first"
+                pos += 1
+            elif self._state in ("first", "item"):
+                if self._state == "first" and char == "]":
+                    self._state = "end"
+                    pos += 1
+                    continue
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Most likely an item cut off by the chunk boundary
+                    end = None
+                if end is None or end == len(buffer) and not isinstance(item, (dict, list)):
+                    # Cut off, malformed, or a scalar that may continue in the next chunk
+                    end = self._scan(buffer, self._start(buffer, pos))
+                    if end is None:
+                        self._partial = [buffer[pos:]]
+                        self._buffer = ""
+                        return items
+                    item = self._decode(buffer, pos, end)
+                items.append(item)
+                self._state = "separator"
+                pos = end
+            elif self._state == "separator":
+                if char not in ",]":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got: {char!r}")
+                self._state = "item" if char == "," else "end"
+                pos += 1
+            else:
+                raise ValueError(f"Unexpected data after JSON array: {buffer[pos:pos + 80]!r}")
+
+        self._buffer = buffer[pos:]
+        return items
+
+    def close(self) -> list:
+        """
+        Signal the end of input and return any remaining item.
+        Raises ValueError if the array is incomplete.
+        """
+        if self._partial is not None:
+            self._buffer, self._partial = "".join(self._partial), None
+        items = []
+        if self._state in ("first", "item") and self._buffer.strip():
+            item, end = self._decoder.raw_decode(self._buffer, _WHITESPACE.match(self._buffer).end())
+            items.append(item)
+            self._buffer = self._buffer[end:]
+            self._state = "separator"
+            items.extend(self.feed(""))
+        if self._state != "end":
+            raise ValueError("Incomplete JSON array")
+        return items
+
+    def _decode(self, buffer: str, start: int, end: int):
+        """
+        Decode the complete item at `buffer[start:end]`.
+        """
+        item, stop = self._decoder.raw_decode(buffer, start)
+        if stop != end:
+            raise ValueError(f"Invalid JSON array item: {buffer[start:min(end, start + 80)]!r}")
+        return item
+
+    def _start(self, text: str, pos: int) -> int:
+        """
+        Start the scan of the item at `pos` and return where it continues.
+        """
+        self._stack, self._in_string, self._escaped = [], False, False
+        char = text[pos]
+        if char == '"':
+            self._in_string = True
+        elif char in _CLOSERS:
+            self._stack.append(_CLOSERS[char])
+        else:
+            return pos
+        return pos + 1
+
+    def _scan(self, text: str, pos: int) -> int | None:
+        """
+        Continue the scan of the current item from `pos`, and return the offset
+        just past its end, or None if it continues beyond `text`.
+        Raises ValueError on mismatched brackets.
+        """
+        stack = self._stack
+        while pos < len(text):
+            if self._escaped:
+                self._escaped = False
+                pos += 1
+            elif self._in_string:
+                match = _STRING_SPECIAL.search(text, pos)
+                if match is None:
+                    return None
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escaped = True
+                else:
+                    self._in_string = False
+                    if not stack:
+                        return pos
+            elif stack:
+                match = _BRACKET.search(text, pos)
+                if match is None:
+                    return None
+                char, pos = match.group(), match.end()
+                if char == '"':
+                    self._in_string = True
+                elif char in _CLOSERS:
+                    stack.append(_CLOSERS[char])
+                elif char != stack.pop():
+                    raise ValueError(f"Mismatched {char!r} in JSON array item")
+                elif not stack:
+                    return pos
+            else:
+                match = _SCALAR_END.search(text, pos)
+                return None if match is None else match.start()
+        return None
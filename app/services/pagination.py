@@ -0,0 +1,192 @@
+"""
+Offset and keyset pagination shared by the list endpoints.
+Keyset pages are ordered by a sort key and the ID, and continue after the
+last row of the previous page through an opaque cursor, so deep pages cost
+no more than the first and concurrent inserts do not shift the window.
+Totals come from the row counts kept by triggers when a list is unfiltered,
+and can be estimated from a cache or skipped when it is filtered.
+"""
+import base64
+import binascii
+import json
+import os
+import time
+from collections import OrderedDict
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.db.counts import get_row_count
+
+# Seconds an estimated count of a filtered list is reused; 0 disables caching
+COUNT_CACHE_SECONDS = float(os.getenv("COUNT_CACHE_SECONDS", "60") or 0)
+
+# Filtered counts kept per worker
+COUNT_CACHE_SIZE = 1024
+
+
+class CountCache:
+    """
+    Least recently used cache of filtered list counts, keyed by the table and
+    the filters of the list. An entry is reused for `ttl` seconds, as long as the
+    row count of its table has not changed.
+    """
+
+    def __init__(self, ttl: float = COUNT_CACHE_SECONDS, size: int = COUNT_CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+        self._entries: OrderedDict[tuple, tuple[float, int | None, int]] = OrderedDict()
+
+    def get(self, key: tuple, version: int | None) -> int | None:
+        """
+        Return the cached count for `key`, or None if it is missing, expired or
+        was cached at another table row count.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, cached_version, count = entry
+        if expires < time.monotonic() or cached_version != version:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return count
+
+    def put(self, key: tuple, version: int | None, count: int) -> None:
+        """
+        Cache the count for `key` at a table row count.
+        """
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, version, count)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+count_cache = CountCache()
+
+
+def encode_cursor(sort: str, values: list) -> str:
+    """
+    Encode the sort and the key values of the last row of a page as an opaque cursor.
+    """
+    payload = json.dumps([sort, *values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str, sort: str, columns: list) -> list:
+    """
+    Return the key values of a cursor created for `sort` over `columns`.
+    Raises 400 if the cursor is malformed, was created for another sort, or
+    holds a value that does not fit its column.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        payload = None
+    if (not isinstance(payload, list) or len(payload) != len(columns) + 1 or payload[0] != sort
+            or not all(_fits(column, value) for column, value in zip(columns, payload[1:]))):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return payload[1:]
+
+def _fits(column, value) -> bool:
+    """
+    Return whether a cursor value can be compared with `column`.
+    """
+    if value is None:
+        return _nullable(column)
+    python_type = column.expression.type.python_type
+    # JSON has no float type of its own, so whole numbers come back as int
+    accepted = (int, float) if python_type is float else python_type
+    return isinstance(value, accepted) and not isinstance(value, bool)
+
+def _nullable(column) -> bool:
+    return getattr(column.expression, "nullable", True)
+
+def _order(column, descending: bool):
+    order = column.desc() if descending else column.asc()
+    return order.nulls_last() if _nullable(column) else order
+
+def _after(columns: list, values: list, descending: bool) -> list:
+    """
+    Return conditions selecting the rows that follow `values` in (key, id)
+    order, with NULL keys last in both directions. Each condition is a single
+    index range; the rows with a NULL key get their own, since an OR of both
+    would make the database scan the index from the start.
+    """
+    if len(columns) == 1:
+        return [columns[0] < values[0] if descending else columns[0] > values[0]]
+    (column, id_column), (value, id_) = columns, values
+    if value is None:
+        return [and_(column.is_(None), id_column < id_ if descending else id_column > id_)]
+    after = tuple_(column, id_column) < (value, id_) if descending else tuple_(column, id_column) > (value, id_)
+    return [after, column.is_(None)] if _nullable(column) else [after]
+
+async def count_rows(db: AsyncSession, query: Select, filters: tuple = (), estimated: bool = False) -> int:
+    """
+    Count the rows of `query`.
+
+    Unfiltered queries read the row count of their table. Other queries are
+    counted, unless `estimated` allows a count cached by `count_cache` under
+    `filters`, the values the query was filtered by.
+    """
+    table_name = query.column_descriptions[0]["entity"].__tablename__
+    if query.whereclause is None:
+        rows = await get_row_count(db, table_name)
+        if rows is not None:
+            return rows
+    count_query = select(func.count()).select_from(query.subquery())
+    if not estimated:
+        return await db.scalar(count_query)
+
+    key = (table_name, filters)
+    version = await get_row_count(db, table_name)
+    total = count_cache.get(key, version)
+    if total is None:
+        total = await db.scalar(count_query)
+        count_cache.put(key, version, total)
+    return total
+
+async def paginate(db: AsyncSession, query: Select, skip: int = 0, limit: int = 10, cursor: str | None = None,
+                   sort: str | None = None, sorts: dict | None = None, ranked: bool = False, options=(),
+                   count: str = "exact", filters: tuple = ()) -> dict:
+    """
+    Count the rows of `query` and load one page of them.
+
+    Pages are ordered by `sort`, a key of `sorts` (ID only by default) prefixed
+    with "-" for descending, then by ID. A `ranked` query keeps its own
+    relevance order unless a sort or cursor is given; its pages can only be
+    reached with `skip`. With a `cursor`, the page starts after the row it
+    points to and `skip` is ignored. `next_cursor` points to the last row of
+    the page when more rows follow.
+
+    `count` is "exact", "estimated" (see `count_rows`, which caches by
+    `filters`) or "none", which leaves the total out.
+    """
+    entity = query.column_descriptions[0]["entity"]
+    sorts = sorts or {"id": entity.id}
+    keyed = sort is not None or cursor is not None or not ranked
+    sort = sort or "id"
+    descending = sort.startswith("-")
+    column = sorts[sort.lstrip("-")]
+    columns = [column] if column is entity.id else [column, entity.id]
+
+    total = None if count == "none" else await count_rows(db, query, filters, count == "estimated")
+    if keyed:
+        query = query.order_by(None).order_by(*(_order(c, descending) for c in columns))
+    query = query.options(*options)
+    if cursor is None:
+        items = (await db.scalars(query.offset(skip).limit(limit + 1))).unique().all()
+    else:
+        items = []
+        for condition in _after(columns, decode_cursor(cursor, sort, columns), descending):
+            result = await db.scalars(query.where(condition).limit(limit + 1 - len(items)))
+            items.extend(result.unique().all())
+            if len(items) > limit:
+                break
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        # A page of ranked rows, or an empty one, has no row to continue after
+        if keyed and items:
+            next_cursor = encode_cursor(sort, [getattr(items[-1], c.key) for c in columns])
+    return {"total": total, "items": items, "next_cursor": next_cursor}
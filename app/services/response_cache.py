@@ -0,0 +1,257 @@
+"""
+Cache of GET responses of the catalog endpoints.
+Responses are cached in a least recently used in-process tier and in a shared
+tier that all workers on the host read and write, under keys that include the
+data versions of the tables they were built from. Creates and syncs bump the
+versions of the tables they change, which invalidates exactly the responses
+built from them, in every worker.
+
+The shared tier blocks on file locks, so the request path reaches it through
+worker threads and never stalls the event loop.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Protocol
+
+logger = logging.getLogger(__name__)
+
+# Seconds a response is reused at most, as a bound for writes that do not bump a version; 0 disables caching
+RESPONSE_CACHE_SECONDS = float(os.getenv("RESPONSE_CACHE_SECONDS", "300") or 0)
+# Responses kept in each worker
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+# SQLite file shared by all workers on the host; empty keeps the cache and versions per process
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "./starwars.db.response-cache")
+
+# Tables whose data versions key cached responses
+CACHED_TABLES = ("films", "starships", "characters")
+
+
+class SharedTier(Protocol):
+    """
+    A cache tier and data version store shared by all workers.
+    """
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def put(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    def versions(self) -> dict[str, int] | None: ...
+
+    def bump(self, tables: Iterable[str]) -> None: ...
+
+    def clear(self) -> None: ...
+
+class MemoryTier:
+    """
+    In-process least recently used cache whose entries expire after a TTL.
+    """
+
+    def __init__(self, size: int = RESPONSE_CACHE_SIZE):
+        self.size = size
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+class SQLiteTier:
+    """
+    Shared tier in a SQLite file, which also holds the data versions.
+
+    Every operation is best effort: a locked or unavailable file reads as a
+    miss and skips the write, so the cache never fails a request. Reads and
+    cache writes give up after `timeout` seconds; only `bump` waits longer.
+    """
+
+    # Writes between purges of expired entries
+    PURGE_EVERY = 100
+
+    def __init__(self, path: str, timeout: float = 0.1):
+        self.path = path
+        self.timeout = timeout
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> bytes | None:
+        if not self._lock.acquire(timeout=self.timeout):
+            return None
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM entries WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        finally:
+            self._lock.release()
+        return row[0] if row else None
+
+    def put(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        if not self._lock.acquire(timeout=self.timeout):
+            return
+        try:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, value, now + ttl))
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+        except sqlite3.Error:
+            pass
+        finally:
+            self._lock.release()
+
+    def versions(self) -> dict[str, int] | None:
+        """
+        Return the data versions, or None if they cannot be read in time.
+        """
+        if not self._lock.acquire(timeout=self.timeout):
+            return None
+        try:
+            return dict(self._connect().execute("SELECT name, version FROM versions"))
+        except sqlite3.Error:
+            return None
+        finally:
+            self._lock.release()
+
+    def bump(self, tables: Iterable[str]) -> None:
+        # Unlike cache writes, a lost bump serves stale responses until they expire, so this waits for the lock
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("PRAGMA busy_timeout = 5000")
+                try:
+                    conn.executemany(
+                        "INSERT INTO versions VALUES (?, 1) ON CONFLICT (name) DO UPDATE SET version = version + 1",
+                        [(table,) for table in tables],
+                    )
+                finally:
+                    conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        except sqlite3.Error:
+            logger.exception("Bumping the data versions of %s failed", ", ".join(tables))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM entries")
+
+class ResponseCache:
+    """
+    Two-tier response cache keyed by request and data versions.
+
+    Lookups try the in-process tier, then the shared tier. Without a shared
+    tier, versions are kept in the process, so writes made by other processes
+    only show once entries expire.
+
+    `bump` blocks until the shared tier is updated; call it from async code
+    through `asyncio.to_thread`.
+    """
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_SECONDS, local: MemoryTier | None = None,
+                 shared: SharedTier | None = None):
+        self.ttl = ttl
+        self.local = local or MemoryTier()
+        self.shared = shared
+        self._versions = dict.fromkeys(CACHED_TABLES, 0)
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(shared=SQLiteTier(RESPONSE_CACHE_PATH) if RESPONSE_CACHE_PATH else None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def versions(self) -> dict[str, int] | None:
+        """
+        Return the current data version of each cached table, or None if the
+        shared tier cannot tell in time.
+        """
+        if self.shared is None:
+            return dict(self._versions)
+        versions = await asyncio.to_thread(self.shared.versions)
+        return None if versions is None else {table: 0 for table in CACHED_TABLES} | versions
+
+    async def key(self, request: str, tables: Iterable[str]) -> str | None:
+        """
+        Return the cache key of a request built from `tables` at their current
+        versions, or None if the versions are unavailable and the request must
+        bypass the cache.
+        """
+        versions = await self.versions()
+        if versions is None:
+            return None
+        return request + "#" + ",".join(f"{table}={versions[table]}" for table in sorted(tables))
+
+    async def get(self, key: str) -> bytes | None:
+        value = self.local.get(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+        if self.shared is not None:
+            value = await asyncio.to_thread(self.shared.get, key)
+            if value is not None:
+                self.stats["shared_hits"] += 1
+                self.local.put(key, value, self.ttl)
+                return value
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, value: bytes) -> None:
+        self.local.put(key, value, self.ttl)
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.put, key, value, self.ttl)
+
+    def bump(self, *tables: str) -> None:
+        """
+        Invalidate the responses built from `tables`. Call after the change is committed.
+        """
+        if self.shared is None:
+            for table in tables:
+                self._versions[table] += 1
+        else:
+            self.shared.bump(tables)
+
+    def clear(self) -> None:
+        """
+        Drop all cached responses and reset the statistics.
+        """
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+        self.stats = dict.fromkeys(self.stats, 0)
+
+response_cache = ResponseCache.from_env()
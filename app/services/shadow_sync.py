@@ -0,0 +1,149 @@
+"""
+Service layer for zero-downtime syncs of a live SQLite database.
+Builds the sync into a side database file and applies the result to the live
+database in one short, set-based transaction.
+"""
+import asyncio
+import os
+import sqlite3
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.models import Film, Starship, Character, SyncRun
+from app.services.response_cache import CACHED_TABLES, response_cache
+from app.services.sync_service import CHARACTER_RELATIONS, FILM_RELATIONS, STARSHIP_RELATIONS, run_sync
+
+# Entity tables in dependency order, with the association tables they own
+SHADOW_TABLES = (
+    (Film, FILM_RELATIONS),
+    (Starship, STARSHIP_RELATIONS),
+    (Character, CHARACTER_RELATIONS),
+)
+
+
+def shadow_path_for(db: Session) -> str:
+    """
+    Return the default side database file for the database behind the session.
+    """
+    database = db.get_bind().url.database
+    if not database or database == ":memory:" or database.startswith("file:"):
+        raise ValueError("Shadow sync needs an explicit shadow path for in-memory databases")
+    return f"{database}.shadow"
+
+async def run_shadow_sync(db: Session, shadow_path: str | None = None, **sync_kwargs) -> dict:
+    """
+    Sync SWAPI into a copy of the live database, then apply the result to it.
+
+    The live database is copied to `shadow_path` with the SQLite backup API,
+    `run_sync` writes into the copy, and the changed rows are applied to the
+    live database in a single transaction through an attached connection.
+    With the live database in WAL mode, readers never block on the sync or
+    the apply and see either the old or the new dataset, never a partial one.
+    Rows written through the API during the sync are kept.
+
+    Other databases already isolate readers from the single sync transaction,
+    so there the sync runs in place.
+
+    Keyword arguments are passed through to `run_sync`.
+    Returns upsert statistics keyed by resource.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return await run_sync(db, **sync_kwargs)
+    shadow_path = shadow_path or shadow_path_for(db)
+    _remove(shadow_path)
+    try:
+        last_run_id = copy_database(db, shadow_path)
+
+        engine = create_engine(f"sqlite:///{shadow_path}")
+        shadow_db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        try:
+            stats = await run_sync(shadow_db, **sync_kwargs)
+        except Exception:
+            # Keep the record of the failed run
+            apply_shadow(db, shadow_path, last_run_id, include_data=False)
+            raise
+        finally:
+            shadow_db.close()
+            engine.dispose()
+
+        apply_shadow(db, shadow_path, last_run_id)
+        await asyncio.to_thread(response_cache.bump, *CACHED_TABLES)
+    finally:
+        _remove(shadow_path)
+    return stats
+
+def apply_shadow(db: Session, shadow_path: str, last_run_id: int = 0, include_data: bool = True) -> None:
+    """
+    Apply the rows of the shadow database that differ from the live database.
+
+    Entity rows whose content hash differs are upserted and their association
+    rows replaced; sync state is replaced and sync runs recorded after
+    `last_run_id` are appended. Everything happens in one transaction.
+    With `include_data` False, only the sync runs are appended.
+    """
+    db.commit()
+    with db.get_bind().connect() as conn:
+        # ATTACH is not allowed inside a transaction, so it bypasses SQLAlchemy's BEGIN
+        raw = conn.connection.driver_connection
+        raw.execute("ATTACH DATABASE ? AS shadow", (shadow_path,))
+        try:
+            if include_data:
+                _apply_data(conn)
+            columns = ", ".join(column.name for column in SyncRun.__table__.columns if column.name != "id")
+            conn.exec_driver_sql(
+                f"INSERT INTO main.sync_runs ({columns}) SELECT {columns} FROM shadow.sync_runs WHERE id > ? ORDER BY id",
+                (last_run_id,),
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            raw.execute("DETACH DATABASE shadow")
+
+def _apply_data(conn) -> None:
+    """
+    Upsert the changed entities of the attached shadow database and replace their links.
+    """
+    conn.exec_driver_sql("CREATE TEMP TABLE IF NOT EXISTS shadow_changed (id INTEGER PRIMARY KEY)")
+    for model, relations in SHADOW_TABLES:
+        table = model.__tablename__
+        columns = [column.name for column in model.__table__.columns]
+        conn.exec_driver_sql("DELETE FROM temp.shadow_changed")
+        conn.exec_driver_sql(
+            f"INSERT INTO temp.shadow_changed SELECT s.id FROM shadow.{table} s "
+            f"LEFT JOIN main.{table} m ON m.id = s.id "
+            f"WHERE m.id IS NULL OR m.content_hash IS NOT s.content_hash"
+        )
+        conn.exec_driver_sql(
+            f"INSERT INTO main.{table} ({', '.join(columns)}) "
+            f"SELECT {', '.join(columns)} FROM shadow.{table} WHERE id IN (SELECT id FROM temp.shadow_changed) "
+            f"ON CONFLICT (id) DO UPDATE SET "
+            + ", ".join(f"{column} = excluded.{column}" for column in columns if column != "id")
+        )
+        for link_table, owner_column, target_column, _ in relations.values():
+            changed = f"{owner_column} IN (SELECT id FROM temp.shadow_changed)"
+            conn.exec_driver_sql(f"DELETE FROM main.{link_table.name} WHERE {changed}")
+            conn.exec_driver_sql(
+                f"INSERT INTO main.{link_table.name} ({owner_column}, {target_column}) "
+                f"SELECT {owner_column}, {target_column} FROM shadow.{link_table.name} WHERE {changed}"
+            )
+    conn.exec_driver_sql("INSERT OR REPLACE INTO main.sync_state SELECT * FROM shadow.sync_state")
+    conn.exec_driver_sql("DROP TABLE temp.shadow_changed")
+
+def copy_database(db: Session, path: str) -> int:
+    """
+    Copy the live database to `path` with the online backup API.
+    Returns the ID of the last recorded sync run in the copy.
+    """
+    target = sqlite3.connect(path)
+    try:
+        with db.get_bind().connect() as conn:
+            conn.connection.driver_connection.backup(target)
+        return target.execute("SELECT coalesce(max(id), 0) FROM sync_runs").fetchone()[0]
+    finally:
+        target.close()
+
+def _remove(path: str) -> None:
+    for name in (path, f"{path}-journal", f"{path}-wal", f"{path}-shm"):
+        if os.path.exists(name):
+            os.remove(name)
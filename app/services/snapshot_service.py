@@ -0,0 +1,125 @@
+"""
+Service layer for offline dataset snapshots.
+Exports and imports the full dataset (entities, association tables, and sync
+state) as gzip-compressed NDJSON or as a SQLite backup file.
+"""
+import gzip
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+from sqlalchemy import DateTime, Table, delete, select
+from sqlalchemy.orm import Session
+from app.models import Film, Starship, Character, SyncState
+from app.models.character import character_film, character_starship
+from app.models.starship import starship_film_association
+from app.services.response_cache import CACHED_TABLES, response_cache
+from app.services.sync_service import BATCH_SIZE, batched, reset_id_sequences
+
+SNAPSHOT_FORMATS = ("ndjson", "sqlite")
+SNAPSHOT_VERSION = 1
+
+# Tables in load order: entities before the association tables referencing them
+SNAPSHOT_TABLES: tuple[Table, ...] = (
+    Film.__table__,
+    Starship.__table__,
+    Character.__table__,
+    starship_film_association,
+    character_film,
+    character_starship,
+    SyncState.__table__,
+)
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_SQLITE_MAGIC = b"SQLite format 3\x00"
+
+
+def export_snapshot(db: Session, path: str, snapshot_format: str = "ndjson") -> dict:
+    """
+    Write the full dataset to `path` in the given format.
+    Returns the number of exported rows per table (empty for SQLite backups).
+    """
+    if snapshot_format == "sqlite":
+        target = sqlite3.connect(path)
+        with _sqlite_connection(db) as source:
+            source.backup(target)
+        target.close()
+        return {}
+    if snapshot_format != "ndjson":
+        raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+
+    counts = {}
+    with gzip.open(path, "wt", encoding="utf-8") as out:
+        out.write(json.dumps({"snapshot": SNAPSHOT_VERSION}) + "\n")
+        for table in SNAPSHOT_TABLES:
+            counts[table.name] = 0
+            rows = db.execute(select(table), execution_options={"yield_per": BATCH_SIZE}).mappings()
+            for row in rows:
+                out.write(json.dumps({"table": table.name, "row": dict(row)}, default=datetime.isoformat) + "\n")
+                counts[table.name] += 1
+    return counts
+
+def import_snapshot(db: Session, path: str) -> dict:
+    """
+    Replace the full dataset with the contents of the snapshot at `path`.
+    The format is detected from the file header.
+    Returns the number of imported rows per table (empty for SQLite backups).
+    """
+    with open(path, "rb") as f:
+        header = f.read(len(_SQLITE_MAGIC))
+
+    if header.startswith(_SQLITE_MAGIC):
+        db.rollback()
+        source = sqlite3.connect(path)
+        with _sqlite_connection(db) as target:
+            source.backup(target)
+        source.close()
+        response_cache.bump(*CACHED_TABLES)
+        return {}
+    if not header.startswith(_GZIP_MAGIC):
+        raise ValueError(f"Unrecognized snapshot file: {path}")
+
+    tables = {table.name: table for table in SNAPSHOT_TABLES}
+    counts = {table.name: 0 for table in SNAPSHOT_TABLES}
+    try:
+        for table in reversed(SNAPSHOT_TABLES):
+            db.execute(delete(table))
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            meta = json.loads(f.readline())
+            if meta.get("snapshot") != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version: {meta.get('snapshot')}")
+            records = (json.loads(line) for line in f)
+            for batch in batched(records, BATCH_SIZE):
+                for name in dict.fromkeys(r["table"] for r in batch):
+                    table = tables[name]
+                    rows = [_decode_row(table, r["row"]) for r in batch if r["table"] == name]
+                    db.execute(table.insert(), rows)
+                    counts[name] += len(rows)
+        reset_id_sequences(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    response_cache.bump(*CACHED_TABLES)
+    return counts
+
+def _decode_row(table: Table, row: dict) -> dict:
+    """
+    Convert JSON values back to the Python types expected by the table columns.
+    """
+    for column in table.columns:
+        if isinstance(column.type, DateTime) and isinstance(row.get(column.name), str):
+            row[column.name] = datetime.fromisoformat(row[column.name])
+    return row
+
+@contextmanager
+def _sqlite_connection(db: Session) -> Iterator[sqlite3.Connection]:
+    """
+    Check out a raw sqlite3 connection from the session's engine, outside any transaction.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        raise ValueError("SQLite snapshots require a SQLite database")
+    with db.get_bind().connect() as conn:
+        yield conn.connection.driver_connection
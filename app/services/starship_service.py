@@ -2,54 +2,74 @@
 Service layer for Star Wars starships.
 Handles database logic for listing, retrieving, and creating starships.
 """
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+import asyncio
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
+from app.db.search import search
 from app.models import Film, Starship, Character
 from app.schemas.starship import StarshipCreate
+from app.services.batch import batch_get
+from app.services.pagination import paginate
+from app.services.response_cache import response_cache
 
+# Relationships a starship can be read with, all loaded unless `include` names fewer
+STARSHIP_RELATIONS = ("characters", "films")
 
-def list_starships(db: Session, skip: int = 0, limit: int = 10, name: str | None = None):
+
+async def list_starships(db: AsyncSession, skip: int = 0, limit: int = 10, name: str | None = None,
+                         cursor: str | None = None, include: Iterable[str] = STARSHIP_RELATIONS,
+                         count: str = "exact"):
     """
     Retrieve a paginated list of starship, optionally filtered by name (case-insensitive).
+    Pages continue from `skip` or from the `cursor` of the previous page.
+    Relationships not named in `include` are left unloaded.
+    `count` selects an "exact", "estimated" or no ("none") total.
     """
-    query = db.query(Starship).options(
-        joinedload(Starship.films),
-        joinedload(Starship.characters)
-    )
+    query = select(Starship)
     if name:
-        query = query.filter(func.lower(Starship.name).ilike(f"%{name.lower()}%"))
+        query = search(query, Starship, name, db.get_bind().dialect.name)
 
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
-    return {"total": total, "items": items}
+    return await paginate(
+        db, query, skip, limit, cursor, ranked=bool(name),
+        options=[selectinload(getattr(Starship, name)) for name in include], count=count, filters=(name,),
+    )
 
-def get_starship(db: Session, starship_id: int) -> Starship:
+async def get_starship(db: AsyncSession, starship_id: int, include: Iterable[str] = STARSHIP_RELATIONS) -> Starship:
     """
-    Retrieve a single staship by ID, including related characters and films.
+    Retrieve a single staship by ID, including the related characters and films named in `include`.
     Raises 404 if not found.
     """
-    starship = (
-        db.query(Starship)
-        .options(joinedload(Starship.characters), joinedload(Starship.films))
-        .filter(Starship.id == starship_id)
-        .first()
+    starship = await db.scalar(
+        select(Starship)
+        .options(*(selectinload(getattr(Starship, name)) for name in include))
+        .where(Starship.id == starship_id)
     )
     if not starship:
         raise HTTPException(status_code=404, detail="Starship not found")
     return starship
 
-def create_starship(db: Session, starship_in: StarshipCreate) -> Starship:
+async def batch_get_starships(db: AsyncSession, ids: Iterable[int], include: Iterable[str] = STARSHIP_RELATIONS) -> dict:
+    """
+    Retrieve the starships with the given IDs in one query, loading the relationships
+    named in `include` with one batched query each. IDs without a starship are
+    reported per item.
+    """
+    return await batch_get(db, Starship, ids, [selectinload(getattr(Starship, name)) for name in include])
+
+async def create_starship(db: AsyncSession, starship_in: StarshipCreate) -> Starship:
     """
     Create a new starship and associate it with existing films and characters.
     Validates that all related film and character IDs exist.
     """
-    films = db.query(Film).filter(Film.id.in_(starship_in.film_ids)).all()
+    films = (await db.scalars(select(Film).where(Film.id.in_(starship_in.film_ids)))).all()
     if len(films) != len(set(starship_in.film_ids)):
         raise HTTPException(status_code=404, detail="One or more films not found")
 
-    characters = db.query(Character).filter(Character.id.in_(starship_in.character_ids)).all()
+    characters = (await db.scalars(select(Character).where(Character.id.in_(starship_in.character_ids)))).all()
     if len(characters) != len(set(starship_in.character_ids)):
         raise HTTPException(status_code=404, detail="One or more characters not found")
 
@@ -61,6 +81,6 @@ def create_starship(db: Session, starship_in: StarshipCreate) -> Starship:
         characters=characters
     )
     db.add(starship)
-    db.commit()
-    db.refresh(starship)
-    return starship
+    await db.commit()
+    await asyncio.to_thread(response_cache.bump, "starships")
+    return await get_starship(db, starship.id)
@@ -0,0 +1,253 @@
+"""
+In-memory prefix index for typeahead suggestions.
+Each worker keeps the names of all characters, starships and films in a sorted
+index and answers prefix queries with a binary search, without touching the
+database. The index is built at startup and kept current by polling a cheap
+data version.
+"""
+import asyncio
+import logging
+import os
+import re
+from array import array
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable
+from sqlalchemy import func, select
+from app.db.deps import get_db
+from app.models import Character, Film, Starship, SyncRun
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for new rows and syncs; 0 disables refreshing
+SUGGEST_REFRESH_INTERVAL = float(os.getenv("SUGGEST_REFRESH_SECONDS", "5") or 0)
+
+# Suggestion types with the model and name column they are built from
+SUGGEST_SOURCES = {
+    "character": (Character, Character.name),
+    "starship": (Starship, Starship.name),
+    "film": (Film, Film.title),
+}
+KINDS = tuple(SUGGEST_SOURCES)
+
+
+# Bits of a key reference holding the offset of a word in its entry's text
+OFFSET_BITS = 16
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"[^\W_]+", text.lower())
+
+def _text(name: str) -> str:
+    """
+    Return the lowercased words of a name, separated by single spaces, cut to
+    where word offsets still fit a key reference.
+    """
+    return " ".join(_words(name))[:OFFSET_MASK]
+
+def _offsets(text: str) -> list[int]:
+    """
+    Return the offset of each word in `text`, so that a query matches the start of any word.
+    """
+    return [0, *(offset + 1 for offset, char in enumerate(text) if char == " ")] if text else []
+
+def _suffix(texts: list[str]) -> Callable[[int], str]:
+    """
+    Return a function of a key reference to the text it stands for.
+    """
+    return lambda ref: texts[ref >> OFFSET_BITS][ref & OFFSET_MASK:]
+
+class SuggestIndex:
+    """
+    Sorted prefix index over the names of all suggestion types.
+
+    Keys are the lowercased name from each word onwards ("luke skywalker" and
+    "skywalker"). Rather than as strings, each key is stored in one sorted
+    array as a reference to its entry and the offset of the word it starts at,
+    and entries are numbered rows of parallel arrays. A query binary-searches
+    its first key and walks forward while keys still start with it.
+
+    Rebuilds run in a worker thread on fresh structures, which are swapped in
+    on the event loop; entries added meanwhile are added again afterwards.
+    """
+
+    def __init__(self, session_provider: Callable[[], AsyncIterator] = get_db,
+                 interval: float = SUGGEST_REFRESH_INTERVAL):
+        self.session_provider = session_provider
+        self.interval = interval
+        # Max IDs of the suggestion tables and of sync_runs at the last refresh
+        self.version: tuple | None = None
+        # Per entry number: its type (a position in KINDS), ID, name and lowercased text
+        self._kinds = array("B")
+        self._ids = array("q")
+        self._names: list[str] = []
+        self._texts: list[str] = []
+        # Per type: the sorted IDs of its indexed entries and their entry numbers
+        self._lookup: dict[str, tuple[array, array]] = {kind: (array("q"), array("q")) for kind in KINDS}
+        # Sorted key references: entry number << OFFSET_BITS | word offset
+        self._keys = array("q")
+        # Entries added during a rebuild, to add again once it is swapped in
+        self._pending: list[tuple[str, int, str | None]] | None = None
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids, _ in self._lookup.values())
+
+    def build(self, rows: Iterable[tuple[str, int, str]]) -> None:
+        """
+        Replace the index with `(type, id, name)` rows, one per type and ID.
+        """
+        self._swap(self._built(rows))
+
+    @staticmethod
+    def _built(rows: Iterable[tuple[str, int, str]]) -> tuple:
+        """
+        Return the structures of an index of `(type, id, name)` rows, one per
+        type and ID. Touches no state of the index, so it can run in a worker thread.
+        """
+        kinds, ids, names = array("B"), array("q"), []
+        for kind, id_, name in rows:
+            if name:
+                kinds.append(KINDS.index(kind))
+                ids.append(id_)
+                names.append(name)
+        texts = [_text(name) for name in names]
+        lookup = {}
+        for code, kind in enumerate(KINDS):
+            numbers = sorted((number for number, of in enumerate(kinds) if of == code), key=ids.__getitem__)
+            lookup[kind] = (array("q", (ids[number] for number in numbers)), array("q", numbers))
+        # Sorting by suffix creates each key string; sort by first letter so that
+        # only one letter's strings exist at a time
+        buckets: dict[str, array] = {}
+        for number, text in enumerate(texts):
+            for offset in _offsets(text):
+                buckets.setdefault(text[offset], array("q")).append(number << OFFSET_BITS | offset)
+        keys, suffix = array("q"), _suffix(texts)
+        for first in sorted(buckets):
+            keys.extend(sorted(buckets.pop(first), key=suffix))
+        return kinds, ids, names, texts, lookup, keys
+
+    def _swap(self, built: tuple) -> None:
+        self._kinds, self._ids, self._names, self._texts, self._lookup, self._keys = built
+
+    def add(self, kind: str, id_: int, name: str | None) -> None:
+        """
+        Add or rename a single entry.
+        """
+        if self._pending is not None:
+            self._pending.append((kind, id_, name))
+        ids, numbers = self._lookup[kind]
+        position = bisect_left(ids, id_)
+        number = numbers[position] if position < len(ids) and ids[position] == id_ else None
+        if number is not None and self._names[number] == name:
+            return
+        suffix = _suffix(self._texts)
+        if number is not None:
+            text = self._texts[number]
+            for offset in _offsets(text):
+                ref = number << OFFSET_BITS | offset
+                at = bisect_left(self._keys, text[offset:], key=suffix)
+                while self._keys[at] != ref:
+                    at += 1
+                del self._keys[at]
+            del ids[position], numbers[position]
+        if name:
+            text = _text(name)
+            if number is None:
+                number = len(self._names)
+                self._kinds.append(KINDS.index(kind))
+                self._ids.append(id_)
+                self._names.append(name)
+                self._texts.append(text)
+            self._names[number], self._texts[number] = name, text
+            for offset in _offsets(text):
+                self._keys.insert(bisect_left(self._keys, text[offset:], key=suffix), number << OFFSET_BITS | offset)
+            ids.insert(position, id_)
+            numbers.insert(position, number)
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict]:
+        """
+        Return up to `limit` entries with a word starting with `query`,
+        in alphabetical order of the matched text.
+        """
+        prefix = " ".join(_words(query))
+        if not prefix:
+            return []
+        keys, kinds, ids, names, texts = self._keys, self._kinds, self._ids, self._names, self._texts
+        results, seen = [], set()
+        position = bisect_left(keys, prefix, key=_suffix(texts))
+        while position < len(keys) and len(results) < limit:
+            number, offset = keys[position] >> OFFSET_BITS, keys[position] & OFFSET_MASK
+            if not texts[number].startswith(prefix, offset):
+                break
+            if number not in seen:
+                seen.add(number)
+                results.append({"type": KINDS[kinds[number]], "id": ids[number], "name": names[number]})
+            position += 1
+        return results
+
+    async def refresh(self) -> bool:
+        """
+        Bring the index up to date with the database.
+
+        New rows are added when only the max IDs moved (e.g. creates through
+        another worker); the index is rebuilt after a sync, which can rename
+        existing rows. Returns whether anything changed.
+        """
+        async with self._session() as db:
+            version = tuple((await db.execute(select(
+                *(select(func.max(model.id)).scalar_subquery() for model, _ in SUGGEST_SOURCES.values()),
+                select(func.max(SyncRun.id)).scalar_subquery(),
+            ))).one())
+            if version == self.version:
+                return False
+            if self.version is None or version[-1] != self.version[-1]:
+                self._pending = []
+                try:
+                    rows = []
+                    for kind, (model, name) in SUGGEST_SOURCES.items():
+                        rows.extend((kind, id_, value) for id_, value in await db.execute(select(model.id, name)))
+                    built = await asyncio.to_thread(self._built, rows)
+                finally:
+                    pending, self._pending = self._pending, None
+                self._swap(built)
+                for kind, id_, name in pending:
+                    self.add(kind, id_, name)
+            else:
+                for (kind, (model, name)), last_id in zip(SUGGEST_SOURCES.items(), self.version):
+                    for id_, value in await db.execute(select(model.id, name).where(model.id > (last_id or 0))):
+                        self.add(kind, id_, value)
+            self.version = version
+        return True
+
+    async def start(self) -> None:
+        """
+        Build the index, then refresh it every `interval` seconds on the running event loop.
+        """
+        await self._refresh_logged()
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """
+        Stop refreshing.
+        """
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._refresh_logged()
+
+    async def _refresh_logged(self) -> None:
+        # Serve what is already indexed if the database is unavailable, e.g. not initialized yet
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Refreshing the suggestion index failed")
+
+    def _session(self):
+        return asynccontextmanager(self.session_provider)()
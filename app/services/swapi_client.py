@@ -1,38 +1,479 @@
 """
 Client module for fetching data from the external SWAPI (https://swapi.info/api).
-Handles asynchronous retrieval of films, starships, and characters.
+Handles asynchronous retrieval of films, starships, and characters,
+including streaming responses that are parsed as they are downloaded and
+paginated responses whose pages are fetched concurrently.
 """
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator
+from urllib.parse import urlencode
 import httpx
+from app.services.json_stream import JsonArrayParser
 
 BASE_URL = "https://swapi.info/api"
+# Mirror base URLs, tried in order; configurable as a comma-separated list
+BASE_URLS = [url for url in os.getenv("SWAPI_BASE_URLS", BASE_URL).split(",") if url]
 
-async def fetch_films():
+# Default connection pool limits for the shared SWAPI client
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE_CONNECTIONS = 10
+TIMEOUT = 30.0
+# Size of the text chunks fed to the streaming JSON parser
+CHUNK_SIZE = 64 * 1024
+# Maximum number of pages of a paginated resource fetched ahead of the consumer
+PAGE_WINDOW = 16
+
+# Request scheduling defaults
+MAX_CONNECTIONS_PER_HOST = 6
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+def create_client(
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        **kwargs
+) -> httpx.AsyncClient:
+    """
+    Create a pooled keep-alive HTTP client to be shared by all SWAPI fetches.
+    Extra keyword arguments are passed through to `httpx.AsyncClient`.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(max_keepalive_connections, max_connections),
+    )
+    return httpx.AsyncClient(limits=limits, timeout=TIMEOUT, **kwargs)
+
+@dataclass
+class RequestTiming:
+    """
+    Timing of a single upstream HTTP request, relative to the scheduler's creation.
+    """
+    url: str
+    attempt: int
+    hedged: bool
+    started: float
+    status: int | None = None
+    # Seconds until the response headers arrived, and until the response was closed
+    elapsed: float | None = None
+    total: float | None = None
+    error: str | None = None
+
+@dataclass
+class FetchStats:
+    """
+    Totals of the upstream work done for one resource.
+    Seconds spent waiting on the network (`fetch_seconds`) and decoding JSON
+    (`parse_seconds`) are summed over requests, which may overlap for
+    concurrently fetched pages.
+    """
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    bytes_downloaded: int = 0
+    requests: int = 0
+
+class FetchScheduler:
+    """
+    Schedules upstream SWAPI requests.
+
+    - caps concurrent requests per host
+    - retries transport errors, 429 and 5xx responses with jittered
+      exponential backoff, honouring `Retry-After`
+    - optionally hedges: when a mirror has not answered within `hedge_delay`
+      seconds, the same request is also sent to the next mirror and the first
+      good response wins
+    - records a `RequestTiming` for every request sent
+    """
+
+    def __init__(
+            self,
+            base_urls: list[str] | None = None,
+            max_per_host: int = MAX_CONNECTIONS_PER_HOST,
+            max_retries: int = MAX_RETRIES,
+            backoff_base: float = BACKOFF_BASE,
+            backoff_max: float = BACKOFF_MAX,
+            hedge_delay: float | None = None
+    ):
+        self.base_urls = [url.rstrip("/") for url in (base_urls or BASE_URLS)]
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_delay = hedge_delay
+        self.timings: list[RequestTiming] = []
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._open: dict[int, RequestTiming] = {}
+        self._started = time.perf_counter()
+
+    @asynccontextmanager
+    async def stream(self, client: httpx.AsyncClient, path: str, headers: dict | None = None
+                     ) -> AsyncIterator[httpx.Response]:
+        """
+        Send a GET for `path` (relative to the base URLs) and yield the response
+        once its headers arrive, after retries and hedging. The body is left
+        unread; the response is closed when the context exits.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._hedged(client, path, headers or {}, attempt)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            if _is_retryable(response.status_code) and attempt < self.max_retries:
+                delay = _retry_after(response)
+                await self._close(response)
+                await asyncio.sleep(min(delay, self.backoff_max) if delay is not None else self._backoff(attempt))
+                continue
+
+            try:
+                yield response
+            finally:
+                await self._close(response)
+            return
+
+    def _backoff(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff delay for the given attempt.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _hedged(self, client: httpx.AsyncClient, path: str, headers: dict, attempt: int) -> httpx.Response:
+        """
+        Send the request to the mirrors, starting with a different one on each
+        attempt, and return the first good response. Without a hedge delay, or
+        with a single mirror, only one request is sent.
+        """
+        start = attempt % len(self.base_urls)
+        urls = [f"{base}/{path}" for base in self.base_urls[start:] + self.base_urls[:start]]
+        if self.hedge_delay is None or len(urls) == 1:
+            return await self._send(client, urls[0], headers, attempt, hedged=False)
+
+        tasks = [asyncio.create_task(self._send(client, urls[0], headers, attempt, hedged=False))]
+        pending = set(tasks)
+        winner, failure = None, None
+        try:
+            while pending and winner is None:
+                timeout = self.hedge_delay if len(tasks) < len(urls) else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if winner is None and task.exception() is None and not _is_retryable(task.result().status_code):
+                        winner = task
+                    else:
+                        failure = task
+                if winner is None and len(tasks) < len(urls):
+                    # Hedge: the request is slow or failed, try the next mirror too
+                    task = asyncio.create_task(self._send(client, urls[len(tasks)], headers, attempt, hedged=True))
+                    tasks.append(task)
+                    pending.add(task)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            keep = winner or failure
+            for task in tasks:
+                if task is not keep and task.done() and not task.cancelled() and task.exception() is None:
+                    await self._close(task.result())
+
+        if winner is not None:
+            return winner.result()
+        # Every mirror failed: surface the last failure to the retry loop
+        if failure.exception() is not None:
+            raise failure.exception()
+        return failure.result()
+
+    async def _send(self, client: httpx.AsyncClient, url: str, headers: dict, attempt: int,
+                    hedged: bool) -> httpx.Response:
+        """
+        Send one streaming request, holding a slot of the host's semaphore
+        until the response is closed.
+        """
+        host = httpx.URL(url).host
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        await semaphore.acquire()
+        timing = RequestTiming(url=url, attempt=attempt, hedged=hedged, started=self._now())
+        self.timings.append(timing)
+        try:
+            response = await client.send(client.build_request("GET", url, headers=headers), stream=True)
+        except BaseException as exc:
+            timing.error = repr(exc)
+            timing.elapsed = timing.total = self._now() - timing.started
+            semaphore.release()
+            raise
+        timing.status = response.status_code
+        timing.elapsed = self._now() - timing.started
+        self._open[id(response)] = timing
+        return response
+
+    async def _close(self, response: httpx.Response) -> None:
+        """
+        Close a response and release its host slot.
+        """
+        await response.aclose()
+        timing = self._open.pop(id(response), None)
+        if timing is not None:
+            timing.total = self._now() - timing.started
+            self._semaphores[response.request.url.host].release()
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._started
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """
+    Parse the `Retry-After` header (seconds or HTTP date) into a delay in seconds.
+    """
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+async def fetch_films(client: httpx.AsyncClient | None = None, base_url: str = BASE_URL,
+                      scheduler: FetchScheduler | None = None):
     """
     Fetch all films from SWAPI.
     """
-    return await fetch_all("films")
+    return await fetch_all("films", client, base_url, scheduler)
 
-async def fetch_starships():
+async def fetch_starships(client: httpx.AsyncClient | None = None, base_url: str = BASE_URL,
+                          scheduler: FetchScheduler | None = None):
     """
     Fetch all starships from SWAPI.
     """
-    return await fetch_all("starships")
+    return await fetch_all("starships", client, base_url, scheduler)
 
-async def fetch_characters():
+async def fetch_characters(client: httpx.AsyncClient | None = None, base_url: str = BASE_URL,
+                           scheduler: FetchScheduler | None = None):
     """
     Fetch all characters (people) from SWAPI.
     """
-    return await fetch_all("people")
+    return await fetch_all("people", client, base_url, scheduler)
 
-async def fetch_all(resource: str):
+async def fetch_all(resource: str, client: httpx.AsyncClient | None = None, base_url: str = BASE_URL,
+                    scheduler: FetchScheduler | None = None):
     """
     Generic SWAPI fetcher for a given resource.
-    Raises an error if the response is not a list.
+    Uses the given shared client, or a short-lived one if none is passed.
+    Accepts both plain lists and paginated `{count, next, results}` responses.
     """
-    async with httpx.AsyncClient() as client:
-        res = await client.get(f"{BASE_URL}/{resource}")
+    data, _ = await fetch_conditional(resource, client, base_url, scheduler=scheduler)
+    return data
+
+async def fetch_conditional(
+        resource: str,
+        client: httpx.AsyncClient | None = None,
+        base_url: str = BASE_URL,
+        etag: str | None = None,
+        if_modified_since: str | None = None,
+        scheduler: FetchScheduler | None = None
+) -> tuple[list | None, dict]:
+    """
+    Fetch a SWAPI resource unless it is unchanged since the given validators.
+
+    Sends `If-None-Match` / `If-Modified-Since` when an ETag or date is given.
+    Returns `(None, validators)` on 304 Not Modified, otherwise the records and
+    the `etag` / `last_modified` validators of the response.
+    """
+    async with stream_conditional(resource, client, base_url, etag, if_modified_since, scheduler) as (records, validators):
+        if records is None:
+            return None, validators
+        return [record async for record in records], validators
+
+@asynccontextmanager
+async def stream_conditional(
+        resource: str,
+        client: httpx.AsyncClient | None = None,
+        base_url: str = BASE_URL,
+        etag: str | None = None,
+        if_modified_since: str | None = None,
+        scheduler: FetchScheduler | None = None,
+        stats: FetchStats | None = None
+) -> AsyncIterator[tuple[AsyncIterator[dict] | None, dict]]:
+    """
+    Open a streaming request for a SWAPI resource.
+
+    Requests go through `scheduler`, which then supplies the base URLs, or
+    through a default scheduler for `base_url`.
+
+    Yields `(records, validators)`, where `records` is an async iterator of the
+    records parsed incrementally from the response body, or None on 304 Not
+    Modified. The response is closed when the context exits. When `stats` is
+    given, the network time, parse time and bytes of all requests made for
+    the resource are added to it.
+    """
+    if client is None:
+        async with create_client() as client:
+            async with stream_conditional(resource, client, base_url, etag, if_modified_since, scheduler,
+                                          stats) as result:
+                yield result
+        return
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if if_modified_since:
+        headers["If-Modified-Since"] = if_modified_since
+
+    scheduler = scheduler or FetchScheduler([base_url])
+    started = time.perf_counter()
+    async with scheduler.stream(client, resource, headers) as res:
+        if stats is not None:
+            stats.fetch_seconds += time.perf_counter() - started
+            stats.requests += 1
+        if res.status_code == 304:
+            yield None, {"etag": etag, "last_modified": if_modified_since}
+            return
         res.raise_for_status()
-        data = res.json()
-        if not isinstance(data, list):
+        yield iter_records(res, client, scheduler, resource, stats), {
+            "etag": res.headers.get("etag"),
+            "last_modified": res.headers.get("last-modified"),
+        }
+
+async def iter_records(
+        res: httpx.Response,
+        client: httpx.AsyncClient | None = None,
+        scheduler: FetchScheduler | None = None,
+        resource: str | None = None,
+        stats: FetchStats | None = None
+) -> AsyncIterator[dict]:
+    """
+    Parse the records of a SWAPI response body as it is downloaded.
+
+    A JSON list is parsed incrementally. A paginated `{count, next, results}`
+    page is expanded into the records of all pages when a client, scheduler
+    and resource are given to fetch the remaining pages with.
+    Raises an error for any other response.
+    """
+    stats = stats if stats is not None else FetchStats()
+    chunks = _timed_chunks(res, stats)
+    head = ""
+    async for chunk in chunks:
+        head += chunk
+        if head.strip():
+            break
+
+    if not head.lstrip().startswith("["):
+        body = head + "".join([chunk async for chunk in chunks])
+        if scheduler is not None:
+            # Release the first page's host slot before the other pages need theirs
+            await scheduler._close(res)
+        started = time.perf_counter()
+        data = json.loads(body)
+        stats.parse_seconds += time.perf_counter() - started
+        if not _is_page(data) or scheduler is None:
             raise ValueError(f"Expected a list from SWAPI, got: {type(data)} — {data}")
-        return data
+        async for record in iter_pages(data, client, scheduler, resource, stats):
+            yield record
+        return
+
+    parser = JsonArrayParser()
+    for record in _timed_feed(parser, head, stats):
+        yield record
+    async for chunk in chunks:
+        for record in _timed_feed(parser, chunk, stats):
+            yield record
+    started = time.perf_counter()
+    records = parser.close()
+    stats.parse_seconds += time.perf_counter() - started
+    for record in records:
+        yield record
+
+async def _timed_chunks(res: httpx.Response, stats: FetchStats) -> AsyncIterator[str]:
+    """
+    Yield the text chunks of a response body, adding the time spent waiting
+    for them and the bytes downloaded to `stats`.
+    """
+    chunks = res.aiter_text(CHUNK_SIZE)
+    downloaded = res.num_bytes_downloaded
+    while True:
+        started = time.perf_counter()
+        try:
+            chunk = await anext(chunks)
+        except StopAsyncIteration:
+            break
+        finally:
+            stats.fetch_seconds += time.perf_counter() - started
+            stats.bytes_downloaded += res.num_bytes_downloaded - downloaded
+            downloaded = res.num_bytes_downloaded
+        yield chunk
+
+def _timed_feed(parser: JsonArrayParser, text: str, stats: FetchStats) -> list:
+    started = time.perf_counter()
+    records = parser.feed(text)
+    stats.parse_seconds += time.perf_counter() - started
+    return records
+
+async def iter_pages(first_page: dict, client: httpx.AsyncClient, scheduler: FetchScheduler,
+                     resource: str, stats: FetchStats | None = None) -> AsyncIterator[dict]:
+    """
+    Yield the records of a paginated resource, given its first page.
+
+    The number of pages is derived from `count` and the size of the first page,
+    and the remaining pages are fetched concurrently (at most `PAGE_WINDOW`
+    ahead of the consumer) instead of following `next` one page at a time.
+    Records are yielded in page order as the pages arrive.
+    """
+    for record in first_page["results"]:
+        yield record
+
+    page_size = len(first_page["results"])
+    if not first_page.get("next") or page_size == 0:
+        return
+    page_count = math.ceil(first_page["count"] / page_size)
+    # Keep any extra query parameters the mirror puts in its `next` links
+    params = dict(httpx.URL(first_page["next"]).params)
+
+    async def fetch_page(page: int) -> list:
+        path = f"{resource}?{urlencode({**params, 'page': page})}"
+        started = time.perf_counter()
+        async with scheduler.stream(client, path) as res:
+            res.raise_for_status()
+            body = await res.aread()
+        parsed = time.perf_counter()
+        data = json.loads(body)
+        if stats is not None:
+            stats.fetch_seconds += parsed - started
+            stats.parse_seconds += time.perf_counter() - parsed
+            stats.bytes_downloaded += res.num_bytes_downloaded
+            stats.requests += 1
+        if not _is_page(data):
+            raise ValueError(f"Expected a SWAPI page for {path}, got: {type(data)}")
+        return data["results"]
+
+    window = deque()
+    next_page = 2
+    try:
+        while next_page <= page_count or window:
+            while next_page <= page_count and len(window) < PAGE_WINDOW:
+                window.append(asyncio.create_task(fetch_page(next_page)))
+                next_page += 1
+            for record in await window.popleft():
+                yield record
+    finally:
+        for task in window:
+            task.cancel()
+        await asyncio.gather(*window, return_exceptions=True)
+
+def _is_page(data) -> bool:
+    return isinstance(data, dict) and isinstance(data.get("results"), list) and "count" in data
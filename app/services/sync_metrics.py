@@ -0,0 +1,130 @@
+"""
+Instrumentation for SWAPI sync runs.
+Collects per-resource, per-phase wall time, row counts, SQL statements, and
+bytes downloaded, plus the tracemalloc peak of the whole run.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models import SyncRun
+
+# Sync phases in pipeline order
+PHASES = ("fetch", "parse", "upsert", "links")
+
+
+class SyncMetrics:
+    """
+    Metrics of a single sync run.
+
+    Phase timings of one resource are summed over its batches and requests, so
+    overlapping phases (e.g. concurrent page downloads) can add up to more than
+    the wall time of the run.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now(timezone.utc)
+        self.wall_seconds: float | None = None
+        self.peak_memory_bytes: int | None = None
+        self.statements = 0
+        self.results: dict = {}
+        self.resources: dict[str, dict[str, dict]] = {}
+        self._started = time.perf_counter()
+        self._engine: Engine | None = None
+        self._tracing = False
+
+    def add(self, resource: str, phase: str, seconds: float = 0.0, rows: int = 0, statements: int = 0,
+            bytes_downloaded: int = 0) -> None:
+        """
+        Add measurements to a phase of a resource.
+        """
+        metrics = self.resources.setdefault(resource, {}).setdefault(
+            phase, {"seconds": 0.0, "rows": 0, "statements": 0, "bytes": 0}
+        )
+        metrics["seconds"] += seconds
+        metrics["rows"] += rows
+        metrics["statements"] += statements
+        metrics["bytes"] += bytes_downloaded
+
+    @contextmanager
+    def measure(self, resource: str, phase: str, rows: int = 0):
+        """
+        Time a block of database work and count the SQL statements it issues.
+        """
+        started, statements = time.perf_counter(), self.statements
+        try:
+            yield
+        finally:
+            self.add(resource, phase, time.perf_counter() - started, rows, self.statements - statements)
+
+    def start(self, engine: Engine) -> None:
+        """
+        Start counting the SQL statements issued on `engine` and, if enabled, tracing memory.
+        """
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._count_statement)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def stop(self) -> None:
+        """
+        Stop collecting and record the wall time and memory peak of the run.
+        """
+        self.wall_seconds = time.perf_counter() - self._started
+        if self._engine is not None:
+            event.remove(self._engine, "before_cursor_execute", self._count_statement)
+            self._engine = None
+        if self._tracing:
+            self.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._tracing = False
+
+    def _count_statement(self, *args) -> None:
+        self.statements += 1
+
+    def to_dict(self) -> dict:
+        """
+        Return the metrics as a JSON-serializable dict.
+        """
+        resources = {}
+        for resource, phases in self.resources.items():
+            resources[resource] = {}
+            for phase in sorted(phases, key=PHASES.index):
+                metrics = dict(phases[phase])
+                metrics["seconds"] = round(metrics["seconds"], 6)
+                metrics["rows_per_second"] = round(metrics["rows"] / metrics["seconds"], 1) if metrics["seconds"] else None
+                resources[resource][phase] = metrics
+        return {
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round(self.wall_seconds, 6) if self.wall_seconds is not None else None,
+            "statements": self.statements,
+            "bytes_downloaded": sum(p.get("fetch", {}).get("bytes", 0) for p in self.resources.values()),
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "resources": resources,
+            "results": self.results,
+        }
+
+def record_run(db: Session, metrics: SyncMetrics, status: str, error: str | None = None) -> SyncRun:
+    """
+    Add a `sync_runs` row for the given metrics to the session.
+    The caller owns the transaction.
+    """
+    data = metrics.to_dict()
+    run = SyncRun(
+        started_at=metrics.started_at,
+        finished_at=datetime.now(timezone.utc),
+        status=status,
+        error=error,
+        wall_seconds=data["wall_seconds"],
+        statements=data["statements"],
+        bytes_downloaded=data["bytes_downloaded"],
+        peak_memory_bytes=data["peak_memory_bytes"],
+        metrics=data,
+    )
+    db.add(run)
+    return run
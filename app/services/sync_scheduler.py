@@ -0,0 +1,154 @@
+"""
+Periodic background sync for the API server.
+Runs the sync pipeline on an interval in a separate process, with a file lock
+electing a single leader among the uvicorn workers.
+"""
+import asyncio
+import fcntl
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import SessionLocal
+from app.models import SyncRun
+
+# Seconds between background syncs; unset or 0 disables the scheduler
+SYNC_INTERVAL = float(os.getenv("SYNC_INTERVAL_SECONDS", "0") or 0)
+# Lock file shared by all workers on the host to elect the syncing leader
+SYNC_LOCK_PATH = os.getenv("SYNC_LOCK_PATH", "./starwars.db.sync-lock")
+
+
+def sync_job(shadow: bool = True) -> dict:
+    """
+    Run one sync against the application database with its own session and event loop.
+    """
+    # Imported here so the API workers do not load the sync pipeline until needed
+    from app.services.shadow_sync import run_shadow_sync
+    from app.services.sync_service import run_sync
+
+    db = SessionLocal()
+    try:
+        return asyncio.run((run_shadow_sync if shadow else run_sync)(db))
+    finally:
+        db.close()
+
+class SyncScheduler:
+    """
+    Runs `job` every `interval` seconds while this process holds the leader lock.
+
+    Each tick, a worker that is not the leader tries to take the lock without
+    blocking; the lock is held until the scheduler stops or the process dies,
+    at which point another worker takes over. The job runs in `executor`, by
+    default a single-worker process pool, so sync work never competes with
+    request handling for the event loop or the GIL.
+    """
+
+    def __init__(
+            self,
+            interval: float = SYNC_INTERVAL,
+            lock_path: str = SYNC_LOCK_PATH,
+            job: Callable[[], dict] = sync_job,
+            executor: Executor | None = None
+    ):
+        self.interval = interval
+        self.lock_path = lock_path
+        self.job = job
+        self.is_leader = False
+        self.running = False
+        self.last_started: datetime | None = None
+        self.last_finished: datetime | None = None
+        self.last_error: str | None = None
+        self._executor = executor
+        self._lock_file = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """
+        Start the periodic sync loop on the running event loop.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """
+        Stop the loop, wait for an in-flight sync to finish, and give up the leader lock.
+        """
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._executor:
+            await asyncio.to_thread(self._executor.shutdown, wait=True)
+        self._release()
+
+    async def run_once(self) -> bool:
+        """
+        Run the job if this process is (or can become) the leader.
+        Returns whether the job ran.
+        """
+        if not self._acquire():
+            return False
+        self.running = True
+        self.last_started = datetime.now(timezone.utc)
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.job)
+            self.last_error = None
+        except Exception as exc:
+            self.last_error = repr(exc)
+        finally:
+            self.running = False
+            self.last_finished = datetime.now(timezone.utc)
+        return True
+
+    def status(self) -> dict:
+        """
+        Return the scheduler state of this worker.
+        """
+        return {
+            "interval_seconds": self.interval,
+            "is_leader": self.is_leader,
+            "running": self.running,
+            "last_started": self.last_started,
+            "last_finished": self.last_finished,
+            "last_error": self.last_error,
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def _acquire(self) -> bool:
+        if self.is_leader:
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self.is_leader = True
+        return True
+
+    def _release(self) -> None:
+        if self._lock_file:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_leader = False
+
+def create_scheduler() -> SyncScheduler | None:
+    """
+    Create the scheduler configured by the environment, or None if background sync is disabled.
+    """
+    return SyncScheduler() if SYNC_INTERVAL > 0 else None
+
+async def get_last_sync_run(db: AsyncSession) -> SyncRun | None:
+    """
+    Return the most recent recorded sync run of any worker or CLI invocation.
+    """
+    return await db.scalar(select(SyncRun).order_by(SyncRun.id.desc()).limit(1))
@@ -0,0 +1,446 @@
+"""
+Service layer for syncing SWAPI data into the local database.
+Handles set-based bulk upserts of films, starships, and characters.
+"""
+import asyncio
+import hashlib
+import json
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from itertools import islice
+from typing import Iterable, Iterator
+from sqlalchemy import Table, bindparam, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models import Film, Starship, Character, SyncRun, SyncState
+from app.models.character import character_film, character_starship, parse_measure
+from app.models.starship import starship_film_association
+from app.services import swapi_client
+from app.services.response_cache import CACHED_TABLES, response_cache
+from app.services.sync_metrics import SyncMetrics, record_run
+
+# Number of rows written per INSERT ... ON CONFLICT statement
+BATCH_SIZE = 500
+# Number of parsed batches buffered per resource while earlier resources are written
+QUEUE_DEPTH = 4
+
+
+def extract_id_from_url(url: str) -> int:
+    """
+    Extract the numeric ID from a SWAPI resource URL.
+    Example: "https://swapi.info/api/films/1/" → 1
+    """
+    return int(url.rstrip("/").split("/")[-1])
+
+def film_row(film: dict) -> dict:
+    """
+    Map a SWAPI film payload to a row of the films table.
+    """
+    return {
+        "id": extract_id_from_url(film["url"]),
+        "title": film["title"],
+        "episode_id": film["episode_id"],
+        "opening_crawl": film["opening_crawl"],
+        "producer": film["producer"],
+        "director": film["director"],
+        "release_date": film["release_date"],
+    }
+
+def starship_row(starship: dict) -> dict:
+    """
+    Map a SWAPI starship payload to a row of the starships table.
+    """
+    return {
+        "id": extract_id_from_url(starship["url"]),
+        "name": starship["name"],
+        "model": starship["model"],
+        "starship_class": starship["starship_class"],
+    }
+
+def character_row(character: dict) -> dict:
+    """
+    Map a SWAPI people payload to a row of the characters table.
+    """
+    return {
+        "id": extract_id_from_url(character["url"]),
+        "name": character["name"],
+        "height": character["height"],
+        "mass": character["mass"],
+        "height_num": parse_measure(character["height"]),
+        "mass_num": parse_measure(character["mass"]),
+    }
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Split an iterable into lists of at most `size` items.
+    """
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def _insert(db: Session, table):
+    """
+    Return a dialect-specific INSERT construct supporting ON CONFLICT.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    raise NotImplementedError(f"Bulk upsert is not supported for dialect: {dialect}")
+
+def content_hash(row: dict, links: dict) -> str:
+    """
+    Hash the synced fields of a row together with its resolved relationship IDs.
+    """
+    fields = {name: value for name, value in row.items() if name != "content_hash"}
+    payload = json.dumps({"fields": fields, "links": links}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def upsert_batch(db: Session, model, rows: list[dict]) -> tuple[dict, set[int]]:
+    """
+    Insert or update one batch of rows of the given model.
+
+    Existing rows are loaded with a single query. Rows carrying a `content_hash`
+    are skipped when the stored hash matches, other rows when all their columns
+    match. The rest are written with one INSERT ... ON CONFLICT DO UPDATE statement.
+
+    Returns the batch statistics and the IDs of the rows that were written.
+    """
+    table = model.__table__
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    # Collapse duplicate IDs within a batch, keeping the last occurrence
+    rows = list({row["id"]: row for row in rows}.values())
+    if not rows:
+        return stats, set()
+    columns = list(rows[0].keys())
+    compared = ["content_hash"] if "content_hash" in columns else columns
+    existing = {
+        row.id: row
+        for row in db.execute(
+            select(table.c.id, *(table.c[name] for name in compared)).where(table.c.id.in_([r["id"] for r in rows]))
+        )
+    }
+
+    pending = []
+    for row in rows:
+        current = existing.get(row["id"])
+        if current is None:
+            stats["inserted"] += 1
+        elif any(getattr(current, name) != row[name] for name in compared):
+            stats["updated"] += 1
+        else:
+            stats["unchanged"] += 1
+            continue
+        pending.append(row)
+
+    if pending:
+        stmt = _insert(db, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={name: stmt.excluded[name] for name in columns if name != "id"},
+        )
+        db.execute(stmt, pending)
+
+    return stats, {row["id"] for row in pending}
+
+def bulk_upsert(db: Session, model, rows: Iterable[dict], batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Insert or update rows of the given model in batches of `batch_size`.
+    The caller owns the transaction.
+
+    Returns the number of inserted, updated, and unchanged rows.
+    """
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+    for batch in batched(rows, batch_size):
+        _merge_stats(stats, upsert_batch(db, model, batch)[0])
+    return stats
+
+# Relationships written by each synced resource:
+# payload key -> (association table, owner column, target column, target model)
+FILM_RELATIONS = {}
+STARSHIP_RELATIONS = {
+    "films": (starship_film_association, "starship_id", "film_id", Film),
+}
+CHARACTER_RELATIONS = {
+    "films": (character_film, "character_id", "film_id", Film),
+    "starships": (character_starship, "character_id", "starship_id", Starship),
+}
+
+def upsert_films(db: Session, films: Iterable[dict], batch_size: int = BATCH_SIZE,
+                 metrics: SyncMetrics | None = None) -> dict:
+    """
+    Bulk upsert SWAPI film payloads.
+    """
+    return upsert_payloads(db, Film, film_row, FILM_RELATIONS, films, batch_size, metrics)
+
+def upsert_starships(db: Session, starships: Iterable[dict], batch_size: int = BATCH_SIZE,
+                     metrics: SyncMetrics | None = None) -> dict:
+    """
+    Bulk upsert SWAPI starship payloads and sync their links to films.
+    """
+    return upsert_payloads(db, Starship, starship_row, STARSHIP_RELATIONS, starships, batch_size, metrics)
+
+def upsert_characters(db: Session, characters: Iterable[dict], batch_size: int = BATCH_SIZE,
+                      metrics: SyncMetrics | None = None) -> dict:
+    """
+    Bulk upsert SWAPI people payloads and sync their links to films and starships.
+    """
+    return upsert_payloads(db, Character, character_row, CHARACTER_RELATIONS, characters, batch_size, metrics)
+
+def upsert_payloads(db: Session, model, to_row, relations: dict, payloads: Iterable[dict],
+                    batch_size: int = BATCH_SIZE, metrics: SyncMetrics | None = None) -> dict:
+    """
+    Bulk upsert SWAPI payloads of one resource, batch by batch.
+
+    Each row is stamped with a content hash of its fields and resolved links.
+    Rows whose hash is unchanged are skipped entirely, including their links;
+    the association rows of written rows are brought in line with the payload.
+
+    When `metrics` is given, entity writes are recorded under the "upsert"
+    phase and link resolution and writes under the "links" phase.
+    """
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if relations:
+        stats.update(links_inserted=0, links_deleted=0)
+
+    resource = model.__tablename__
+    for batch in batched(payloads, batch_size):
+        with _measure(metrics, resource, "links"):
+            links = {attr: resolve_links(db, batch, attr, spec[3]) for attr, spec in relations.items()}
+
+        with _measure(metrics, resource, "upsert", len(batch)):
+            rows = []
+            for payload in batch:
+                row = to_row(payload)
+                row["content_hash"] = content_hash(row, {attr: links[attr][row["id"]] for attr in relations})
+                rows.append(row)
+            batch_stats, written = upsert_batch(db, model, rows)
+        _merge_stats(stats, batch_stats)
+
+        for attr, (table, owner_column, target_column, _) in relations.items():
+            wanted = {owner_id: links[attr][owner_id] for owner_id in written}
+            with _measure(metrics, resource, "links"):
+                link_stats = sync_links(db, table, owner_column, target_column, wanted)
+            if metrics:
+                metrics.add(resource, "links", rows=link_stats["links_inserted"] + link_stats["links_deleted"])
+            _merge_stats(stats, link_stats)
+    return stats
+
+def _measure(metrics: SyncMetrics | None, resource: str, phase: str, rows: int = 0):
+    return metrics.measure(resource, phase, rows) if metrics else nullcontext()
+
+def resolve_links(db: Session, payloads: list[dict], attr: str, target_model) -> dict[int, list[int]]:
+    """
+    Map each payload's ID to the sorted IDs of its related entities under `attr`.
+    Related entities that do not exist locally are dropped.
+    """
+    wanted = {
+        extract_id_from_url(p["url"]): {extract_id_from_url(url) for url in p.get(attr, [])}
+        for p in payloads
+    }
+    target_ids = set().union(*wanted.values())
+    known = set(db.scalars(select(target_model.id).where(target_model.id.in_(target_ids)))) if target_ids else set()
+    return {owner_id: sorted(ids & known) for owner_id, ids in wanted.items()}
+
+# SWAPI resources in dependency order: (resource, stats key, upsert function)
+SYNC_ORDER = (
+    ("films", "films", upsert_films),
+    ("starships", "starships", upsert_starships),
+    ("people", "characters", upsert_characters),
+)
+
+def write_payloads(db: Session, payloads: dict[str, Iterable[dict]], batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Bulk upsert SWAPI payloads of all resources, keyed by SWAPI resource name,
+    in dependency order. The caller owns the transaction.
+
+    Returns upsert statistics keyed by resource.
+    """
+    stats = {name: upsert(db, payloads.get(resource, []), batch_size) for resource, name, upsert in SYNC_ORDER}
+    reset_id_sequences(db)
+    return stats
+
+def reset_id_sequences(db: Session) -> None:
+    """
+    Move the ID sequences of tables written with explicit IDs past their largest ID,
+    so rows created through the API get fresh IDs. Only PostgreSQL needs this.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for model in (Film, Starship, Character, SyncRun):
+        table = model.__tablename__
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 0) + 1, false) FROM {table}"
+        ))
+
+async def run_sync(
+        db: Session,
+        base_urls: list[str] | None = None,
+        max_connections: int = swapi_client.MAX_CONNECTIONS,
+        batch_size: int = BATCH_SIZE,
+        since: datetime | None = None,
+        full: bool = False,
+        scheduler: swapi_client.FetchScheduler | None = None,
+        metrics: SyncMetrics | None = None,
+        **client_kwargs
+) -> dict:
+    """
+    Sync films, starships, and characters in a single streaming pipeline.
+
+    All three resources are fetched concurrently over one pooled keep-alive
+    client, so the fetch phase takes about as long as the slowest resource.
+    Response bodies are parsed incrementally into fixed-size batches that are
+    written as they arrive, in dependency order (films, starships, characters),
+    so peak memory stays flat regardless of resource size. The whole sync is
+    committed as one transaction.
+
+    Requests are conditional on the validators stored by the previous sync
+    (or on `since`), and resources answered with 304 Not Modified are skipped.
+    `full` ignores the stored validators.
+
+    Requests go through `scheduler` (retries, hedging across mirrors, and
+    per-request timings), or through a default one for `base_urls`.
+
+    Per-phase timings, row and statement counts, and bytes downloaded are
+    collected into `metrics` (or a fresh `SyncMetrics`) and recorded as a
+    `sync_runs` row, committed with the sync or, on failure, on its own.
+
+    Returns upsert statistics keyed by resource.
+    """
+    scheduler = scheduler or swapi_client.FetchScheduler(base_urls)
+    metrics = metrics or SyncMetrics()
+    metrics.start(db.get_bind())
+    states = {} if full else {state.resource: state for state in db.query(SyncState)}
+    if_modified_since = None
+    if since:
+        since = since.astimezone(timezone.utc) if since.tzinfo else since.replace(tzinfo=timezone.utc)
+        if_modified_since = format_datetime(since, usegmt=True)
+
+    def validators(resource: str) -> dict:
+        state = states.get(resource)
+        return {
+            "etag": state.etag if state else None,
+            "if_modified_since": if_modified_since or (state.last_modified if state else None),
+        }
+
+    async with swapi_client.create_client(max_connections=max_connections, **client_kwargs) as client:
+        queues = {resource: asyncio.Queue(QUEUE_DEPTH) for resource, _, _ in SYNC_ORDER}
+        producers = [
+            asyncio.create_task(_produce_batches(queues[resource], client, scheduler, resource, batch_size,
+                                                 validators(resource), metrics, name))
+            for resource, name, _ in SYNC_ORDER
+        ]
+        try:
+            stats = {}
+            for resource, name, upsert in SYNC_ORDER:
+                stats[name] = upsert(db, [], batch_size)
+                while True:
+                    kind, value = await queues[resource].get()
+                    if kind == "error":
+                        raise value
+                    if kind == "batch":
+                        # Writes run off the event loop so the other downloads keep flowing
+                        _merge_stats(stats[name], await asyncio.to_thread(upsert, db, value, batch_size, metrics))
+                        continue
+                    if value is None:
+                        stats[name] = {"not_modified": True}
+                    else:
+                        db.merge(SyncState(
+                            resource=resource,
+                            etag=value["etag"],
+                            last_modified=value["last_modified"],
+                            synced_at=datetime.now(timezone.utc),
+                        ))
+                    break
+            await asyncio.to_thread(reset_id_sequences, db)
+            metrics.stop()
+            metrics.results = stats
+            record_run(db, metrics, "succeeded")
+            await asyncio.to_thread(db.commit)
+            await asyncio.to_thread(response_cache.bump, *CACHED_TABLES)
+        except BaseException as exc:
+            for producer in producers:
+                producer.cancel()
+            db.rollback()
+            metrics.stop()
+            try:
+                record_run(db, metrics, "failed", repr(exc))
+                db.commit()
+            except Exception:
+                db.rollback()
+            raise
+        finally:
+            await asyncio.gather(*producers, return_exceptions=True)
+    return stats
+
+async def _produce_batches(queue: asyncio.Queue, client, scheduler, resource: str, batch_size: int,
+                           validators: dict, metrics: SyncMetrics, name: str) -> None:
+    """
+    Stream one SWAPI resource into `queue` as ("batch", records) items, followed by
+    ("done", response validators or None if not modified) or ("error", exception).
+    The bounded queue applies backpressure to the download while earlier
+    resources are still being written.
+    Fetch and parse totals are recorded in `metrics` under `name`.
+    """
+    fetch_stats = swapi_client.FetchStats()
+    count = 0
+    try:
+        async with swapi_client.stream_conditional(resource, client, scheduler=scheduler, stats=fetch_stats,
+                                                   **validators) as (records, result):
+            if records is None:
+                await queue.put(("done", None))
+                return
+            batch = []
+            async for record in records:
+                count += 1
+                batch.append(record)
+                if len(batch) == batch_size:
+                    await queue.put(("batch", batch))
+                    batch = []
+            if batch:
+                await queue.put(("batch", batch))
+        await queue.put(("done", result))
+    except Exception as exc:
+        await queue.put(("error", exc))
+    finally:
+        metrics.add(name, "fetch", fetch_stats.fetch_seconds, count, bytes_downloaded=fetch_stats.bytes_downloaded)
+        metrics.add(name, "parse", fetch_stats.parse_seconds, count)
+
+def sync_links(db: Session, table: Table, owner_column: str, target_column: str,
+               links: dict[int, list[int]]) -> dict:
+    """
+    Bring the association rows of the given owners in line with `links`,
+    a mapping of owner IDs to the IDs of their related entities.
+
+    The desired edge set is diffed against the stored edges of the same owners
+    and only the difference is written, using bulk Core DELETE and INSERT statements.
+
+    Returns the number of inserted and deleted links.
+    """
+    if not links:
+        return {"links_inserted": 0, "links_deleted": 0}
+
+    wanted = {(owner_id, target_id) for owner_id, target_ids in links.items() for target_id in target_ids}
+    owner, target = table.c[owner_column], table.c[target_column]
+    existing = set(db.execute(select(owner, target).where(owner.in_(list(links)))).tuples())
+
+    to_delete = existing - wanted
+    to_insert = wanted - existing
+    if to_delete:
+        db.execute(
+            table.delete().where(owner == bindparam("b_owner"), target == bindparam("b_target")),
+            [{"b_owner": o, "b_target": t} for o, t in to_delete],
+        )
+    if to_insert:
+        db.execute(
+            table.insert(),
+            [{owner_column: o, target_column: t} for o, t in sorted(to_insert)],
+        )
+    return {"links_inserted": len(to_insert), "links_deleted": len(to_delete)}
+
+def _merge_stats(total: dict, stats: dict) -> None:
+    for key, value in stats.items():
+        total[key] = total.get(key, 0) + value
@@ -0,0 +1,111 @@
+"""
+Synthetic SWAPI dataset generator for load testing.
+Produces deterministic, SWAPI-shaped payloads for films, starships, and people
+with a realistic relationship fan-out. Every record is derived from its own
+seeded random stream, so any record (or page) can be generated on its own.
+"""
+import random
+from typing import Iterator
+
+DEFAULT_BASE_URL = "https://swapi.info/api"
+
+_SYLLABLES = ["an", "ka", "lu", "ke", "sky", "wal", "ker", "le", "ia", "or", "ga", "na", "dar", "th", "va", "der",
+              "ob", "i", "wan", "ken", "pad", "me", "am", "ida", "la", "han", "so", "lo", "che", "wie", "bac"]
+_STARSHIP_CLASSES = ["Starfighter", "Light freighter", "Star Destroyer", "Corvette", "Transport", "Yacht",
+                     "Assault starfighter", "Deep Space Mobile Battlestation", "Patrol craft", "Cruiser"]
+_PEOPLE = ["George Lucas", "Gary Kurtz", "Rick McCallum", "Irvin Kershner", "Richard Marquand", "Howard Kazanjian"]
+
+
+def _rng(seed: int, kind: str, index: int) -> random.Random:
+    return random.Random(f"{seed}:{kind}:{index}")
+
+def _name(rng: random.Random, words: int = 2) -> str:
+    return " ".join(
+        "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        for _ in range(words)
+    )
+
+def _sample_ids(rng: random.Random, count: int, low: int, high: int) -> list[int]:
+    """
+    Pick up to `high` distinct IDs (at least `low`) from 1..count.
+    """
+    if count == 0:
+        return []
+    k = min(count, rng.randint(low, high))
+    return sorted(rng.sample(range(1, count + 1), k))
+
+def film(index: int, seed: int = 0, base_url: str = DEFAULT_BASE_URL) -> dict:
+    """
+    Generate the film with the given 1-based index.
+    """
+    rng = _rng(seed, "films", index)
+    return {
+        "title": f"The {_name(rng, 1)} {rng.choice(['Menace', 'Hope', 'Strikes Back', 'Returns', 'Awakens'])}",
+        "episode_id": index,
+        "opening_crawl": " ".join(_name(rng, 1) for _ in range(40)),
+        "director": rng.choice(_PEOPLE),
+        "producer": ", ".join(sorted(rng.sample(_PEOPLE, 2))),
+        "release_date": f"{rng.randint(1977, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "characters": [],
+        "starships": [],
+        "url": f"{base_url}/films/{index}/",
+    }
+
+def starship(index: int, film_count: int, seed: int = 0, base_url: str = DEFAULT_BASE_URL) -> dict:
+    """
+    Generate the starship with the given 1-based index, appearing in 1-3 films.
+    """
+    rng = _rng(seed, "starships", index)
+    return {
+        "name": _name(rng),
+        "model": f"{_name(rng, 1)}-{rng.randint(1, 99)}",
+        "starship_class": rng.choice(_STARSHIP_CLASSES),
+        "films": [f"{base_url}/films/{i}/" for i in _sample_ids(rng, film_count, 1, 3)],
+        "url": f"{base_url}/starships/{index}/",
+    }
+
+def person(index: int, film_count: int, starship_count: int, seed: int = 0,
+           base_url: str = DEFAULT_BASE_URL) -> dict:
+    """
+    Generate the person with the given 1-based index, appearing in 1-4 films
+    and piloting up to 3 starships (most pilot none).
+    """
+    rng = _rng(seed, "people", index)
+    pilots = rng.random() < 0.25
+    return {
+        "name": _name(rng),
+        "height": "unknown" if rng.random() < 0.05 else str(rng.randint(60, 260)),
+        "mass": "unknown" if rng.random() < 0.2 else f"{rng.randint(15, 1400):,}",
+        "films": [f"{base_url}/films/{i}/" for i in _sample_ids(rng, film_count, 1, 4)],
+        "starships": [f"{base_url}/starships/{i}/" for i in _sample_ids(rng, starship_count, 1, 3)] if pilots else [],
+        "url": f"{base_url}/people/{index}/",
+    }
+
+class SyntheticDataset:
+    """
+    A synthetic dataset of the given size, addressable by resource and index.
+    """
+
+    def __init__(self, films: int, starships: int, people: int, seed: int = 0, base_url: str = DEFAULT_BASE_URL):
+        self.counts = {"films": films, "starships": starships, "people": people}
+        self.seed = seed
+        self.base_url = base_url
+
+    def record(self, resource: str, index: int) -> dict:
+        """
+        Generate the record with the given 1-based index of a resource.
+        """
+        if resource == "films":
+            return film(index, self.seed, self.base_url)
+        if resource == "starships":
+            return starship(index, self.counts["films"], self.seed, self.base_url)
+        if resource == "people":
+            return person(index, self.counts["films"], self.counts["starships"], self.seed, self.base_url)
+        raise KeyError(resource)
+
+    def records(self, resource: str, start: int = 1, stop: int | None = None) -> Iterator[dict]:
+        """
+        Generate the records of a resource with indexes in [start, stop).
+        """
+        stop = self.counts[resource] + 1 if stop is None else min(stop, self.counts[resource] + 1)
+        return (self.record(resource, index) for index in range(start, stop))
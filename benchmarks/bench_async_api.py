@@ -0,0 +1,166 @@
+"""
+Benchmark API throughput and latency of async routes against threadpool routes.
+
+Seeds a SQLite database with synthetic data and serves it twice: through the
+application's async routes, and through an equivalent app whose sync routes run
+in Starlette's threadpool on sync sessions, as the API did before. Many
+concurrent clients fetch random characters and character pages; requests per
+second, failed requests (errors and 10 second timeouts), and p50/p99/max
+latency are reported per mode.
+
+Usage:
+    python -m benchmarks.bench_async_api [--people 2000] [--concurrency 200] [--seconds 10]
+"""
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+import typer
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, joinedload, sessionmaker
+from app.db.session import Base, create_db_engine
+from app.models import Character
+from app.schemas.character import CharacterRead, PaginatedCharacters
+from app.services.sync_service import write_payloads
+from app.services.synthetic import SyntheticDataset
+
+cli = typer.Typer()
+
+FILMS = 6
+STARSHIPS = 36
+
+
+def create_threadpool_app() -> FastAPI:
+    """
+    The character read routes as sync handlers on sync sessions, run in the threadpool.
+    """
+    SessionLocal = sessionmaker(autoflush=False, bind=create_db_engine(read_only=True))
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    router = APIRouter()
+
+    @router.get("/", response_model=PaginatedCharacters)
+    def list_characters(skip: int = Query(0, ge=0), limit: int = Query(10, le=100), db: Session = Depends(get_db)):
+        query = db.query(Character)
+        total = query.count()
+        items = query.options(joinedload(Character.films), joinedload(Character.starships)).offset(skip).limit(limit)
+        return {"total": total, "items": items.all()}
+
+    @router.get("/{character_id}", response_model=CharacterRead)
+    def get_character(character_id: int, db: Session = Depends(get_db)):
+        character = (
+            db.query(Character)
+            .options(joinedload(Character.films), joinedload(Character.starships))
+            .filter(Character.id == character_id)
+            .first()
+        )
+        if not character:
+            raise HTTPException(status_code=404, detail="Character not found")
+        return character
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1/characters")
+    return app
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_for(port: int) -> None:
+    for _ in range(1000):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.01)
+
+def start_api(directory: str, target: str, factory: bool = False) -> tuple[subprocess.Popen, int]:
+    """
+    Run `target` in a fresh interpreter whose working directory is `directory`,
+    so that it serves the `starwars.db` there.
+    """
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "error"]
+        + (["--factory"] if factory else []),
+        cwd=directory, env=env, stderr=subprocess.DEVNULL,
+    )
+    _wait_for(port)
+    return process, port
+
+async def load(api_url: str, people: int, concurrency: int, seconds: float) -> tuple[list, int]:
+    latencies, failures = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal failures
+        while time.perf_counter() < deadline:
+            if random.random() < 0.8:
+                path = f"/characters/{random.randint(1, people)}"
+            else:
+                path = f"/characters/?skip={random.randint(0, people - 10)}&limit=10"
+            started = time.perf_counter()
+            try:
+                (await client.get(path)).raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                failures += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=api_url, timeout=10.0, limits=limits) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    return latencies, failures
+
+@cli.command()
+def main(
+        people: int = typer.Option(2000, "--people", help="Number of synthetic people to seed"),
+        concurrency: int = typer.Option(200, "--concurrency", help="Number of concurrent clients"),
+        seconds: float = typer.Option(10.0, "--seconds", help="Duration of each run"),
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'starwars.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        dataset = SyntheticDataset(films=FILMS, starships=STARSHIPS, people=people, seed=0)
+        write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+        db.commit()
+        db.close()
+        engine.dispose()
+
+        modes = (
+            ("threadpool", "benchmarks.bench_async_api:create_threadpool_app", True),
+            ("async", "app.main:app", False),
+        )
+        for name, target, factory in modes:
+            api, port = start_api(tmp, target, factory)
+            try:
+                api_url = f"http://127.0.0.1:{port}/api/v1"
+                asyncio.run(load(api_url, people, concurrency, 1.0))  # warm up
+                latencies, failures = asyncio.run(load(api_url, people, concurrency, seconds))
+            finally:
+                # A deadlocked server never finishes a graceful shutdown
+                api.kill()
+                api.wait()
+
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [float("nan")] * 99
+            print(f"{name:<10} rps={len(latencies) / seconds:8.1f}  failed={failures:<5} "
+                  f"p50={quantiles[49] * 1000:8.1f}ms  p99={quantiles[98] * 1000:8.1f}ms  "
+                  f"max={max(latencies, default=float('nan')) * 1000:8.1f}ms")
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,96 @@
+"""
+Benchmark fetching many characters one request at a time against one batch get.
+
+Seeds a SQLite database with synthetic data and fetches `--ids` random
+characters through the application in-process: with one `GET /characters/{id}`
+per character, sequentially and concurrently, and with a single
+`GET /characters/batch?ids=...`. The response cache is off, so every request
+reaches the routes. The median time per fetch of all IDs and the number of SQL
+statements it ran are reported.
+
+Usage:
+    python -m benchmarks.bench_batch_get [--people 10000] [--ids 50] [--repeats 20]
+"""
+import os
+
+# Measure the routes, not the response cache in front of them
+os.environ["RESPONSE_CACHE_SECONDS"] = "0"
+
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+import httpx
+import typer
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.db.deps import get_db
+from app.db.session import Base, create_async_db_engine, create_db_engine
+from app.main import app
+from app.services.sync_service import write_payloads
+from app.services.synthetic import SyntheticDataset
+
+cli = typer.Typer()
+
+
+async def run(url: str, people: int, count: int, repeats: int) -> None:
+    engine = create_async_db_engine(url, read_only=True)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    ids = random.Random(0).sample(range(1, people + 1), count)
+
+    async def sequential(client):
+        for id_ in ids:
+            (await client.get(f"/characters/{id_}")).raise_for_status()
+
+    async def concurrent(client):
+        for response in await asyncio.gather(*(client.get(f"/characters/{id_}") for id_ in ids)):
+            response.raise_for_status()
+
+    async def batch(client):
+        response = await client.get("/characters/batch", params={"ids": ",".join(map(str, ids))})
+        response.raise_for_status()
+        assert all(entry["item"] for entry in response.json()["items"])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1") as client:
+        for label, fetch in (("sequential gets", sequential), ("concurrent gets", concurrent), ("batch get", batch)):
+            timings = []
+            for _ in range(repeats):
+                statements.clear()
+                started = time.perf_counter()
+                await fetch(client)
+                timings.append(time.perf_counter() - started)
+            print(f"{count} characters  {label:<16} statements={len(statements):<4} "
+                  f"median={statistics.median(timings) * 1000:8.1f}ms")
+    app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+
+@cli.command()
+def main(
+        people: int = typer.Option(10_000, "--people", help="Number of synthetic characters to seed"),
+        ids: int = typer.Option(50, "--ids", help="Number of characters to fetch"),
+        repeats: int = typer.Option(20, "--repeats", help="Fetches per measurement, of which the median is reported"),
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'starwars.db')}"
+        engine = create_db_engine(url)
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            dataset = SyntheticDataset(films=6, starships=36, people=people, seed=0)
+            write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+            db.commit()
+        engine.dispose()
+        asyncio.run(run(url, people, ids, repeats))
+
+if __name__ == "__main__":
+    cli()
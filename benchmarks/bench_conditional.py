@@ -0,0 +1,79 @@
+"""
+Benchmark polling list pages with and without conditional requests.
+
+Seeds a SQLite database with synthetic data and polls pages of the characters
+and films lists through the application in-process, as a client that re-fetches
+the full page every time and as one that sends the `ETag` of its copy in
+`If-None-Match` and gets 304 Not Modified. The response cache is off, so every
+request reaches the routes. The median time per request and the bytes of the
+response body are reported.
+
+Usage:
+    python -m benchmarks.bench_conditional [--people 10000] [--limit 100] [--repeats 50]
+"""
+import os
+
+# Measure the routes, not the response cache in front of them
+os.environ["RESPONSE_CACHE_SECONDS"] = "0"
+
+import asyncio
+import statistics
+import tempfile
+import time
+import httpx
+import typer
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.db.deps import get_db
+from app.db.session import Base, create_async_db_engine, create_db_engine
+from app.main import app
+from app.services.sync_service import write_payloads
+from app.services.synthetic import SyntheticDataset
+
+cli = typer.Typer()
+
+
+async def run(url: str, limit: int, repeats: int) -> None:
+    engine = create_async_db_engine(url, read_only=True)
+    session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1") as client:
+        for path in (f"/characters/?limit={limit}", f"/films/?limit={limit}"):
+            etag = (await client.get(path)).headers["etag"]
+            for label, headers in (("full", {}), ("If-None-Match", {"If-None-Match": etag})):
+                timings, size = [], 0
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    response = await client.get(path, headers=headers)
+                    timings.append(time.perf_counter() - started)
+                    size = len(response.content)
+                print(f"{path:<24} {label:<14} status={response.status_code} bytes={size:<8} "
+                      f"median={statistics.median(timings) * 1000:8.2f}ms")
+    app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+
+@cli.command()
+def main(
+        people: int = typer.Option(10_000, "--people", help="Number of synthetic characters to seed"),
+        limit: int = typer.Option(100, "--limit", help="Page size"),
+        repeats: int = typer.Option(50, "--repeats", help="Requests per measurement, of which the median is reported"),
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'starwars.db')}"
+        engine = create_db_engine(url)
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            dataset = SyntheticDataset(films=6, starships=36, people=people, seed=0)
+            write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+            db.commit()
+        engine.dispose()
+        asyncio.run(run(url, limit, repeats))
+
+if __name__ == "__main__":
+    cli()
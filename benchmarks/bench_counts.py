@@ -0,0 +1,89 @@
+"""
+Benchmark list totals: table scans against trigger-maintained row counts.
+
+Seeds a SQLite database with synthetic characters, once without and once with
+the row counting triggers, and reports the time of each seed. It then times
+first pages of the characters list (without relationships) for every `count`
+mode, unfiltered, with a name search and with a wide height range, next to
+the `COUNT(*)` the lists ran for every request before. The median over the
+repeats is reported.
+
+Usage:
+    python -m benchmarks.bench_counts [--people 1000000] [--repeats 20]
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import typer
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.db.counts import COUNTED_TABLES
+from app.db.search import search
+from app.db.session import Base, create_async_db_engine, create_db_engine
+from app.models import Character
+from app.services.character_service import list_characters
+from app.services.sync_service import write_payloads
+from app.services.synthetic import SyntheticDataset
+
+cli = typer.Typer()
+
+
+def seed(url: str, people: int, triggers: bool) -> float:
+    engine = create_db_engine(url)
+    Base.metadata.create_all(bind=engine)
+    if not triggers:
+        with engine.begin() as conn:
+            for table_name in COUNTED_TABLES:
+                for trigger in ("insert", "delete"):
+                    conn.exec_driver_sql(f"DROP TRIGGER {table_name}_count_{trigger}")
+    with sessionmaker(bind=engine)() as db:
+        dataset = SyntheticDataset(films=6, starships=36, people=people, seed=0)
+        started = time.perf_counter()
+        write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+        db.commit()
+        elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed
+
+async def median(function, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+async def run(url: str, name: str, repeats: int) -> None:
+    engine = create_async_db_engine(url, read_only=True)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        cases = (
+            ("unfiltered", {}, select(Character)),
+            (f"name={name}", {"name": name}, search(select(Character), Character, name, "sqlite")),
+            ("min_height=100", {"min_height": 100}, select(Character).where(Character.height_num >= 100)),
+        )
+        for label, filters, query in cases:
+            scan = await median(lambda: db.scalar(select(func.count()).select_from(query.subquery())), repeats)
+            print(f"{label:<16} COUNT(*) scan        {scan:8.2f}ms")
+            for count in ("exact", "estimated", "none"):
+                elapsed = await median(lambda: list_characters(db, include=(), count=count, **filters), repeats)
+                print(f"{label:<16} page count={count:<9} {elapsed:8.2f}ms")
+    await engine.dispose()
+
+@cli.command()
+def main(
+        people: int = typer.Option(1_000_000, "--people", help="Number of synthetic characters to seed"),
+        repeats: int = typer.Option(20, "--repeats", help="Runs per measurement, of which the median is reported"),
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        without = seed(f"sqlite:///{os.path.join(tmp, 'plain.db')}", people, triggers=False)
+        url = f"sqlite:///{os.path.join(tmp, 'starwars.db')}"
+        with_triggers = seed(url, people, triggers=True)
+        print(f"seeded {people} characters in {without:.1f}s without count triggers, {with_triggers:.1f}s with")
+        name = SyntheticDataset(films=6, starships=36, people=people, seed=0).record("people", 1)["name"].split()[0]
+        asyncio.run(run(url, name, repeats))
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,75 @@
+"""
+Benchmark walking every page of the characters list with offsets and cursors.
+
+Seeds a SQLite database with synthetic characters and walks the whole list
+twice, as an export job does: once with `skip`/`limit`, where each page skips
+over all the rows before it, and once following `next_cursor`. Pages are
+loaded without their films and starships, which cost the same in both modes.
+The total time of each walk and the time of its first and last pages are
+reported, for the default ID order and for a sort on the indexed height column.
+
+Usage:
+    python -m benchmarks.bench_pagination [--people 1000000] [--limit 100]
+"""
+import asyncio
+import os
+import tempfile
+import time
+import typer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.db.session import Base, create_async_db_engine, create_db_engine
+from app.models import Character
+from app.services.character_service import CHARACTER_SORTS
+from app.services.pagination import paginate
+from app.services.sync_service import write_payloads
+from app.services.synthetic import SyntheticDataset
+
+cli = typer.Typer()
+
+
+async def walk(db, limit: int, sort: str | None, use_cursor: bool) -> tuple[float, list[float]]:
+    skip, cursor, pages = 0, None, []
+    started = time.perf_counter()
+    while True:
+        page_started = time.perf_counter()
+        page = await paginate(db, select(Character), skip, limit, cursor, sort, CHARACTER_SORTS)
+        pages.append(time.perf_counter() - page_started)
+        if use_cursor:
+            if not (cursor := page["next_cursor"]):
+                break
+        else:
+            skip += limit
+            if skip >= page["total"]:
+                break
+    return time.perf_counter() - started, pages
+
+async def run(url: str, limit: int) -> None:
+    engine = create_async_db_engine(url, read_only=True)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        for sort in (None, "-height"):
+            for label, use_cursor in (("skip", False), ("cursor", True)):
+                elapsed, pages = await walk(db, limit, sort, use_cursor)
+                print(f"sort={sort or 'id':<8} {label:<7} pages={len(pages):<6} total={elapsed:7.1f}s  "
+                      f"first={pages[0] * 1000:7.1f}ms  last={pages[-1] * 1000:7.1f}ms")
+    await engine.dispose()
+
+@cli.command()
+def main(
+        people: int = typer.Option(1_000_000, "--people", help="Number of synthetic characters to seed"),
+        limit: int = typer.Option(100, "--limit", help="Page size"),
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'starwars.db')}"
+        engine = create_db_engine(url)
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            dataset = SyntheticDataset(films=6, starships=36, people=people, seed=0)
+            write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+            db.commit()
+        engine.dispose()
+        asyncio.run(run(url, limit))
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,100 @@
+"""
+Benchmark how list pages load their relationships.
+
+Seeds a SQLite database with synthetic data and loads pages of the characters
+and films lists three ways: with both collections joined into the page query
+(`joinedload`, as the list endpoints did before), with one batched IN query per
+collection (`selectinload`, as they do now), and with `include=` left empty.
+Reports the number of statements, the number of rows they return, and the
+median time per page. Rows are counted by running each recorded statement
+again, outside the timed runs.
+
+Usage:
+    python -m benchmarks.bench_relationship_loading [--people 10000] [--limit 100] [--repeats 5]
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import typer
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import joinedload, sessionmaker
+from app.db.session import Base, create_async_db_engine, create_db_engine
+from app.models import Character, Film
+from app.services.character_service import CHARACTER_RELATIONS, list_characters
+from app.services.film_service import FILM_RELATIONS, list_films
+from app.services.sync_service import write_payloads
+from app.services.synthetic import SyntheticDataset
+
+cli = typer.Typer()
+
+
+def joined_page(model, relations):
+    async def page(db, limit: int):
+        query = select(model).options(*(joinedload(getattr(model, name)) for name in relations))
+        return (await db.scalars(query.order_by(model.id).limit(limit))).unique().all()
+    return page
+
+def service_page(list_function, include):
+    async def page(db, limit: int):
+        return (await list_function(db, limit=limit, include=include))["items"]
+    return page
+
+async def run(url: str, limit: int, repeats: int) -> None:
+    engine = create_async_db_engine(url, read_only=True)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, parameters, context, executemany:
+                 statements.append((statement, parameters)))
+    cases = {
+        "characters": {
+            "joinedload": joined_page(Character, CHARACTER_RELATIONS),
+            "selectinload": service_page(list_characters, CHARACTER_RELATIONS),
+            "include=": service_page(list_characters, ()),
+        },
+        "films": {
+            "joinedload": joined_page(Film, FILM_RELATIONS),
+            "selectinload": service_page(list_films, FILM_RELATIONS),
+            "include=": service_page(list_films, ()),
+        },
+    }
+    session = async_sessionmaker(engine, expire_on_commit=False)
+    for resource, strategies in cases.items():
+        for label, page in strategies.items():
+            timings = []
+            for _ in range(repeats):
+                async with session() as db:
+                    statements.clear()
+                    started = time.perf_counter()
+                    await page(db, limit)
+                    timings.append(time.perf_counter() - started)
+            recorded = list(statements)
+            async with engine.connect() as conn:
+                rows = 0
+                for statement, parameters in recorded:
+                    rows += len((await conn.exec_driver_sql(statement, parameters)).all())
+            print(f"{resource:<11} {label:<13} statements={len(recorded):<3} rows={rows:<9} "
+                  f"median={statistics.median(timings) * 1000:9.1f}ms")
+    await engine.dispose()
+
+@cli.command()
+def main(
+        people: int = typer.Option(10_000, "--people", help="Number of synthetic characters to seed"),
+        limit: int = typer.Option(100, "--limit", help="Page size"),
+        repeats: int = typer.Option(5, "--repeats", help="Runs per page, of which the median is reported"),
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'starwars.db')}"
+        engine = create_db_engine(url)
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            dataset = SyntheticDataset(films=6, starships=36, people=people, seed=0)
+            write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+            db.commit()
+        engine.dispose()
+        asyncio.run(run(url, limit, repeats))
+
+if __name__ == "__main__":
+    cli()
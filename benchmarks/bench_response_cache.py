@@ -0,0 +1,119 @@
+"""
+Benchmark API throughput and latency with and without the response cache.
+
+Seeds a SQLite database with synthetic data and serves it with several uvicorn
+workers three times: without the response cache, with the in-process tier
+only, and with the in-process and shared SQLite tiers. Concurrent clients
+fetch characters and character pages, mostly among the first `--hot` ones;
+requests per second, the share of cache hits, failed requests, and p50/p99/max
+latency are reported per mode.
+
+Usage:
+    python -m benchmarks.bench_response_cache [--people 2000] [--hot 200] [--workers 4] [--concurrency 8]
+                                              [--seconds 10]
+"""
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+import typer
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.session import Base
+from app.services.sync_service import write_payloads
+from app.services.synthetic import SyntheticDataset
+from benchmarks.bench_async_api import FILMS, STARSHIPS, _free_port, _wait_for
+
+cli = typer.Typer()
+
+MODES = (
+    ("uncached", {"RESPONSE_CACHE_SECONDS": "0"}),
+    ("in-process", {"RESPONSE_CACHE_PATH": ""}),
+    ("shared", {}),
+)
+
+
+def start_api(directory: str, workers: int, env: dict) -> tuple[subprocess.Popen, int]:
+    """
+    Serve the app with `workers` processes from `directory`, so that they use the `starwars.db` there.
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "error"],
+        cwd=directory, env={**os.environ, "PYTHONPATH": os.getcwd(), **env}, stderr=subprocess.DEVNULL,
+    )
+    _wait_for(port)
+    return process, port
+
+async def load(api_url: str, people: int, hot: int, concurrency: int, seconds: float) -> tuple[list, int, int]:
+    latencies, hits, failures = [], 0, 0
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal hits, failures
+        while time.perf_counter() < deadline:
+            # Nine in ten requests go to the hot set
+            last = hot if random.random() < 0.9 else people
+            if random.random() < 0.8:
+                path = f"/characters/{random.randint(1, last)}"
+            else:
+                path = f"/characters/?skip={random.randint(0, last // 10) * 10}&limit=10"
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+                hits += response.headers.get("x-cache") == "HIT"
+            except httpx.HTTPError:
+                failures += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=api_url, timeout=10.0, limits=limits) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    return latencies, hits, failures
+
+@cli.command()
+def main(
+        people: int = typer.Option(2000, "--people", help="Number of synthetic people to seed"),
+        hot: int = typer.Option(200, "--hot", help="Number of characters most requests go to"),
+        workers: int = typer.Option(4, "--workers", help="Number of uvicorn workers"),
+        concurrency: int = typer.Option(8, "--concurrency", help="Number of concurrent clients"),
+        seconds: float = typer.Option(10.0, "--seconds", help="Duration of each run"),
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'starwars.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        dataset = SyntheticDataset(films=FILMS, starships=STARSHIPS, people=people, seed=0)
+        write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+        db.commit()
+        db.close()
+        engine.dispose()
+
+        for name, env in MODES:
+            cache_path = os.path.join(tmp, "starwars.db.response-cache")
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            api, port = start_api(tmp, workers, env)
+            try:
+                api_url = f"http://127.0.0.1:{port}/api/v1"
+                asyncio.run(load(api_url, people, hot, concurrency, 1.0))  # warm up
+                latencies, hits, failures = asyncio.run(load(api_url, people, hot, concurrency, seconds))
+            finally:
+                api.kill()
+                api.wait()
+
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [float("nan")] * 99
+            print(f"{name:<10} rps={len(latencies) / seconds:8.1f}  hits={hits / max(len(latencies), 1):6.1%}  "
+                  f"failed={failures:<5} "
+                  f"p50={quantiles[49] * 1000:8.1f}ms  p99={quantiles[98] * 1000:8.1f}ms  "
+                  f"max={max(latencies, default=float('nan')) * 1000:8.1f}ms")
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,70 @@
+"""
+Benchmark full-text name search against the previous substring filter.
+
+Seeds a SQLite database with synthetic characters and runs a few searches
+both ways: `lower(name) LIKE '%text%'`, which scans the whole table, and the
+FTS5 index used by the list endpoints. Each search counts the matches and
+loads the first page, as `GET /characters/?name=...` does; the median time
+over the repeats is reported.
+
+Usage:
+    python -m benchmarks.bench_search [--people 1000000] [--repeats 5]
+"""
+import os
+import statistics
+import tempfile
+import time
+import typer
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+from app.db.search import search
+from app.db.session import Base, create_db_engine
+from app.models import Character
+from app.services.sync_service import write_payloads
+from app.services.synthetic import SyntheticDataset
+
+cli = typer.Typer()
+
+
+def substring(query, text: str):
+    return query.where(func.lower(Character.name).ilike(f"%{text.lower()}%"))
+
+def full_text(query, text: str):
+    return search(query, Character, text, "sqlite")
+
+def run(db, build, text: str) -> int:
+    query = build(select(Character), text)
+    total = db.scalar(select(func.count()).select_from(query.subquery()))
+    db.scalars(query.limit(10)).all()
+    return total
+
+@cli.command()
+def main(
+        people: int = typer.Option(1_000_000, "--people", help="Number of synthetic characters to seed"),
+        repeats: int = typer.Option(5, "--repeats", help="Runs per search, of which the median is reported"),
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'starwars.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        dataset = SyntheticDataset(films=6, starships=36, people=people, seed=0)
+        started = time.perf_counter()
+        write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+        db.commit()
+        print(f"seeded {people} characters in {time.perf_counter() - started:.1f}s")
+
+        name = dataset.record("people", people // 2)["name"]
+        searches = (name, name.split()[0][:3], "zzz")
+        for text in searches:
+            for label, build in (("substring", substring), ("full-text", full_text)):
+                timings = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    total = run(db, build, text)
+                    timings.append(time.perf_counter() - started)
+                print(f"{text!r:<20} {label:<10} matches={total:<8} median={statistics.median(timings) * 1000:9.2f}ms")
+        db.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    cli()
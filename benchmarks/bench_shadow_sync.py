@@ -0,0 +1,160 @@
+"""
+Benchmark API read latency while a large sync runs.
+
+Seeds a SQLite database with synthetic data, serves it through the API, and
+syncs a changed version of every row from the local fake-SWAPI server, once
+in place and once through a shadow database file. Concurrent readers fetch
+random characters throughout; their p50/p99/max latency and failures are
+reported per mode, next to an idle baseline.
+
+Usage:
+    python -m benchmarks.bench_shadow_sync [--people 10000] [--readers 4]
+"""
+import asyncio
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import httpx
+import typer
+import uvicorn
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.session import Base
+from app.fake_swapi import create_app
+from app.services.shadow_sync import run_shadow_sync
+from app.services.sync_service import run_sync, write_payloads
+from app.services.synthetic import SyntheticDataset
+
+cli = typer.Typer()
+
+FILMS = 6
+STARSHIPS = 36
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_for(port: int) -> None:
+    for _ in range(1000):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.01)
+
+def _run_fake_swapi(people: int, port: int) -> None:
+    app = create_app(films=FILMS, starships=STARSHIPS, people=people, seed=1)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error")
+
+def start_fake_swapi(people: int) -> tuple[multiprocessing.Process, int]:
+    port = _free_port()
+    process = multiprocessing.Process(target=_run_fake_swapi, args=(people, port), daemon=True)
+    process.start()
+    _wait_for(port)
+    return process, port
+
+def start_api(directory: str) -> tuple[subprocess.Popen, int]:
+    """
+    Run the API in a fresh interpreter whose working directory is `directory`,
+    so that it serves the `starwars.db` there.
+    """
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "error"],
+        cwd=directory, env=env,
+    )
+    _wait_for(port)
+    return process, port
+
+def new_session(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+def read_while(running: threading.Event, api_url: str, people: int, latencies: list, failures: list) -> None:
+    with httpx.Client(base_url=api_url, timeout=30.0) as client:
+        while running.is_set():
+            started = time.perf_counter()
+            try:
+                client.get(f"/characters/{random.randint(1, people)}").raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                failures.append(time.perf_counter() - started)
+
+def measure(name: str, work, api_url: str, people: int, readers: int) -> None:
+    latencies, failures = [], []
+    running = threading.Event()
+    running.set()
+    threads = [
+        threading.Thread(target=read_while, args=(running, api_url, people, latencies, failures))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    error = None
+    try:
+        work()
+    except Exception as exc:
+        error = exc
+    finally:
+        elapsed = time.perf_counter() - started
+        running.clear()
+        for thread in threads:
+            thread.join()
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [float("nan")] * 99
+    print(f"{name:<9} time={elapsed:7.2f}s  reads={len(latencies):<7} failed={len(failures):<5} "
+          f"p50={quantiles[49] * 1000:8.1f}ms  p99={quantiles[98] * 1000:8.1f}ms  "
+          f"max={max(latencies + failures) * 1000:8.1f}ms" + (f"  sync failed: {error}" if error else ""))
+
+@cli.command()
+def main(
+        people: int = typer.Option(10_000, "--people", help="Number of synthetic people to seed and sync"),
+        readers: int = typer.Option(4, "--readers", help="Number of concurrent API readers"),
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        pristine = os.path.join(tmp, "pristine.db")
+        db = new_session(pristine)
+        dataset = SyntheticDataset(films=FILMS, starships=STARSHIPS, people=people, seed=0)
+        write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+        db.commit()
+        db.close()
+
+        swapi, swapi_port = start_fake_swapi(people)
+        base_url = f"http://127.0.0.1:{swapi_port}/api"
+        try:
+            for name, sync in (("idle", None), ("in-place", run_sync), ("shadow", run_shadow_sync)):
+                live = os.path.join(tmp, "starwars.db")
+                shutil.copy(pristine, live)
+                api, api_port = start_api(tmp)
+                db = new_session(live)
+                try:
+                    if sync is None:
+                        work = lambda: time.sleep(5)
+                    else:
+                        work = lambda: asyncio.run(sync(db, base_urls=[base_url], full=True))
+                    measure(name, work, f"http://127.0.0.1:{api_port}/api/v1", people, readers)
+                finally:
+                    db.close()
+                    api.terminate()
+                    api.wait()
+                for suffix in ("", "-wal", "-shm", "-journal"):
+                    if os.path.exists(live + suffix):
+                        os.remove(live + suffix)
+        finally:
+            swapi.terminate()
+
+if __name__ == "__main__":
+    cli()
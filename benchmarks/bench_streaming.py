@@ -0,0 +1,101 @@
+"""
+Benchmark streaming SWAPI ingestion against the materialised path.
+
+Serves synthetic people from the local fake-SWAPI server and syncs them
+into a fresh SQLite database twice: once with `fetch_all` (whole body parsed
+into one list) and once with the streaming parser feeding fixed-size batches.
+Reports wall time and tracemalloc peak for each.
+
+Usage:
+    python -m benchmarks.bench_streaming [--people 1000000] [--batch-size 500]
+"""
+import asyncio
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+import tracemalloc
+import typer
+import uvicorn
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.session import Base
+from app.fake_swapi import create_app
+from app.services import swapi_client
+from app.services.sync_service import BATCH_SIZE, upsert_characters
+
+cli = typer.Typer()
+
+
+def _run_server(count: int, port: int) -> None:
+    uvicorn.run(create_app(films=0, starships=0, people=count), host="127.0.0.1", port=port, log_level="error")
+
+def serve(count: int) -> tuple[multiprocessing.Process, str]:
+    """
+    Run the synthetic server in a separate process, so that neither its CPU time
+    nor its allocations are attributed to the client being measured.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = multiprocessing.Process(target=_run_server, args=(count, port), daemon=True)
+    process.start()
+    for _ in range(500):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.01)
+    return process, f"http://127.0.0.1:{port}/api"
+
+def new_session(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+async def materialised(db, base_url: str, batch_size: int) -> int:
+    people = await swapi_client.fetch_all("people", base_url=base_url)
+    stats = upsert_characters(db, people, batch_size)
+    db.commit()
+    return stats["inserted"]
+
+async def streaming(db, base_url: str, batch_size: int) -> int:
+    inserted = 0
+    async with swapi_client.stream_conditional("people", base_url=base_url) as (records, _):
+        batch = []
+        async for record in records:
+            batch.append(record)
+            if len(batch) == batch_size:
+                inserted += upsert_characters(db, batch, batch_size)["inserted"]
+                batch = []
+        inserted += upsert_characters(db, batch, batch_size)["inserted"]
+    db.commit()
+    return inserted
+
+def measure(name: str, run, base_url: str, batch_size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = new_session(os.path.join(tmp, "bench.db"))
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = asyncio.run(run(db, base_url, batch_size))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        db.close()
+    print(f"{name:<12} rows={rows:<9} time={elapsed:8.2f}s  rows/s={rows / elapsed:10.0f}  peak={peak / 2**20:8.1f} MiB")
+
+@cli.command()
+def main(
+        people: int = typer.Option(1_000_000, "--people", help="Number of synthetic people to serve"),
+        batch_size: int = typer.Option(BATCH_SIZE, "--batch-size", help="Rows written per bulk statement"),
+):
+    server, base_url = serve(people)
+    try:
+        measure("streaming", streaming, base_url, batch_size)
+        measure("materialised", materialised, base_url, batch_size)
+    finally:
+        server.terminate()
+
+if __name__ == "__main__":
+    cli()
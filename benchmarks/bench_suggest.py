@@ -0,0 +1,55 @@
+"""
+Benchmark the in-memory suggestion index.
+
+Builds the index from synthetic character, starship and film names and
+reports the build time, the growth of peak RSS, and the p50/p99 latency of
+suggestion queries for random prefixes of 1 to 6 characters.
+
+Usage:
+    python -m benchmarks.bench_suggest [--people 1000000] [--queries 100000]
+"""
+import random
+import resource
+import statistics
+import time
+import typer
+from app.services.suggest_service import SuggestIndex
+from app.services.synthetic import SyntheticDataset
+
+cli = typer.Typer()
+
+
+@cli.command()
+def main(
+        people: int = typer.Option(1_000_000, "--people", help="Number of synthetic characters to index"),
+        queries: int = typer.Option(100_000, "--queries", help="Number of suggestion queries to time"),
+):
+    dataset = SyntheticDataset(films=6, starships=36, people=people, seed=0)
+    rows = [
+        (kind, int(record["url"].rstrip("/").split("/")[-1]), record.get("name") or record.get("title"))
+        for kind, source in (("film", "films"), ("starship", "starships"), ("character", "people"))
+        for record in dataset.records(source)
+    ]
+
+    index = SuggestIndex()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index.build(rows)
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is in KiB on Linux
+    growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+    print(f"built {len(index)} entries in {elapsed:.2f}s, peak RSS +{growth / 1024:.0f} MiB")
+
+    random.seed(0)
+    prefixes = [name[:random.randint(1, 6)] for _, _, name in random.choices(rows, k=queries)]
+    latencies = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.suggest(prefix)
+        latencies.append(time.perf_counter() - started)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{queries} queries  p50={quantiles[49] * 1e6:.1f}us  p99={quantiles[98] * 1e6:.1f}us  "
+          f"max={max(latencies) * 1e6:.1f}us")
+
+if __name__ == "__main__":
+    cli()
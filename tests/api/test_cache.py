@@ -0,0 +1,72 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.db.deps import get_db
+from app.main import app
+from app.models import Character, Film
+from app.services.response_cache import response_cache
+
+
+@pytest.fixture
+def cached(monkeypatch):
+    monkeypatch.setattr(response_cache, "ttl", 60)
+    response_cache.clear()
+    yield response_cache
+    response_cache.clear()
+
+@pytest.fixture
+def setup_test_data(db):
+    db.add_all([Film(id=1, title="A New Hope", episode_id=4), Character(name="Luke Skywalker")])
+    db.commit()
+    yield
+
+def test_repeated_get_is_served_from_the_cache_without_a_session(client: TestClient, setup_test_data, cached):
+    first = client.get("/api/v1/films/1")
+    assert first.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+
+    async def no_session():
+        raise AssertionError("a cache hit must not open a session")
+        yield
+
+    app.dependency_overrides[get_db] = no_session
+    second = client.get("/api/v1/films/1")
+    assert second.status_code == 200
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json()
+
+    stats = client.get("/api/v1/cache/").json()
+    assert stats["enabled"] is True
+    assert stats["localHits"] == 1
+    assert stats["misses"] == 1
+
+def test_query_parameter_order_shares_a_cache_entry(client: TestClient, setup_test_data, cached):
+    assert client.get("/api/v1/characters/?limit=5&skip=0").headers["x-cache"] == "MISS"
+    assert client.get("/api/v1/characters/?skip=0&limit=5").headers["x-cache"] == "HIT"
+
+def test_errors_are_not_cached(client: TestClient, setup_test_data, cached):
+    assert client.get("/api/v1/films/2").status_code == 404
+    assert client.get("/api/v1/films/2").headers["x-cache"] == "MISS"
+
+def test_create_invalidates_the_responses_that_include_it(client: TestClient, setup_test_data, cached):
+    assert len(client.get("/api/v1/films/").json()["items"][0]["characters"]) == 0
+    assert client.get("/api/v1/films/?include=").headers["x-cache"] == "MISS"
+
+    response = client.post("/api/v1/characters/", json={"name": "Leia Organa", "film_ids": [1]})
+    assert response.status_code == 201
+
+    films = client.get("/api/v1/films/")
+    assert films.headers["x-cache"] == "MISS"
+    assert len(films.json()["items"][0]["characters"]) == 1
+    assert client.get("/api/v1/films/?include=").headers["x-cache"] == "HIT"
+
+def test_include_with_spaces_is_keyed_on_the_relations_it_loads(client: TestClient, setup_test_data, cached):
+    path = "/api/v1/characters/?include=films,%20starships"
+    assert client.get(path).json()["items"][0]["starships"] == []
+    assert client.get(path).headers["x-cache"] == "HIT"
+
+    starship = client.post("/api/v1/starships/", json={"name": "X-wing", "character_ids": [1]})
+    assert starship.status_code == 201
+
+    response = client.get(path)
+    assert response.headers["x-cache"] == "MISS"
+    assert [s["name"] for s in response.json()["items"][0]["starships"]] == ["X-wing"]
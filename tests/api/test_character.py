@@ -79,3 +79,56 @@ def test_list_characters_api(client: TestClient, setup_test_data):
     assert "items" in data
     assert isinstance(data["items"], list)
     assert len(data["items"]) >= 1
+
+def test_list_characters_api_filters_and_sorts_by_height(client: TestClient, setup_test_data):
+    for name, height in (("Short", "96"), ("Tall", "228"), ("Unknown", "unknown")):
+        payload = {"name": name, "height": height, "mass": "50", "film_ids": [], "starship_ids": []}
+        assert client.post("/api/v1/characters/", json=payload).status_code == 201
+
+    response = client.get("/api/v1/characters/", params={"min_height": 90, "max_height": 250, "sort": "-height"})
+    assert response.status_code == 200
+    assert [c["name"] for c in response.json()["items"]] == ["Tall", "Short"]
+
+def test_list_characters_api_rejects_unknown_sort(client: TestClient):
+    response = client.get("/api/v1/characters/", params={"sort": "opening_crawl"})
+    assert response.status_code == 422
+
+def test_list_characters_api_rejects_tampered_cursor(client: TestClient):
+    # ["height",{},1]
+    response = client.get("/api/v1/characters/", params={"sort": "height", "cursor": "WyJoZWlnaHQiLHt9LDFd"})
+    assert response.status_code == 400
+
+def test_get_character_api_includes_only_requested_relationships(client: TestClient, setup_test_data):
+    payload = {"name": "Luke", "film_ids": [1, 2], "starship_ids": [1]}
+    character_id = client.post("/api/v1/characters/", json=payload).json()["id"]
+
+    data = client.get(f"/api/v1/characters/{character_id}", params={"include": "films"}).json()
+    assert sorted(film["id"] for film in data["films"]) == [1, 2]
+    assert data["starships"] is None
+
+    data = client.get("/api/v1/characters/", params={"include": ""}).json()
+    assert data["items"][0]["films"] is None and data["items"][0]["starships"] is None
+
+    response = client.get("/api/v1/characters/", params={"include": "films,homeworld"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown include: homeworld"
+
+def test_batch_get_characters_api(client: TestClient, setup_test_data):
+    luke = client.post("/api/v1/characters/", json={"name": "Luke", "film_ids": [1], "starship_ids": [2]}).json()
+    leia = client.post("/api/v1/characters/", json={"name": "Leia", "film_ids": [2]}).json()
+
+    response = client.get("/api/v1/characters/batch", params={"ids": f"{leia['id']},404,{luke['id']}",
+                                                               "include": "films"})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [entry["id"] for entry in items] == [leia["id"], 404, luke["id"]]
+    assert items[0]["item"]["name"] == "Leia" and items[0]["error"] is None
+    assert [film["id"] for film in items[0]["item"]["films"]] == [2]
+    assert items[0]["item"]["starships"] is None
+    assert items[1] == {"id": 404, "item": None, "error": "Character not found"}
+    assert "etag" in response.headers
+
+    assert client.get("/api/v1/characters/batch", params={"ids": "1,x"}).status_code == 422
+    assert client.get("/api/v1/characters/batch?ids=1,%C2%B2").status_code == 422
+    assert client.get("/api/v1/characters/batch?ids=99999999999999999999").status_code == 422
+    assert client.get("/api/v1/characters/batch").status_code == 422
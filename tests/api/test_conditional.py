@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.api import films
+from app.models import Character, Film
+from app.services.response_cache import response_cache
+
+
+@pytest.fixture
+def setup_test_data(db):
+    db.add_all([Film(id=1, title="A New Hope", episode_id=4), Character(name="Luke Skywalker")])
+    db.commit()
+    yield
+
+def test_get_returns_validators_and_304_when_unchanged(client: TestClient, setup_test_data, monkeypatch):
+    response = client.get("/api/v1/films/")
+    assert response.status_code == 200
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+    assert etag.startswith('"') and last_modified.endswith("GMT")
+
+    async def no_query(*args, **kwargs):
+        raise AssertionError("a 304 must not query the list")
+
+    monkeypatch.setattr(films, "list_films", no_query)
+    not_modified = client.get("/api/v1/films/", headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert client.get("/api/v1/films/", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+def test_etag_changes_with_the_data_it_includes(client: TestClient, setup_test_data):
+    full = client.get("/api/v1/films/1").headers["etag"]
+    bare = client.get("/api/v1/films/1?include=").headers["etag"]
+    assert full != bare
+
+    response = client.post("/api/v1/characters/", json={"name": "Leia Organa", "film_ids": [1]})
+    assert response.status_code == 201
+
+    changed = client.get("/api/v1/films/1", headers={"If-None-Match": full})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != full
+    assert [character["name"] for character in changed.json()["characters"]] == ["Leia Organa"]
+    assert client.get("/api/v1/films/1?include=", headers={"If-None-Match": bare}).status_code == 304
+
+def test_cached_responses_answer_conditional_requests(client: TestClient, setup_test_data, monkeypatch):
+    monkeypatch.setattr(response_cache, "ttl", 60)
+    response_cache.clear()
+    try:
+        etag = client.get("/api/v1/films/1").headers["etag"]
+        hit = client.get("/api/v1/films/1")
+        assert hit.headers["x-cache"] == "HIT"
+        assert hit.headers["etag"] == etag
+
+        not_modified = client.get("/api/v1/films/1", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["x-cache"] == "HIT"
+    finally:
+        response_cache.clear()
@@ -87,3 +87,29 @@ def test_list_films_api(client: TestClient, setup_test_data):
     assert "items" in data
     assert isinstance(data["items"], list)
     assert len(data["items"]) >= 1
+
+def test_list_films_api_cursor_pagination(client: TestClient):
+    for episode_id in range(1, 6):
+        payload = {"title": f"Episode {episode_id}", "episode_id": episode_id}
+        assert client.post("/api/v1/films/", json=payload).status_code == 201
+
+    titles, params = [], {"limit": 2}
+    while True:
+        data = client.get("/api/v1/films/", params=params).json()
+        assert data["total"] == 5
+        titles.extend(film["title"] for film in data["items"])
+        if not data["nextCursor"]:
+            break
+        params["cursor"] = data["nextCursor"]
+    assert titles == [f"Episode {episode_id}" for episode_id in range(1, 6)]
+
+    assert client.get("/api/v1/films/", params={"cursor": "bogus"}).status_code == 400
+
+def test_list_films_api_count_modes(client: TestClient):
+    assert client.post("/api/v1/films/", json={"title": "A New Hope", "episode_id": 4}).status_code == 201
+
+    assert client.get("/api/v1/films/", params={"count": "estimated"}).json()["total"] == 1
+    data = client.get("/api/v1/films/", params={"count": "none"}).json()
+    assert data["total"] is None
+    assert len(data["items"]) == 1
+    assert client.get("/api/v1/films/", params={"count": "approximate"}).status_code == 422
@@ -0,0 +1,26 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.models import Character, Film
+
+
+@pytest.fixture
+def setup_test_data(db):
+    character = Character(name="Luke Skywalker")
+    db.add_all([Film(id=1, title="A New Hope", episode_id=4), character])
+    db.commit()
+    yield character
+
+def test_suggest_api_serves_data_loaded_at_startup(setup_test_data, client: TestClient):
+    response = client.get("/api/v1/suggest/", params={"q": "sky"})
+    assert response.status_code == 200
+    assert response.json() == [{"type": "character", "id": setup_test_data.id, "name": "Luke Skywalker"}]
+
+def test_suggest_api_includes_created_rows(setup_test_data, client: TestClient):
+    response = client.post("/api/v1/characters/", json={"name": "Han Solo", "film_ids": [1], "starship_ids": []})
+    assert response.status_code == 201
+
+    data = client.get("/api/v1/suggest/", params={"q": "han", "limit": 5}).json()
+    assert data == [{"type": "character", "id": response.json()["id"], "name": "Han Solo"}]
+
+def test_suggest_api_requires_query(client: TestClient):
+    assert client.get("/api/v1/suggest/").status_code == 422
@@ -0,0 +1,21 @@
+from datetime import datetime
+from fastapi.testclient import TestClient
+from app.models import SyncRun
+
+
+def test_sync_status_without_runs(client: TestClient):
+    response = client.get("/api/v1/sync/status")
+    assert response.status_code == 200
+    assert response.json() == {"lastRun": None, "scheduler": None}
+
+def test_sync_status_reports_last_run(client: TestClient, db):
+    db.add_all([
+        SyncRun(started_at=datetime(2025, 1, 1), status="failed", error="boom"),
+        SyncRun(started_at=datetime(2025, 1, 2), status="succeeded", wall_seconds=1.5, statements=12),
+    ])
+    db.commit()
+
+    data = client.get("/api/v1/sync/status").json()["lastRun"]
+    assert data["status"] == "succeeded"
+    assert data["wallSeconds"] == 1.5
+    assert data["startedAt"].startswith("2025-01-02")
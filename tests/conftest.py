@@ -1,22 +1,60 @@
+import os
+import threading
+import time
 import pytest
+import pytest_asyncio
+import uvicorn
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
+
+# Tests write around the API, which does not bump the data versions, so responses
+# are only cached where a test turns the cache on, and never in a file
+os.environ.setdefault("RESPONSE_CACHE_SECONDS", "0")
+os.environ.setdefault("RESPONSE_CACHE_PATH", "")
+
 from app.main import app
-from app.db.session import Base
-from app.db.deps import get_db
+from app.db.session import Base, async_url, create_db_engine
+from app.db.deps import get_db, get_write_db
 
-# In-memory SQLite URL with shared cache for concurrency
-SQLALCHEMY_DATABASE_URL = "sqlite:///file::memory:?cache=shared"
+# In-memory SQLite URL with shared cache for concurrency; set TEST_DATABASE_URL
+# to run the suite against another database, e.g. the PostgreSQL stand-in
+SQLALCHEMY_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///file::memory:?cache=shared")
 
-# Create engine with URI flag and check_same_thread False for FastAPI concurrency
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False, "uri": True},
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    # Create engine with URI flag and check_same_thread False for FastAPI concurrency
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False, "uri": True},
+    )
+    async_connect_args = {"check_same_thread": False, "uri": True}
+else:
+    engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+    async_connect_args = {}
+
+# Async engine on the same database for the API request path. Without pooling,
+# each session connects on the event loop that uses it (the test's, or the
+# TestClient's)
+async_engine = create_async_engine(
+    async_url(SQLALCHEMY_DATABASE_URL), connect_args=async_connect_args, poolclass=NullPool
 )
 
-# Session factory bound to the test engine
+# Session factories bound to the test engines
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "sqlite_only: test relies on SQLite-specific features")
+
+def pytest_collection_modifyitems(config, items):
+    if engine.dialect.name == "sqlite":
+        return
+    skip = pytest.mark.skip(reason=f"SQLite-only test, running against {engine.dialect.name}")
+    for item in items:
+        if "sqlite_only" in item.keywords:
+            item.add_marker(skip)
 
 @pytest.fixture(scope="function")
 def db() -> Session:
@@ -32,22 +70,57 @@ def db() -> Session:
         session.close()
         Base.metadata.drop_all(bind=engine)
 
+@pytest_asyncio.fixture(scope="function")
+async def async_db(db: Session) -> AsyncSession:
+    """
+    Provides an async session on the schema of the `db` fixture.
+    """
+    db.commit()
+    async with AsyncTestingSessionLocal() as session:
+        yield session
+
 @pytest.fixture(scope="function")
 def client(db: Session):
     """
-    Provides a TestClient instance that overrides the app's database dependency
-    to use the test session, allowing isolated testing of API routes.
+    Provides a TestClient instance that overrides the app's database dependencies
+    to use async sessions on the test database, allowing isolated testing of API routes.
     """
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            pass
+    async def override_get_db():
+        # Data set up through the sync session must be visible to the request
+        db.commit()
+        async with AsyncTestingSessionLocal() as session:
+            yield session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_write_db] = override_get_db
 
     with TestClient(app) as client:
         yield client
 
     # Remove override to avoid affecting other tests
     app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_write_db, None)
+
+@pytest.fixture
+def serve_app():
+    """
+    Runs ASGI apps on a local uvicorn server in a background thread,
+    standing in for SWAPI over real HTTP. Returns the `/api` base URL.
+    """
+    servers = []
+
+    def start(asgi_app) -> str:
+        server = uvicorn.Server(uvicorn.Config(asgi_app, host="127.0.0.1", port=0, log_level="error"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        servers.append((server, thread))
+        port = server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/api"
+
+    yield start
+
+    for server, thread in servers:
+        server.should_exit = True
+        thread.join(timeout=5)
@@ -1,9 +1,15 @@
+import base64
+import json
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import Film, Starship
+from app.models.character import parse_measure
 from app.schemas.character import CharacterCreate
 from app.services.character_service import list_characters, get_character, create_character
+from app.services.sync_service import upsert_characters
 
 
 @pytest.fixture
@@ -33,87 +39,223 @@ def make_character_data(**overrides) -> dict:
     base_data.update(overrides)
     return base_data
 
-def test_create_character_success(db: Session, sample_films, sample_starships):
+@pytest.mark.asyncio
+async def test_create_character_success(async_db: AsyncSession, sample_films, sample_starships):
     character_in = CharacterCreate(**make_character_data(
         film_ids=[f.id for f in sample_films],
         starship_ids=[s.id for s in sample_starships]
     ))
-    character = create_character(db, character_in)
+    character = await create_character(async_db, character_in)
 
     assert character.id is not None
     assert character.name == "Test Character"
     assert len(character.films) == 2
     assert len(character.starships) == 2
 
-def test_create_character_film_not_found(db: Session, sample_starships):
+@pytest.mark.asyncio
+async def test_create_character_film_not_found(async_db: AsyncSession, sample_starships):
     character_in = CharacterCreate(**make_character_data(
         film_ids=[999],  # Nonexistent Film
         starship_ids=[s.id for s in sample_starships]
     ))
 
     with pytest.raises(HTTPException) as exc_info:
-        create_character(db, character_in)
+        await create_character(async_db, character_in)
 
     assert exc_info.value.status_code == 404
     assert "films" in exc_info.value.detail.lower()
 
-def test_create_character_starship_not_found(db: Session, sample_films):
+@pytest.mark.asyncio
+async def test_create_character_starship_not_found(async_db: AsyncSession, sample_films):
     character_in = CharacterCreate(**make_character_data(
         film_ids=[f.id for f in sample_films],
         starship_ids=[999],  # Nonexistent Starship
     ))
 
     with pytest.raises(HTTPException) as exc_info:
-        create_character(db, character_in)
+        await create_character(async_db, character_in)
 
     assert exc_info.value.status_code == 404
     assert "starships" in exc_info.value.detail.lower()
 
-def test_get_character_success(db: Session, sample_films, sample_starships):
+@pytest.mark.asyncio
+async def test_get_character_success(async_db: AsyncSession, sample_films, sample_starships):
     character_in = CharacterCreate(**make_character_data(
         film_ids=[f.id for f in sample_films],
         starship_ids=[s.id for s in sample_starships]
     ))
-    created = create_character(db, character_in)
+    created = await create_character(async_db, character_in)
 
-    fetched = get_character(db, created.id)
+    fetched = await get_character(async_db, created.id)
 
     assert fetched.id == created.id
     assert fetched.name == "Test Character"
 
-def test_get_character_not_found(db: Session):
+@pytest.mark.asyncio
+async def test_get_character_not_found(async_db: AsyncSession):
     from fastapi import HTTPException
     with pytest.raises(HTTPException) as exc_info:
-        get_character(db, 999999)
+        await get_character(async_db, 999999)
     assert exc_info.value.status_code == 404
 
-def test_list_characters(db: Session):
+@pytest.mark.asyncio
+async def test_list_characters(async_db: AsyncSession):
     CharacterCreate(**make_character_data())
-    result = list_characters(db)
+    result = await list_characters(async_db)
     assert "total" in result
     assert "items" in result
     assert isinstance(result["items"], list)
 
-def test_list_characters_with_name_filter(db: Session):
+@pytest.mark.asyncio
+async def test_list_characters_with_name_filter(async_db: AsyncSession):
     # Create characters
-    create_character(db, CharacterCreate(**make_character_data(name="John Doe")))
-    create_character(db, CharacterCreate(**make_character_data(name="Jane Doe")))
+    await create_character(async_db, CharacterCreate(**make_character_data(name="John Doe")))
+    await create_character(async_db, CharacterCreate(**make_character_data(name="Jane Doe")))
 
     # Search for 'John'
-    result = list_characters(db, name="john")
+    result = await list_characters(async_db, name="john")
     assert result["total"] == 1
     assert result["items"][0].name == "John Doe"
 
     # Search for 'Jane'
-    result = list_characters(db, name="jane")
+    result = await list_characters(async_db, name="jane")
     assert result["total"] == 1
     assert result["items"][0].name == "Jane Doe"
 
     # Search for both 'John' and 'Jane' Doe
-    result = list_characters(db, name="doe")
+    result = await list_characters(async_db, name="doe")
     assert result["total"] == 2
 
     # Search for something nonexistent
-    result = list_characters(db, name="Noone")
+    result = await list_characters(async_db, name="Noone")
     assert result["total"] == 0
     assert result["items"] == []
+
+@pytest.mark.asyncio
+async def test_list_characters_search_matches_word_prefixes_by_relevance(async_db: AsyncSession):
+    for name in ("Anakin Skywalker", "Skywalker", "Leia Organa"):
+        await create_character(async_db, CharacterCreate(**make_character_data(name=name)))
+
+    result = await list_characters(async_db, name="SKY")
+    assert [c.name for c in result["items"]] == ["Skywalker", "Anakin Skywalker"]
+
+    result = await list_characters(async_db, name="ana sky")
+    assert result["total"] == 1
+    assert result["items"][0].name == "Anakin Skywalker"
+
+    # Words match from their start only
+    result = await list_characters(async_db, name="walker")
+    assert result["total"] == 0
+
+@pytest.mark.asyncio
+async def test_list_characters_search_follows_synced_names(db: Session, async_db: AsyncSession):
+    upsert_characters(db, [{"url": "https://swapi.info/api/people/1", "name": "Luke Skywalker", "height": "172",
+                            "mass": "77", "films": [], "starships": []}])
+    db.commit()
+    upsert_characters(db, [{"url": "https://swapi.info/api/people/1", "name": "Biggs Darklighter", "height": "183",
+                            "mass": "84", "films": [], "starships": []}])
+    db.commit()
+
+    assert (await list_characters(async_db, name="luke"))["total"] == 0
+    result = await list_characters(async_db, name="biggs")
+    assert [c.id for c in result["items"]] == [1]
+
+@pytest.mark.parametrize("value, expected", [("172", 172.0), ("1,358", 1358.0), ("78.2", 78.2), ("unknown", None),
+                                             ("n/a", None), (None, None)])
+def test_parse_measure(value, expected):
+    assert parse_measure(value) == expected
+
+@pytest.mark.asyncio
+async def test_list_characters_filters_height_and_mass_ranges_and_sorts(async_db: AsyncSession):
+    for name, height, mass in (("Yoda", "66", "17"), ("Luke", "172", "77"), ("Jabba", "175", "1,358"),
+                               ("Chewbacca", "228", "112"), ("Ackbar", "180", "unknown")):
+        await create_character(async_db, CharacterCreate(**make_character_data(name=name, height=height, mass=mass)))
+
+    result = await list_characters(async_db, min_height=170, max_height=200, sort="-height")
+    assert [c.name for c in result["items"]] == ["Ackbar", "Jabba", "Luke"]
+    assert result["total"] == 3
+
+    result = await list_characters(async_db, min_mass=100, sort="mass")
+    assert [c.name for c in result["items"]] == ["Chewbacca", "Jabba"]
+
+    # Unknown values sort last in both directions
+    result = await list_characters(async_db, sort="mass")
+    assert [c.name for c in result["items"]] == ["Yoda", "Luke", "Chewbacca", "Jabba", "Ackbar"]
+    result = await list_characters(async_db, sort="-mass", limit=2)
+    assert [c.name for c in result["items"]] == ["Jabba", "Chewbacca"]
+    assert result["total"] == 5
+
+@pytest.mark.asyncio
+async def test_list_characters_cursor_walk_matches_sorted_list(async_db: AsyncSession):
+    for name, mass in (("Yoda", "17"), ("Luke", "77"), ("Leia", "unknown"), ("Owen", "77"), ("Jabba", "1,358"),
+                       ("Beru", "unknown"), ("R2-D2", "32")):
+        await create_character(async_db, CharacterCreate(**make_character_data(name=name, mass=mass)))
+
+    for sort in ("-mass", "mass", "name"):
+        expected = [c.name for c in (await list_characters(async_db, limit=100, sort=sort))["items"]]
+        walked, cursor = [], None
+        while True:
+            page = await list_characters(async_db, limit=2, sort=sort, cursor=cursor)
+            walked.extend(c.name for c in page["items"])
+            if not (cursor := page["next_cursor"]):
+                break
+        assert walked == expected
+
+    # A cursor only continues the sort it was created for
+    page = await list_characters(async_db, limit=2, sort="mass")
+    with pytest.raises(HTTPException) as exc:
+        await list_characters(async_db, limit=2, sort="-mass", cursor=page["next_cursor"])
+    assert exc.value.status_code == 400
+
+@pytest.mark.asyncio
+@pytest.mark.sqlite_only
+@pytest.mark.parametrize("sort", ["name", "-name"])
+async def test_list_characters_name_pages_use_index(async_db: AsyncSession, db: Session, sort):
+    for name in ("Yoda", "Luke", "Leia"):
+        await create_character(async_db, CharacterCreate(**make_character_data(name=name)))
+    page = await list_characters(async_db, limit=1, sort=sort, count="none")
+
+    statements = []
+    engine = async_db.get_bind()
+    record = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        await list_characters(async_db, limit=1, sort=sort, cursor=page["next_cursor"], count="none")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    statement, parameters = statements[0]
+    plan = " ".join(row[3] for row in db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters))
+    assert "ix_characters_name_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort, payload", [
+    ("height", ["height", {}, 1]),
+    ("height", ["height", 172, "1"]),
+    ("height", ["height", True, 1]),
+    ("height", ["height", None, None]),
+    ("name", ["name", None, 1]),
+    ("name", ["name", 5, 1]),
+    ("id", ["id", "x"]),
+    ("id", ["id", 1.5]),
+])
+async def test_list_characters_rejects_tampered_cursor(async_db: AsyncSession, sort, payload):
+    cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    with pytest.raises(HTTPException) as exc:
+        await list_characters(async_db, sort=sort, cursor=cursor)
+    assert exc.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_characters_search_by_relevance_has_no_cursor(async_db: AsyncSession):
+    for name in ("Luke Skywalker", "Anakin Skywalker", "Shmi Skywalker"):
+        await create_character(async_db, CharacterCreate(**make_character_data(name=name)))
+
+    ranked = await list_characters(async_db, limit=1, name="skywalker")
+    assert len(ranked["items"]) == 1
+    assert ranked["next_cursor"] is None
+    assert (await list_characters(async_db, limit=0))["items"] == []
+    assert (await list_characters(async_db, limit=0, name="skywalker"))["items"] == []
+    page = await list_characters(async_db, limit=1, name="skywalker", sort="id")
+    page = await list_characters(async_db, limit=2, name="skywalker", sort="id", cursor=page["next_cursor"])
+    assert [c.name for c in page["items"]] == ["Anakin Skywalker", "Shmi Skywalker"]
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.counts import get_row_count, get_table_versions, row_counts
+from app.models import Character
+from app.services import pagination
+from app.services.character_service import list_characters
+from app.services.pagination import CountCache
+from app.services.sync_service import upsert_characters
+
+
+def stored_counts(db: Session) -> dict:
+    return dict(db.execute(select(row_counts.c.table_name, row_counts.c.row_count)).all())
+
+def make_person(person_id: int, name: str) -> dict:
+    return {"url": f"https://swapi.info/api/people/{person_id}/", "name": name, "height": "172", "mass": "77",
+            "films": [], "starships": []}
+
+def test_row_counts_follow_inserts_upserts_and_deletes(db: Session):
+    assert stored_counts(db) == {"films": 0, "starships": 0, "characters": 0}
+
+    upsert_characters(db, [make_person(1, "Luke"), make_person(2, "Leia")])
+    db.commit()
+    upsert_characters(db, [make_person(2, "Leia Organa"), make_person(3, "Han")])
+    db.add(Character(id=4, name="Chewbacca"))
+    db.commit()
+    assert stored_counts(db)["characters"] == 4
+
+    db.execute(delete(Character).where(Character.id <= 2))
+    db.commit()
+    assert stored_counts(db)["characters"] == 2
+
+@pytest.mark.asyncio
+async def test_table_versions_move_on_every_change(async_db: AsyncSession):
+    async def versions():
+        return await get_table_versions(async_db, ["characters", "films"])
+
+    initial = await versions()
+    assert set(initial) == {"characters", "films"}
+
+    async_db.add(Character(name="Han"))
+    await async_db.commit()
+    inserted = await versions()
+    assert inserted["characters"][0] > initial["characters"][0]
+    assert inserted["characters"][1] >= initial["characters"][1]
+    assert inserted["films"] == initial["films"]
+
+    await async_db.execute(update(Character).values(name="Han Solo"))
+    await async_db.commit()
+    updated = await versions()
+    assert updated["characters"][0] > inserted["characters"][0]
+
+    # Statements that change nothing keep the version
+    await async_db.execute(update(Character).where(Character.name == "Greedo").values(name="Greedo"))
+    await async_db.commit()
+    assert await versions() == updated
+
+    await async_db.execute(delete(Character))
+    await async_db.commit()
+    assert (await versions())["characters"][0] > updated["characters"][0]
+
+@pytest.mark.asyncio
+async def test_list_counts_are_exact_estimated_or_skipped(async_db: AsyncSession, monkeypatch):
+    monkeypatch.setattr(pagination, "count_cache", CountCache(ttl=60))
+    async_db.add_all([Character(name="Luke Skywalker"), Character(name="Anakin Skywalker"), Character(name="Han")])
+    await async_db.commit()
+    assert await get_row_count(async_db, "characters") == 3
+
+    assert (await list_characters(async_db, count="none"))["total"] is None
+    assert (await list_characters(async_db, count="estimated"))["total"] == 3
+    assert (await list_characters(async_db, name="skywalker", count="estimated"))["total"] == 2
+
+    # A rename keeps the row count, so the estimate is reused while the exact count moves
+    await async_db.execute(update(Character).where(Character.name == "Han").values(name="Shmi Skywalker"))
+    await async_db.commit()
+    assert (await list_characters(async_db, name="skywalker", count="estimated"))["total"] == 2
+    assert (await list_characters(async_db, name="skywalker"))["total"] == 3
+
+    # Inserts change the row count and invalidate the estimate
+    async_db.add(Character(name="Cade Skywalker"))
+    await async_db.commit()
+    assert (await list_characters(async_db, name="skywalker", count="estimated"))["total"] == 4
+    assert (await list_characters(async_db))["total"] == 4
+
+def test_count_cache_expires_and_evicts_least_recently_used():
+    cache = CountCache(ttl=60, size=2)
+    cache.put(("a",), 1, 10)
+    cache.put(("b",), 1, 20)
+    assert cache.get(("a",), 1) == 10
+    cache.put(("c",), 1, 30)
+    assert cache.get(("b",), 1) is None
+    assert cache.get(("a",), 2) is None
+    assert cache.get(("c",), 1) == 30
+
+    expired = CountCache(ttl=-1)
+    expired.put(("a",), 1, 10)
+    assert expired.get(("a",), 1) is None
@@ -0,0 +1,47 @@
+import sqlite3
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.db.session import Base, create_db_engine
+
+
+@pytest.fixture
+def engines(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    writer, reader = create_db_engine(url), create_db_engine(url, read_only=True)
+    Base.metadata.create_all(bind=writer)
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+def test_sqlite_profile_is_applied_on_connect(engines):
+    for engine in engines:
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+            assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2  # MEMORY
+            assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -64000
+
+def test_read_engine_refuses_writes(engines):
+    _, reader = engines
+    db = sessionmaker(bind=reader)()
+    with pytest.raises(OperationalError, match="readonly"):
+        db.execute(text("INSERT INTO films (id, title, episode_id) VALUES (1, 'A New Hope', 4)"))
+    db.close()
+
+def test_writer_is_serialized_and_takes_the_write_lock_up_front(engines, tmp_path):
+    writer, _ = engines
+    assert writer.pool.size() == 1
+
+    db = sessionmaker(bind=writer)()
+    db.execute(text("SELECT 1"))
+    other = sqlite3.connect(tmp_path / "profile.db", timeout=0)
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        other.execute("BEGIN IMMEDIATE")
+    db.rollback()
+    other.execute("BEGIN IMMEDIATE")
+    other.rollback()
+    other.close()
+    db.close()
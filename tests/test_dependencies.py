@@ -1,6 +1,7 @@
 import pytest
 from fastapi import HTTPException
-from app.api.dependencies import enforce_json_content_type
+from app.api.dependencies import batch_ids, enforce_json_content_type, include_relations
+from app.services.batch import MAX_BATCH_IDS, MAX_ID
 
 
 def test_enforce_json_content_type_accepts_json():
@@ -15,3 +16,25 @@ def test_enforce_json_content_type_none_header():
     with pytest.raises(HTTPException) as exc:
         enforce_json_content_type(None)
     assert exc.value.status_code == 415
+
+def test_include_relations_defaults_to_all_and_parses_names():
+    include = include_relations("films", "starships")
+    assert include(None) == ("films", "starships")
+    assert include("") == ()
+    assert include(" starships, films,starships") == ("starships", "films")
+
+def test_include_relations_rejects_unknown_names():
+    with pytest.raises(HTTPException) as exc:
+        include_relations("films", "starships")("films,homeworld")
+    assert exc.value.status_code == 422
+
+def test_batch_ids_parses_comma_separated_ids():
+    assert batch_ids("3, 1,,2") == (3, 1, 2)
+    assert batch_ids("") == ()
+    assert batch_ids(str(MAX_ID)) == (MAX_ID,)
+
+@pytest.mark.parametrize("ids", ["1,two", "1,-2", "1,\u00b2", "\u0661", "99999999999999999999", str(MAX_ID + 1), "9" * 5000, ",".join(["1"] * (MAX_BATCH_IDS + 1))])
+def test_batch_ids_rejects_invalid_or_too_many_ids(ids):
+    with pytest.raises(HTTPException) as exc:
+        batch_ids(ids)
+    assert exc.value.status_code == 422
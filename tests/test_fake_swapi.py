@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from sqlalchemy.orm import Session
+from app.fake_swapi import create_app
+from app.models import Film, Starship
+from app.models.character import character_film
+from app.services.swapi_client import FetchScheduler
+from app.services.sync_service import run_sync, write_payloads
+from app.services.synthetic import SyntheticDataset
+
+
+def test_synthetic_dataset_is_deterministic():
+    first = SyntheticDataset(films=3, starships=5, people=20, seed=7)
+    second = SyntheticDataset(films=3, starships=5, people=20, seed=7)
+    assert list(first.records("people")) == list(second.records("people"))
+    assert first.record("people", 4) != SyntheticDataset(3, 5, 20, seed=8).record("people", 4)
+
+def test_synthetic_people_link_to_existing_entities():
+    dataset = SyntheticDataset(films=3, starships=5, people=50)
+    for person in dataset.records("people"):
+        assert 1 <= len(person["films"]) <= 3
+        assert all(int(url.rstrip("/").split("/")[-1]) <= 5 for url in person["starships"])
+
+def test_write_payloads_seeds_database(db: Session):
+    dataset = SyntheticDataset(films=3, starships=5, people=20)
+    stats = write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts}, batch_size=8)
+    db.commit()
+
+    assert stats["characters"]["inserted"] == 20
+    assert db.query(Film).count() == 3
+    assert db.query(Starship).count() == 5
+    assert db.query(character_film).count() == sum(len(p["films"]) for p in dataset.records("people"))
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page_size, max_per_host", [(None, 6), (7, 6), (7, 1)])
+async def test_sync_from_fake_swapi_matches_seed(db: Session, serve_app, page_size, max_per_host):
+    dataset = SyntheticDataset(films=3, starships=5, people=20)
+    write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+    db.commit()
+
+    base_url = serve_app(create_app(films=3, starships=5, people=20, page_size=page_size))
+    stats = await asyncio.wait_for(run_sync(db, scheduler=FetchScheduler([base_url], max_per_host=max_per_host)), 30)
+
+    assert all(s["inserted"] == 0 and s["updated"] == 0 for s in stats.values())
+    assert stats["characters"]["unchanged"] == 20
+
+    stats = await run_sync(db, base_urls=[base_url])
+    assert stats["characters"] == {"not_modified": True}
@@ -1,9 +1,11 @@
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.schemas.film import FilmCreate
 from app.models import Character, Starship
-from app.services.film_service import create_film, get_film, list_films
+from app.services.film_service import batch_get_films, create_film, get_film, list_films
 
 
 @pytest.fixture
@@ -36,87 +38,131 @@ def make_film_data(**overrides) -> dict:
     base_data.update(overrides)
     return base_data
 
-def test_create_film_success(db: Session, sample_characters, sample_starships):
+@pytest.mark.asyncio
+async def test_create_film_success(async_db: AsyncSession, sample_characters, sample_starships):
     film_in = FilmCreate(**make_film_data(
         character_ids=[c.id for c in sample_characters],
         starship_ids=[s.id for s in sample_starships]
     ))
-    film = create_film(db, film_in)
+    film = await create_film(async_db, film_in)
 
     assert film.id is not None
     assert film.title == "Test Film"
     assert len(film.characters) == 2
     assert len(film.starships) == 2
 
-def test_create_film_character_not_found(db: Session, sample_starships):
+@pytest.mark.asyncio
+async def test_create_film_character_not_found(async_db: AsyncSession, sample_starships):
     film_in = FilmCreate(**make_film_data(
         character_ids=[999],  # Nonexistent Character
         starship_ids=[s.id for s in sample_starships]
     ))
 
     with pytest.raises(HTTPException) as exc_info:
-        create_film(db, film_in)
+        await create_film(async_db, film_in)
 
     assert exc_info.value.status_code == 404
     assert "characters" in exc_info.value.detail.lower()
 
-def test_create_film_starship_not_found(db: Session, sample_characters):
+@pytest.mark.asyncio
+async def test_create_film_starship_not_found(async_db: AsyncSession, sample_characters):
     film_in = FilmCreate(**make_film_data(
         character_ids=[c.id for c in sample_characters],
         starship_ids=[999]  # Nonexistent Starship
     ))
 
     with pytest.raises(HTTPException) as exc_info:
-        create_film(db, film_in)
+        await create_film(async_db, film_in)
 
     assert exc_info.value.status_code == 404
     assert "starships" in exc_info.value.detail.lower()
 
-def test_get_film_success(db: Session, sample_characters, sample_starships):
+@pytest.mark.asyncio
+async def test_get_film_success(async_db: AsyncSession, sample_characters, sample_starships):
     film_in = FilmCreate(**make_film_data(
         character_ids=[c.id for c in sample_characters],
         starship_ids=[s.id for s in sample_starships]
     ))
-    created = create_film(db, film_in)
+    created = await create_film(async_db, film_in)
 
-    fetched = get_film(db, created.id)
+    fetched = await get_film(async_db, created.id)
 
     assert fetched.id == created.id
     assert fetched.title == "Test Film"
 
-def test_get_character_not_found(db: Session):
+@pytest.mark.asyncio
+async def test_get_character_not_found(async_db: AsyncSession):
     from fastapi import HTTPException
     with pytest.raises(HTTPException) as exc_info:
-        get_film(db, 999999)
+        await get_film(async_db, 999999)
     assert exc_info.value.status_code == 404
 
-def test_list_films(db: Session):
+@pytest.mark.asyncio
+async def test_list_films(async_db: AsyncSession):
     FilmCreate(**make_film_data())
-    result = list_films(db)
+    result = await list_films(async_db)
     assert "total" in result
     assert "items" in result
     assert isinstance(result["items"], list)
 
-def test_list_films_with_title_filter(db: Session):
+@pytest.mark.asyncio
+async def test_list_films_with_title_filter(async_db: AsyncSession):
     # Create films
-    create_film(db, FilmCreate(**make_film_data(title="John Doe Film")))
-    create_film(db, FilmCreate(**make_film_data(title="Jane Doe Film")))
+    await create_film(async_db, FilmCreate(**make_film_data(title="John Doe Film")))
+    await create_film(async_db, FilmCreate(**make_film_data(title="Jane Doe Film")))
 
     # Search for 'John'
-    result = list_films(db, title="john")
+    result = await list_films(async_db, title="john")
     assert result["total"] == 1
     assert result["items"][0].title == "John Doe Film"
 
     # Search for 'Jane'
-    result = list_films(db, title="jane")
+    result = await list_films(async_db, title="jane")
     assert result["total"] == 1
     assert result["items"][0].title == "Jane Doe Film"
 
     # Search for both 'John' and 'Jane' Doe
-    result = list_films(db, title="doe")
+    result = await list_films(async_db, title="doe")
     assert result["total"] == 2
 
     # Search for something nonexistent
-    result = list_films(db, title="Noone")
+    result = await list_films(async_db, title="Noone")
     assert result["total"] == 0
     assert result["items"] == []
+
+@pytest.mark.asyncio
+async def test_list_and_get_film_load_only_included_relationships(async_db: AsyncSession, sample_characters,
+                                                                  sample_starships):
+    film = await create_film(async_db, FilmCreate(**make_film_data(character_ids=[1], starship_ids=[1])))
+    async_db.expunge_all()
+
+    fetched = await get_film(async_db, film.id, include=("starships",))
+    assert inspect(fetched).unloaded == {"characters"}
+    assert [s.id for s in fetched.starships] == [1]
+    async_db.expunge_all()
+
+    result = await list_films(async_db, include=())
+    assert {"characters", "starships"} <= inspect(result["items"][0]).unloaded
+
+@pytest.mark.asyncio
+async def test_batch_get_films_loads_all_ids_at_once_and_reports_missing(async_db: AsyncSession, sample_characters,
+                                                                         sample_starships):
+    first = await create_film(async_db, FilmCreate(**make_film_data(character_ids=[1, 2])))
+    second = await create_film(async_db, FilmCreate(**make_film_data(title="Other Film", starship_ids=[2])))
+    async_db.expunge_all()
+
+    statements = []
+    engine = async_db.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = await batch_get_films(async_db, [second.id, 999, first.id, second.id], include=("characters",))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # The films, then their characters in one batch
+    assert len(statements) == 2
+    assert [entry["id"] for entry in result["items"]] == [second.id, 999, first.id]
+    assert result["items"][1] == {"id": 999, "error": "Film not found"}
+    assert sorted(c.id for c in result["items"][2]["item"].characters) == [1, 2]
+    assert inspect(result["items"][0]["item"]).unloaded == {"starships"}
@@ -0,0 +1,65 @@
+import json
+import pytest
+from app.services.json_stream import JsonArrayParser
+
+
+def parse_in_chunks(text: str, size: int) -> list:
+    parser = JsonArrayParser()
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    items.extend(parser.close())
+    return items
+
+def test_parses_items_across_every_chunk_boundary():
+    records = [
+        {"name": "Luke Skywalker", "films": ["https://swapi.info/api/films/1/"]},
+        {"name": "R2-D2 \"Artoo\" [droid]", "height": "96"},
+        {"name": "Jabba, the Hutt", "mass": "1,358"},
+        {"name": "Padm\u00e9 \\ Amidala", "nested": [[1, {"x": "]}"}], [], -2.5e3, True, None]},
+    ]
+    text = json.dumps(records, indent=2)
+    for size in range(1, len(text) + 1):
+        assert parse_in_chunks(text, size) == records
+
+def test_parses_scalars_and_empty_arrays():
+    assert parse_in_chunks("[1, 23, 456]", 1) == [1, 23, 456]
+    assert parse_in_chunks("  [ ]  ", 2) == []
+
+def test_rejects_non_array():
+    with pytest.raises(ValueError, match="Expected a JSON array"):
+        parse_in_chunks('{"message": "Not a list"}', 4)
+
+def test_rejects_truncated_array():
+    with pytest.raises(ValueError):
+        parse_in_chunks('[{"name": "Luke"}, {"name": "Le', 8)
+
+def test_rejects_trailing_data():
+    with pytest.raises(ValueError, match="Unexpected data"):
+        parse_in_chunks("[1] [2]", 3)
+
+def test_rejects_malformed_item_without_waiting_for_the_end():
+    parser = JsonArrayParser()
+    with pytest.raises(ValueError):
+        parser.feed('[{"name": "Luke"}, {"name": tru')
+        parser.feed('th, "mass": 77}, {"name": "Leia"')
+
+    with pytest.raises(ValueError, match="Mismatched"):
+        JsonArrayParser().feed('[{"films": [1, 2}, ')
+
+def test_large_item_is_decoded_once():
+    record = {"name": "Luke", "films": [f"https://swapi.info/api/films/{i}/" for i in range(5000)]}
+    text = json.dumps([record, record])
+    parser = JsonArrayParser()
+    decodes = []
+    raw_decode = parser._decoder.raw_decode
+    parser._decoder.raw_decode = lambda *args: decodes.append(args[1]) or raw_decode(*args)
+
+    items = []
+    for start in range(0, len(text), 1000):
+        items.extend(parser.feed(text[start:start + 1000]))
+    items.extend(parser.close())
+
+    assert items == [record, record]
+    # A failed attempt on the first chunk of each item, then one decode once it is complete
+    assert len(decodes) <= 4
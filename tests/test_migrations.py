@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import inspect
+from app.db.migrations import MIGRATIONS, add_table_versions, get_version, migrate, schema_version
+from app.db.session import create_db_engine
+
+pytestmark = pytest.mark.sqlite_only
+
+# Schema of databases created before the migration runner
+LEGACY_SCHEMA = """
+CREATE TABLE films (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, episode_id INTEGER, opening_crawl VARCHAR,
+                    director VARCHAR, producer VARCHAR, release_date VARCHAR);
+CREATE TABLE starships (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, model VARCHAR, starship_class VARCHAR);
+CREATE TABLE characters (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, height VARCHAR, mass VARCHAR);
+CREATE TABLE character_film (character_id INTEGER REFERENCES characters (id), film_id INTEGER REFERENCES films (id));
+CREATE TABLE character_starship (character_id INTEGER REFERENCES characters (id),
+                                 starship_id INTEGER REFERENCES starships (id));
+CREATE TABLE starship_film (starship_id INTEGER REFERENCES starships (id), film_id INTEGER REFERENCES films (id));
+INSERT INTO films (id, title) VALUES (1, 'A New Hope'), (2, 'The Empire Strikes Back');
+INSERT INTO characters (id, name, height, mass) VALUES (1, 'Luke Skywalker', '172', 'unknown');
+INSERT INTO character_film VALUES (1, 1), (1, 1), (1, 2), (1, NULL);
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'starwars.db'}")
+    yield engine
+    engine.dispose()
+
+def test_migrate_upgrades_legacy_database(engine):
+    with engine.connect() as conn:
+        conn.connection.driver_connection.executescript(LEGACY_SCHEMA)
+
+    applied = migrate(engine)
+
+    assert applied == [migration.__name__ for migration in MIGRATIONS]
+    with engine.connect() as conn:
+        assert get_version(conn) == len(MIGRATIONS)
+        inspector = inspect(conn)
+        assert "content_hash" in {column["name"] for column in inspector.get_columns("films")}
+        assert inspector.get_pk_constraint("character_film")["constrained_columns"] == ["character_id", "film_id"]
+        assert {index["name"] for index in inspector.get_indexes("character_film")} == {"ix_character_film_film_id"}
+        assert inspector.has_table("sync_runs")
+        assert "ix_characters_name_id" in {index["name"] for index in inspector.get_indexes("characters")}
+        links = conn.exec_driver_sql("SELECT character_id, film_id FROM character_film ORDER BY film_id").all()
+        assert links == [(1, 1), (1, 2)]
+        assert conn.exec_driver_sql("SELECT count(*) FROM films").scalar() == 2
+        assert conn.exec_driver_sql("SELECT height_num, mass_num FROM characters").one() == (172.0, None)
+        counts = dict(conn.exec_driver_sql("SELECT table_name, row_count FROM row_counts").all())
+        assert counts == {"films": 2, "starships": 0, "characters": 1}
+        assert conn.exec_driver_sql("SELECT count(*) FROM row_counts WHERE modified_at IS NULL").scalar() == 0
+        # Existing rows are indexed for search
+        assert conn.exec_driver_sql("SELECT rowid FROM characters_fts WHERE characters_fts MATCH 'luke'").all() == [(1,)]
+
+def test_migrate_stamps_new_database_and_is_idempotent(engine):
+    assert migrate(engine) == []
+    assert migrate(engine) == []
+
+    with engine.connect() as conn:
+        assert get_version(conn) == len(MIGRATIONS)
+        assert inspect(conn).get_pk_constraint("starship_film")["constrained_columns"] == ["starship_id", "film_id"]
+
+def test_migrate_adds_versions_to_row_counts(engine):
+    migrate(engine)
+    with engine.begin() as conn:
+        # Row counts as the add_row_counts migration left them
+        conn.exec_driver_sql("DROP TABLE row_counts")
+        conn.exec_driver_sql("CREATE TABLE row_counts (table_name VARCHAR PRIMARY KEY, row_count INTEGER NOT NULL)")
+        conn.exec_driver_sql("INSERT INTO row_counts VALUES ('films', 0), ('starships', 0), ('characters', 0)")
+        conn.execute(schema_version.update().values(version=MIGRATIONS.index(add_table_versions)))
+
+    assert migrate(engine)[0] == "add_table_versions"
+    with engine.begin() as conn:
+        before = conn.exec_driver_sql("SELECT version FROM row_counts WHERE table_name = 'films'").scalar()
+        conn.exec_driver_sql("INSERT INTO films (id, title) VALUES (1, 'A New Hope')")
+        conn.exec_driver_sql("UPDATE films SET title = 'Star Wars' WHERE id = 1")
+        row = conn.exec_driver_sql("SELECT row_count, version FROM row_counts WHERE table_name = 'films'").one()
+    assert row == (1, before + 2)
@@ -0,0 +1,78 @@
+import threading
+import time
+import pytest
+from app.services.response_cache import MemoryTier, ResponseCache, SQLiteTier
+
+
+def test_memory_tier_evicts_least_recently_used_and_expired_entries():
+    tier = MemoryTier(size=2)
+    tier.put("a", b"1", 60)
+    tier.put("b", b"2", 60)
+    assert tier.get("a") == b"1"
+    tier.put("c", b"3", 60)
+    assert tier.get("b") is None
+    assert tier.get("a") == b"1"
+
+    tier.put("d", b"4", -1)
+    assert tier.get("d") is None
+    assert len(tier) == 1
+
+@pytest.mark.asyncio
+async def test_versions_key_responses_by_the_tables_they_use():
+    cache = ResponseCache(ttl=60)
+    films = await cache.key("/api/v1/films/?include=", ["films"])
+    with_characters = await cache.key("/api/v1/films/", ["films", "characters"])
+    await cache.put(films, b"films")
+    await cache.put(with_characters, b"films and characters")
+
+    cache.bump("characters")
+    assert await cache.get(await cache.key("/api/v1/films/?include=", ["films"])) == b"films"
+    assert await cache.key("/api/v1/films/", ["films", "characters"]) != with_characters
+    assert await cache.get(await cache.key("/api/v1/films/", ["films", "characters"])) is None
+    assert cache.stats == {"local_hits": 1, "shared_hits": 0, "misses": 1}
+
+@pytest.mark.asyncio
+async def test_sqlite_tier_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "response-cache")
+    first, second = ResponseCache(ttl=60, shared=SQLiteTier(path)), ResponseCache(ttl=60, shared=SQLiteTier(path))
+    key = await first.key("/api/v1/starships/1", ["starships"])
+    await first.put(key, b"starship")
+
+    assert await second.get(await second.key("/api/v1/starships/1", ["starships"])) == b"starship"
+    assert second.stats["shared_hits"] == 1
+    assert await second.get(key) == b"starship"
+    assert second.stats["local_hits"] == 1
+
+    second.bump("starships")
+    assert (await first.versions())["starships"] == 1
+    assert await first.get(await first.key("/api/v1/starships/1", ["starships"])) is None
+
+@pytest.mark.asyncio
+async def test_locked_sqlite_tier_bypasses_the_cache_without_blocking(tmp_path):
+    tier = SQLiteTier(str(tmp_path / "response-cache"), timeout=0.05)
+    cache = ResponseCache(ttl=60, shared=tier)
+    locked, release = threading.Event(), threading.Event()
+
+    def hold():
+        # Like a bump waiting on a lock held by another process
+        with tier._lock:
+            locked.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    locked.wait(5)
+    try:
+        started = time.perf_counter()
+        assert await cache.key("/api/v1/films/", ["films"]) is None
+        assert tier.get("a") is None
+        assert time.perf_counter() - started < 0.4
+    finally:
+        release.set()
+        holder.join()
+
+def test_sqlite_tier_misses_when_the_file_is_unusable(tmp_path):
+    tier = SQLiteTier(str(tmp_path / "missing" / "response-cache"))
+    tier.put("a", b"1", 60)
+    assert tier.get("a") is None
+    assert tier.versions() is None
@@ -0,0 +1,79 @@
+import sqlite3
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+from app.db.session import Base, create_db_engine
+from app.fake_swapi import create_app
+from app.models import Character, Film, SyncRun, SyncState
+from app.models.character import character_film
+from app.services.shadow_sync import apply_shadow, copy_database, run_shadow_sync
+from app.services.sync_service import write_payloads
+from app.services.synthetic import SyntheticDataset
+
+pytestmark = pytest.mark.sqlite_only
+
+
+def seed(db: Session, seed: int = 0) -> SyntheticDataset:
+    dataset = SyntheticDataset(films=3, starships=5, people=20, seed=seed)
+    write_payloads(db, {resource: dataset.records(resource) for resource in dataset.counts})
+    db.commit()
+    return dataset
+
+@pytest.mark.asyncio
+async def test_shadow_sync_applies_changes_to_live_database(db: Session, serve_app, tmp_path):
+    seed(db)
+    base_url = serve_app(create_app(films=3, starships=5, people=20, seed=1))
+    shadow_path = str(tmp_path / "shadow.db")
+
+    stats = await run_shadow_sync(db, shadow_path, base_urls=[base_url])
+
+    assert stats["characters"]["updated"] == 20
+    expected = SyntheticDataset(films=3, starships=5, people=20, seed=1).record("people", 4)
+    person = db.get(Character, 4)
+    db.refresh(person)
+    assert person.name == expected["name"]
+    assert sorted(f.id for f in person.films) == [int(url.rstrip("/").split("/")[-1]) for url in expected["films"]]
+    assert db.query(SyncState).count() == 3
+    assert db.query(SyncRun).one().status == "succeeded"
+    assert not (tmp_path / "shadow.db").exists()
+
+def test_apply_shadow_keeps_rows_written_during_sync(db: Session, tmp_path):
+    seed(db)
+    shadow_path = str(tmp_path / "shadow.db")
+    copy_database(db, shadow_path)
+
+    # A row written through the API after the copy was taken
+    db.add(Film(id=99, title="Written live", episode_id=99))
+    db.commit()
+
+    apply_shadow(db, shadow_path)
+
+    assert db.get(Film, 99).title == "Written live"
+    assert db.query(Character).count() == 20
+    assert db.query(character_film).count() > 0
+
+def test_apply_shadow_only_touches_changed_rows(db: Session, tmp_path):
+    seed(db)
+    shadow_path = str(tmp_path / "shadow.db")
+    copy_database(db, shadow_path)
+    db.execute(character_film.delete().where(character_film.c.character_id == 1))
+    db.commit()
+
+    # Unchanged content hashes: the live links of character 1 are left alone
+    apply_shadow(db, shadow_path)
+    assert db.query(character_film).filter(character_film.c.character_id == 1).count() == 0
+
+def test_apply_shadow_through_serialized_writer(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'live.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db)
+    shadow_path = str(tmp_path / "shadow.db")
+    copy_database(db, shadow_path)
+    with sqlite3.connect(shadow_path) as shadow:
+        shadow.execute("UPDATE characters SET name = 'Changed', content_hash = 'changed' WHERE id = 1")
+
+    apply_shadow(db, shadow_path)
+
+    assert db.get(Character, 1).name == "Changed"
+    db.close()
+    engine.dispose()
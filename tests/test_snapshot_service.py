@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy.orm import Session
+from app.models import Film, Starship, Character, SyncState
+from app.services.snapshot_service import export_snapshot, import_snapshot
+from app.services.sync_service import upsert_films, upsert_starships, upsert_characters
+from tests.test_sync_service import make_film
+
+
+@pytest.fixture
+def synced_data(db: Session):
+    upsert_films(db, [make_film(1), make_film(2)])
+    upsert_starships(db, [{
+        "url": "https://swapi.info/api/starships/9/",
+        "name": "X-Wing",
+        "model": "T-65 X-wing",
+        "starship_class": "Starfighter",
+        "films": ["https://swapi.info/api/films/1/"],
+    }])
+    upsert_characters(db, [{
+        "url": "https://swapi.info/api/people/1/",
+        "name": "Luke Skywalker",
+        "height": "172",
+        "mass": "77",
+        "films": ["https://swapi.info/api/films/1/", "https://swapi.info/api/films/2/"],
+        "starships": ["https://swapi.info/api/starships/9/"],
+    }])
+    db.merge(SyncState(resource="films", etag='"v1"'))
+    db.commit()
+
+def clear(db: Session):
+    for model in (SyncState, Character, Starship, Film):
+        for row in db.query(model):
+            db.delete(row)
+    db.commit()
+
+def assert_restored(db: Session):
+    db.expire_all()
+    assert db.query(Film).count() == 2
+    character = db.get(Character, 1)
+    assert sorted(f.id for f in character.films) == [1, 2]
+    assert [s.id for s in character.starships] == [9]
+    assert character.content_hash
+    assert db.get(SyncState, "films").etag == '"v1"'
+
+def test_ndjson_snapshot_round_trip(db: Session, synced_data, tmp_path):
+    path = str(tmp_path / "snapshot.ndjson.gz")
+    counts = export_snapshot(db, path)
+    assert counts["films"] == 2
+    assert counts["character_film"] == 2
+
+    clear(db)
+    counts = import_snapshot(db, path)
+    assert counts["characters"] == 1
+    assert_restored(db)
+
+def test_ndjson_import_replaces_existing_data(db: Session, synced_data, tmp_path):
+    path = str(tmp_path / "snapshot.ndjson.gz")
+    export_snapshot(db, path)
+    db.add(Film(id=3, title="Not in snapshot", episode_id=9))
+    db.commit()
+
+    import_snapshot(db, path)
+    assert db.get(Film, 3) is None
+    assert_restored(db)
+
+@pytest.mark.sqlite_only
+def test_sqlite_snapshot_round_trip(db: Session, synced_data, tmp_path):
+    path = str(tmp_path / "snapshot.db")
+    export_snapshot(db, path, "sqlite")
+
+    clear(db)
+    import_snapshot(db, path)
+    assert_restored(db)
+
+def test_import_rejects_unknown_file(db: Session, tmp_path):
+    path = tmp_path / "snapshot.txt"
+    path.write_text("not a snapshot")
+    with pytest.raises(ValueError, match="Unrecognized snapshot"):
+        import_snapshot(db, str(path))
@@ -1,5 +1,6 @@
 import pytest
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import Film, Character
 from app.schemas.starship import StarshipCreate
@@ -32,87 +33,113 @@ def make_starship_data(**overrides) -> dict:
     base_data.update(overrides)
     return base_data
 
-def test_create_starship_success(db: Session, sample_films, sample_characters):
+@pytest.mark.asyncio
+async def test_create_starship_success(async_db: AsyncSession, sample_films, sample_characters):
     starship_in = StarshipCreate(**make_starship_data(
         film_ids=[f.id for f in sample_films],
         character_ids=[c.id for c in sample_characters]
     ))
-    starship = create_starship(db, starship_in)
+    starship = await create_starship(async_db, starship_in)
 
     assert starship.id is not None
     assert starship.name == "Test Starship"
     assert len(starship.films) == 2
     assert len(starship.characters) == 2
 
-def test_create_starship_film_not_found(db: Session, sample_characters):
+@pytest.mark.asyncio
+async def test_create_starship_film_not_found(async_db: AsyncSession, sample_characters):
     starship_in = StarshipCreate(**make_starship_data(
         film_ids=[999],  # Nonexistent Film
         character_ids=[c.id for c in sample_characters]
     ))
 
     with pytest.raises(HTTPException) as exc_info:
-        create_starship(db, starship_in)
+        await create_starship(async_db, starship_in)
 
     assert exc_info.value.status_code == 404
     assert "films" in exc_info.value.detail.lower()
 
-def test_create_starship_character_not_found(db: Session, sample_films):
+@pytest.mark.asyncio
+async def test_create_starship_character_not_found(async_db: AsyncSession, sample_films):
     starship_in = StarshipCreate(**make_starship_data(
         film_ids=[f.id for f in sample_films],
         character_ids=[999],  # Nonexistent Character
     ))
 
     with pytest.raises(HTTPException) as exc_info:
-        create_starship(db, starship_in)
+        await create_starship(async_db, starship_in)
 
     assert exc_info.value.status_code == 404
     assert "characters" in exc_info.value.detail.lower()
 
-def test_get_starship_success(db: Session, sample_films, sample_characters):
+@pytest.mark.asyncio
+async def test_get_starship_success(async_db: AsyncSession, sample_films, sample_characters):
     starship_in = StarshipCreate(**make_starship_data(
         film_ids=[f.id for f in sample_films],
         character_ids=[c.id for c in sample_characters]
     ))
-    created = create_starship(db, starship_in)
+    created = await create_starship(async_db, starship_in)
 
-    fetched = get_starship(db, created.id)
+    fetched = await get_starship(async_db, created.id)
 
     assert fetched.id == created.id
     assert fetched.name == "Test Starship"
 
-def test_get_starship_not_found(db: Session):
+@pytest.mark.asyncio
+async def test_get_starship_not_found(async_db: AsyncSession):
     from fastapi import HTTPException
     with pytest.raises(HTTPException) as exc_info:
-        get_starship(db, 999999)
+        await get_starship(async_db, 999999)
     assert exc_info.value.status_code == 404
 
-def test_list_starships(db: Session):
+@pytest.mark.asyncio
+async def test_list_starships(async_db: AsyncSession):
     StarshipCreate(**make_starship_data())
-    result = list_starships(db)
+    result = await list_starships(async_db)
     assert "total" in result
     assert "items" in result
     assert isinstance(result["items"], list)
 
-def test_list_starships_with_name_filter(db: Session):
+@pytest.mark.asyncio
+async def test_list_starships_with_name_filter(async_db: AsyncSession):
     # Create starships
-    create_starship(db, StarshipCreate(**make_starship_data(name="John Doe Starship")))
-    create_starship(db, StarshipCreate(**make_starship_data(name="Jane Doe Starship")))
+    await create_starship(async_db, StarshipCreate(**make_starship_data(name="John Doe Starship")))
+    await create_starship(async_db, StarshipCreate(**make_starship_data(name="Jane Doe Starship")))
 
     # Search for 'John'
-    result = list_starships(db, name="john")
+    result = await list_starships(async_db, name="john")
     assert result["total"] == 1
     assert result["items"][0].name == "John Doe Starship"
 
     # Search for 'Jane'
-    result = list_starships(db, name="jane")
+    result = await list_starships(async_db, name="jane")
     assert result["total"] == 1
     assert result["items"][0].name == "Jane Doe Starship"
 
     # Search for both 'John' and 'Jane' Doe
-    result = list_starships(db, name="doe")
+    result = await list_starships(async_db, name="doe")
     assert result["total"] == 2
 
     # Search for something nonexistent
-    result = list_starships(db, name="Noone")
+    result = await list_starships(async_db, name="Noone")
     assert result["total"] == 0
     assert result["items"] == []
+
+@pytest.mark.asyncio
+async def test_list_starships_cursor_pages_are_not_shifted_by_inserts(async_db: AsyncSession):
+    for name in ("X-wing", "Y-wing", "A-wing"):
+        await create_starship(async_db, StarshipCreate(**make_starship_data(name=name)))
+
+    first = await list_starships(async_db, limit=2)
+    assert [s.name for s in first["items"]] == ["X-wing", "Y-wing"]
+    # An insert between pages does not repeat or skip rows, unlike skip=2 after it
+    await create_starship(async_db, StarshipCreate(**make_starship_data(name="B-wing")))
+    second = await list_starships(async_db, limit=2, cursor=first["next_cursor"])
+    assert [s.name for s in second["items"]] == ["A-wing", "B-wing"]
+    assert second["next_cursor"] is None
+
+@pytest.mark.asyncio
+async def test_list_starships_rejects_invalid_cursor(async_db: AsyncSession):
+    with pytest.raises(HTTPException) as exc:
+        await list_starships(async_db, cursor="not-a-cursor")
+    assert exc.value.status_code == 400
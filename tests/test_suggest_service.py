@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from datetime import datetime
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import Character, Film, Starship, SyncRun
+from app.services.suggest_service import SuggestIndex
+
+
+def make_index(rows) -> SuggestIndex:
+    index = SuggestIndex()
+    index.build(rows)
+    return index
+
+def test_suggest_matches_the_start_of_any_word():
+    index = make_index([
+        ("character", 1, "Luke Skywalker"),
+        ("character", 2, "Anakin Skywalker"),
+        ("starship", 3, "Sentinel-class landing craft"),
+        ("film", 1, "A New Hope"),
+    ])
+
+    assert [s["id"] for s in index.suggest("sky")] == [1, 2]
+    assert index.suggest("LUKE sk") == [{"type": "character", "id": 1, "name": "Luke Skywalker"}]
+    assert index.suggest("class land") == [{"type": "starship", "id": 3, "name": "Sentinel-class landing craft"}]
+    assert index.suggest("hope")[0]["type"] == "film"
+    assert index.suggest("walker") == []
+    assert index.suggest("  ") == []
+
+def test_suggest_returns_each_entry_once_up_to_the_limit():
+    index = make_index([("character", i, f"Clone Trooper Clone {i}") for i in range(1, 21)])
+
+    suggestions = index.suggest("clone", limit=5)
+    assert len(suggestions) == 5
+    assert len({s["id"] for s in suggestions}) == 5
+
+def test_add_inserts_and_renames_entries():
+    index = make_index([("character", 1, "Luke Skywalker"), ("character", 3, "Anakin Skywalker")])
+
+    index.add("character", 2, "Leia Organa")
+    index.add("character", 1, "Biggs Darklighter")
+    index.add("character", 3, None)
+
+    assert index.suggest("luke") == []
+    assert index.suggest("sky") == []
+    assert index.suggest("le")[0]["id"] == 2
+    assert index.suggest("dark") == [{"type": "character", "id": 1, "name": "Biggs Darklighter"}]
+    assert len(index) == 2
+
+@pytest.mark.asyncio
+async def test_refresh_follows_creates_and_syncs(db: Session, async_db: AsyncSession):
+    async def session_provider():
+        yield async_db
+
+    index = SuggestIndex(session_provider)
+    db.add_all([Film(id=1, title="A New Hope"), Starship(id=1, name="Death Star"), Character(id=1, name="Luke")])
+    db.commit()
+    assert await index.refresh()
+    assert len(index) == 3
+    assert not await index.refresh()
+
+    # Rows created elsewhere are added
+    db.add(Character(id=2, name="Leia"))
+    db.commit()
+    assert await index.refresh()
+    assert index.suggest("leia")[0]["id"] == 2
+
+    # A sync may rename existing rows, so the index is rebuilt
+    db.get(Character, 1).name = "Biggs"
+    db.add(SyncRun(started_at=datetime(2025, 1, 1), status="succeeded"))
+    db.commit()
+    assert await index.refresh()
+    assert index.suggest("luke") == []
+    assert index.suggest("biggs")[0]["id"] == 1
+
+@pytest.mark.asyncio
+async def test_entries_added_during_a_rebuild_are_kept(db: Session, async_db: AsyncSession):
+    async def session_provider():
+        yield async_db
+
+    index = SuggestIndex(session_provider)
+    db.add(Character(id=1, name="Luke"))
+    db.commit()
+
+    building, release = threading.Event(), threading.Event()
+    built = index._built
+
+    def slow_built(rows):
+        building.set()
+        release.wait(5)
+        return built(rows)
+
+    index._built = slow_built
+    refresh = asyncio.create_task(index.refresh())
+    await asyncio.to_thread(building.wait, 5)
+    # A create on the serving worker while the rebuild runs
+    index.add("character", 2, "Leia")
+    assert index.suggest("leia")[0]["id"] == 2
+    release.set()
+    await refresh
+
+    assert index.suggest("leia")[0]["id"] == 2
+    assert index.suggest("luke")[0]["id"] == 1
+    assert len(index) == 2
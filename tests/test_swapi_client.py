@@ -1,65 +1,175 @@
+import asyncio
+import time
+import httpx
 import pytest
-from httpx import Response, Request, HTTPStatusError
+from httpx import Response, HTTPStatusError
 from app.services import swapi_client
 
 
+def mock_client(handler) -> httpx.AsyncClient:
+    # Build a client whose requests are answered in-process by `handler`
+    return swapi_client.create_client(transport=httpx.MockTransport(handler))
+
 @pytest.mark.asyncio
-async def test_fetch_all_success(monkeypatch):
+async def test_fetch_all_success():
     # Simulate a successful HTTP response returning a list of characters
-    class MockResponse:
-        def raise_for_status(self):
-            # Simulate no HTTP error (status is 200)
-            pass
-        def json(self):
-            # Return a valid list (the expected format)
-            return [{"name": "Luke Skywalker"}]
-
-    # Simulate an httpx.AsyncClient instance
-    class MockClient:
-        async def __aenter__(self):
-            return self  # So it works with `async with`
-        async def __aexit__(self, *args):
-            pass
-        async def get(self, url):
-            return MockResponse()  # Return the mock response above
-
-    # Replace `httpx.AsyncClient` inside the `swapi_client` module with our mock
-    monkeypatch.setattr(swapi_client.httpx, "AsyncClient", lambda: MockClient())
-
-    # Call the function under test
-    data = await swapi_client.fetch_all("people")
+    def handler(request):
+        return Response(200, json=[{"name": "Luke Skywalker"}])
+
+    # Call the function under test with the mock standing in for the shared client
+    async with mock_client(handler) as client:
+        data = await swapi_client.fetch_all("people", client)
 
     assert isinstance(data, list)
     assert data[0]["name"] == "Luke Skywalker"
 
 @pytest.mark.asyncio
-async def test_fetch_all_raises_for_status(monkeypatch):
-    class MockResponse:
-        def raise_for_status(self): raise HTTPStatusError("error", request=Request("GET", "url"), response=Response(400))
-        def json(self): return []
+async def test_fetch_all_raises_for_status():
+    async with mock_client(lambda request: Response(400, json=[])) as client:
+        with pytest.raises(HTTPStatusError):
+            await swapi_client.fetch_all("films", client)
+
+@pytest.mark.asyncio
+async def test_fetch_all_returns_non_list():
+    async with mock_client(lambda request: Response(200, json={"message": "Not a list"})) as client:
+        with pytest.raises(ValueError, match="Expected a list from SWAPI"):
+            await swapi_client.fetch_all("people", client)
+
+@pytest.mark.asyncio
+async def test_fetch_conditional_not_modified():
+    def handler(request):
+        if request.headers.get("if-none-match") == '"v1"':
+            return Response(304)
+        return Response(200, json=[{"name": "Luke Skywalker"}], headers={"ETag": '"v1"'})
+
+    async with mock_client(handler) as client:
+        data, validators = await swapi_client.fetch_conditional("people", client)
+        assert data == [{"name": "Luke Skywalker"}]
+        assert validators["etag"] == '"v1"'
+
+        data, validators = await swapi_client.fetch_conditional("people", client, etag='"v1"')
+        assert data is None
+        assert validators["etag"] == '"v1"'
+
+@pytest.mark.asyncio
+async def test_fetch_all_reuses_shared_client(serve_app):
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
 
-    class MockClient:
-        async def __aenter__(self): return self
-        async def __aexit__(self, *args): pass
-        async def get(self, url): return MockResponse()
+    async def resource(request):
+        return JSONResponse([{"name": request.path_params["name"]}])
 
-    monkeypatch.setattr(swapi_client.httpx, "AsyncClient", lambda: MockClient())
+    base_url = serve_app(Starlette(routes=[Route("/api/{name}", resource)]))
 
-    with pytest.raises(HTTPStatusError):
-        await swapi_client.fetch_all("films")
+    async with swapi_client.create_client(max_connections=1) as client:
+        films = await swapi_client.fetch_films(client, base_url)
+        people = await swapi_client.fetch_characters(client, base_url)
+
+    assert films == [{"name": "films"}]
+    assert people == [{"name": "people"}]
 
 @pytest.mark.asyncio
-async def test_fetch_all_returns_non_list(monkeypatch):
-    class MockResponse:
-        def raise_for_status(self): pass
-        def json(self): return {"message": "Not a list"}
+async def test_scheduler_retries_throttled_requests():
+    statuses = iter([429, 503])
+
+    def handler(request):
+        status = next(statuses, 200)
+        if status == 429:
+            return Response(429, headers={"Retry-After": "0"})
+        return Response(status, json=[{"name": "Luke Skywalker"}])
 
-    class MockClient:
-        async def __aenter__(self): return self
-        async def __aexit__(self, *args): pass
-        async def get(self, url): return MockResponse()
+    scheduler = swapi_client.FetchScheduler(["https://mirror.test/api"], backoff_base=0.01)
+    async with mock_client(handler) as client:
+        data = await swapi_client.fetch_all("people", client, scheduler=scheduler)
 
-    monkeypatch.setattr(swapi_client.httpx, "AsyncClient", lambda: MockClient())
+    assert data == [{"name": "Luke Skywalker"}]
+    assert [(t.attempt, t.status) for t in scheduler.timings] == [(0, 429), (1, 503), (2, 200)]
+    assert all(t.total is not None for t in scheduler.timings)
+
+@pytest.mark.asyncio
+async def test_scheduler_gives_up_after_max_retries():
+    scheduler = swapi_client.FetchScheduler(["https://mirror.test/api"], max_retries=2, backoff_base=0.01)
+    async with mock_client(lambda request: Response(500)) as client:
+        with pytest.raises(HTTPStatusError):
+            await swapi_client.fetch_all("films", client, scheduler=scheduler)
+    assert len(scheduler.timings) == 3
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_transport_errors_on_next_mirror():
+    def handler(request):
+        if request.url.host == "down.test":
+            raise httpx.ConnectError("connection refused")
+        return Response(200, json=[])
 
-    with pytest.raises(ValueError, match="Expected a list from SWAPI"):
-        await swapi_client.fetch_all("people")
+    scheduler = swapi_client.FetchScheduler(["https://down.test/api", "https://up.test/api"], backoff_base=0.01)
+    async with mock_client(handler) as client:
+        assert await swapi_client.fetch_all("films", client, scheduler=scheduler) == []
+    assert scheduler.timings[0].error is not None
+    assert scheduler.timings[1].url == "https://up.test/api/films"
+
+@pytest.mark.asyncio
+async def test_scheduler_hedges_slow_requests_to_mirrors():
+    async def handler(request):
+        if request.url.host == "slow.test":
+            await asyncio.sleep(5)
+        return Response(200, json=[{"mirror": request.url.host}])
+
+    scheduler = swapi_client.FetchScheduler(["https://slow.test/api", "https://fast.test/api"], hedge_delay=0.05)
+    async with mock_client(handler) as client:
+        started = time.perf_counter()
+        data = await swapi_client.fetch_all("films", client, scheduler=scheduler)
+
+    assert time.perf_counter() - started < 1
+    assert data == [{"mirror": "fast.test"}]
+    assert [(t.url, t.hedged) for t in scheduler.timings] == [
+        ("https://slow.test/api/films", False),
+        ("https://fast.test/api/films", True),
+    ]
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_concurrency_per_host():
+    in_flight, peak = 0, 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return Response(200, json=[])
+
+    scheduler = swapi_client.FetchScheduler(["https://mirror.test/api"], max_per_host=2)
+    async with mock_client(handler) as client:
+        await asyncio.gather(*(swapi_client.fetch_all("films", client, scheduler=scheduler) for _ in range(6)))
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_fetch_all_fetches_pages_concurrently_in_order():
+    people = [{"name": f"Person {i}"} for i in range(1, 11)]
+    page_delays = {1: 0, 2: 0.3, 3: 0.2, 4: 0.1}
+    requested = []
+
+    async def handler(request):
+        page = int(request.url.params.get("page", 1))
+        requested.append(page)
+        await asyncio.sleep(page_delays[page])
+        next_url = f"https://mirror.test/api/people/?page={page + 1}&format=json" if page < 4 else None
+        assert page == 1 or request.url.params["format"] == "json"
+        return Response(200, json={"count": len(people), "next": next_url,
+                                   "results": people[(page - 1) * 3:page * 3]})
+
+    scheduler = swapi_client.FetchScheduler(["https://mirror.test/api"])
+    async with mock_client(handler) as client:
+        started = time.perf_counter()
+        data = await swapi_client.fetch_all("people", client, scheduler=scheduler)
+
+    assert data == people
+    assert sorted(requested) == [1, 2, 3, 4]
+    assert time.perf_counter() - started < 0.5
+
+@pytest.mark.asyncio
+async def test_fetch_all_single_page():
+    page = {"count": 1, "next": None, "results": [{"name": "Luke Skywalker"}]}
+    async with mock_client(lambda request: Response(200, json=page)) as client:
+        assert await swapi_client.fetch_all("people", client) == [{"name": "Luke Skywalker"}]
@@ -0,0 +1,64 @@
+import json
+import pytest
+from sqlalchemy.orm import Session
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from app.fake_swapi import create_app
+from app.models import SyncRun
+from app.services.sync_metrics import SyncMetrics
+from app.services.sync_service import run_sync, upsert_characters, upsert_films
+from app.services.synthetic import SyntheticDataset
+
+
+def test_upsert_records_upsert_and_link_phases(db: Session):
+    dataset = SyntheticDataset(films=3, starships=0, people=1)
+    person = dataset.record("people", 1)
+    metrics = SyncMetrics()
+    metrics.start(db.get_bind())
+    upsert_films(db, dataset.records("films"), metrics=metrics)
+    upsert_characters(db, [person], metrics=metrics)
+    metrics.stop()
+
+    data = metrics.to_dict()
+    assert data["resources"]["films"]["upsert"]["rows"] == 3
+    assert data["resources"]["characters"]["links"]["rows"] == len(person["films"])
+    assert data["resources"]["characters"]["upsert"]["statements"] >= 1
+    assert data["statements"] >= sum(
+        phase["statements"] for phases in data["resources"].values() for phase in phases.values()
+    )
+    json.dumps(data)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page_size", [None, 7])
+async def test_run_sync_records_metrics_in_sync_runs(db: Session, serve_app, page_size):
+    base_url = serve_app(create_app(films=3, starships=5, people=20, page_size=page_size))
+    metrics = SyncMetrics(trace_memory=True)
+    await run_sync(db, base_urls=[base_url], metrics=metrics)
+
+    data = metrics.to_dict()
+    people = data["resources"]["characters"]
+    assert set(people) == {"fetch", "parse", "upsert", "links"}
+    assert people["fetch"]["rows"] == people["parse"]["rows"] == 20
+    assert people["fetch"]["bytes"] > 0
+    assert data["bytes_downloaded"] == sum(r["fetch"]["bytes"] for r in data["resources"].values())
+    assert data["peak_memory_bytes"] > 0
+    assert data["results"]["characters"]["inserted"] == 20
+
+    run = db.query(SyncRun).one()
+    assert run.status == "succeeded"
+    assert run.statements == data["statements"]
+    assert run.metrics["resources"]["characters"]["upsert"]["rows"] == 20
+
+@pytest.mark.asyncio
+async def test_run_sync_records_failed_runs(db: Session, serve_app):
+    async def resource(request):
+        return JSONResponse({"detail": "gone"}, status_code=404)
+
+    base_url = serve_app(Starlette(routes=[Route("/api/{name}", resource)]))
+    with pytest.raises(Exception):
+        await run_sync(db, base_urls=[base_url])
+
+    run = db.query(SyncRun).one()
+    assert run.status == "failed"
+    assert "404" in run.error
@@ -0,0 +1,47 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services.sync_scheduler import SyncScheduler
+
+
+def make_scheduler(tmp_path, job, interval: float = 60) -> SyncScheduler:
+    return SyncScheduler(interval, str(tmp_path / "sync.lock"), job, ThreadPoolExecutor(max_workers=1))
+
+@pytest.mark.asyncio
+async def test_only_the_leader_runs_the_job(tmp_path):
+    runs = []
+    leader = make_scheduler(tmp_path, lambda: runs.append("leader"))
+    follower = make_scheduler(tmp_path, lambda: runs.append("follower"))
+
+    assert await leader.run_once()
+    assert not await follower.run_once()
+    assert leader.status()["is_leader"] and not follower.status()["is_leader"]
+
+    # The lock passes to another worker once the leader stops
+    await leader.stop()
+    assert await follower.run_once()
+    await follower.stop()
+    assert runs == ["leader", "follower"]
+
+@pytest.mark.asyncio
+async def test_failed_job_is_reported_and_retried(tmp_path):
+    def job():
+        raise RuntimeError("upstream down")
+
+    scheduler = make_scheduler(tmp_path, job)
+    assert await scheduler.run_once()
+    assert "upstream down" in scheduler.status()["last_error"]
+    assert scheduler.status()["last_finished"] is not None
+    await scheduler.stop()
+
+@pytest.mark.asyncio
+async def test_loop_runs_job_periodically(tmp_path):
+    runs = []
+    scheduler = make_scheduler(tmp_path, lambda: runs.append(1), interval=0.01)
+    scheduler.start()
+    for _ in range(200):
+        if len(runs) >= 2:
+            break
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+    assert len(runs) >= 2
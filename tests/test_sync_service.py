@@ -0,0 +1,186 @@
+import asyncio
+import time
+import pytest
+from sqlalchemy.orm import Session
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from app.models import Film, Starship, Character, SyncState
+from app.services.sync_service import (
+    bulk_upsert, extract_id_from_url, reset_id_sequences, run_sync, upsert_characters, upsert_films
+)
+
+
+def make_film(film_id: int, **overrides) -> dict:
+    base_data = {
+        "url": f"https://swapi.info/api/films/{film_id}/",
+        "title": f"Film {film_id}",
+        "episode_id": film_id,
+        "opening_crawl": "...",
+        "producer": "Gary Kurtz",
+        "director": "George Lucas",
+        "release_date": "1977-05-25",
+    }
+    base_data.update(overrides)
+    return base_data
+
+def test_extract_id_from_url():
+    assert extract_id_from_url("https://swapi.info/api/films/1/") == 1
+    assert extract_id_from_url("https://swapi.info/api/people/42") == 42
+
+def test_upsert_films_reports_inserted_updated_unchanged(db: Session):
+    stats = upsert_films(db, [make_film(1), make_film(2)])
+    db.commit()
+    assert stats == {"inserted": 2, "updated": 0, "unchanged": 0}
+
+    stats = upsert_films(db, [make_film(1), make_film(2, title="Renamed"), make_film(3)])
+    db.commit()
+    assert stats == {"inserted": 1, "updated": 1, "unchanged": 1}
+
+    db.expire_all()
+    assert db.query(Film).count() == 3
+    assert db.get(Film, 2).title == "Renamed"
+
+def test_bulk_upsert_spans_multiple_batches(db: Session):
+    rows = [{"id": i, "name": f"Ship {i}", "model": None, "starship_class": None} for i in range(1, 26)]
+    stats = bulk_upsert(db, Starship, rows, batch_size=10)
+    db.commit()
+    assert stats["inserted"] == 25
+    assert db.query(Starship).count() == 25
+
+def test_bulk_upsert_collapses_duplicate_ids(db: Session):
+    rows = [
+        {"id": 1, "name": "First", "height": None, "mass": None},
+        {"id": 1, "name": "Second", "height": None, "mass": None},
+    ]
+    stats = bulk_upsert(db, Character, rows)
+    db.commit()
+    assert stats["inserted"] == 1
+    assert db.get(Character, 1).name == "Second"
+
+def test_upsert_characters_ignores_unknown_relations(db: Session):
+    upsert_films(db, [make_film(1)])
+    stats = upsert_characters(db, [{
+        "url": "https://swapi.info/api/people/1/",
+        "name": "Luke Skywalker",
+        "height": "172",
+        "mass": "77",
+        "films": ["https://swapi.info/api/films/1/", "https://swapi.info/api/films/99/"],
+        "starships": ["https://swapi.info/api/starships/12/"],
+    }])
+    db.commit()
+
+    character = db.get(Character, 1)
+    assert stats["inserted"] == 1
+    assert [f.id for f in character.films] == [1]
+    assert character.starships == []
+
+def test_sync_links_applies_only_the_diff(db: Session):
+    upsert_films(db, [make_film(1), make_film(2), make_film(3)])
+    character = {
+        "url": "https://swapi.info/api/people/1/",
+        "name": "Luke Skywalker",
+        "height": "172",
+        "mass": "77",
+        "films": ["https://swapi.info/api/films/1/", "https://swapi.info/api/films/2/"],
+        "starships": [],
+    }
+    stats = upsert_characters(db, [character])
+    db.commit()
+    assert stats["links_inserted"] == 2
+
+    character["films"] = ["https://swapi.info/api/films/2/", "https://swapi.info/api/films/3/"]
+    stats = upsert_characters(db, [character])
+    db.commit()
+    assert stats["links_inserted"] == 1
+    assert stats["links_deleted"] == 1
+
+    stats = upsert_characters(db, [character])
+    assert stats["links_inserted"] == 0
+    assert stats["links_deleted"] == 0
+    assert sorted(f.id for f in db.get(Character, 1).films) == [2, 3]
+
+@pytest.mark.asyncio
+async def test_run_sync_fetches_concurrently_and_writes_in_order(db: Session, serve_app):
+    delay = 0.5
+    payloads = {
+        "films": [make_film(1)],
+        "starships": [{
+            "url": "https://swapi.info/api/starships/9/",
+            "name": "X-Wing",
+            "model": "T-65 X-wing",
+            "starship_class": "Starfighter",
+            "films": ["https://swapi.info/api/films/1/"],
+        }],
+        "people": [{
+            "url": "https://swapi.info/api/people/1/",
+            "name": "Luke Skywalker",
+            "height": "172",
+            "mass": "77",
+            "films": ["https://swapi.info/api/films/1/"],
+            "starships": ["https://swapi.info/api/starships/9/"],
+        }],
+    }
+
+    async def resource(request):
+        await asyncio.sleep(delay)
+        return JSONResponse(payloads[request.path_params["name"]])
+
+    base_url = serve_app(Starlette(routes=[Route("/api/{name}", resource)]))
+
+    started = time.perf_counter()
+    stats = await run_sync(db, base_urls=[base_url], max_connections=3)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 2 * delay
+    assert list(stats) == ["films", "starships", "characters"]
+    assert stats["characters"]["inserted"] == 1
+    character = db.get(Character, 1)
+    assert [f.id for f in character.films] == [1]
+    assert [s.id for s in character.starships] == [9]
+
+def test_upsert_skips_rows_with_matching_content_hash(db: Session):
+    upsert_films(db, [make_film(1)])
+    db.commit()
+    stored_hash = db.get(Film, 1).content_hash
+    assert stored_hash
+
+    assert upsert_films(db, [make_film(1)])["unchanged"] == 1
+    assert upsert_films(db, [make_film(1, director="Irvin Kershner")])["updated"] == 1
+    db.commit()
+    db.expire_all()
+    assert db.get(Film, 1).content_hash != stored_hash
+
+@pytest.mark.asyncio
+async def test_run_sync_skips_resources_not_modified(db: Session, serve_app):
+    requests = []
+
+    async def resource(request):
+        requests.append(request.headers.get("if-none-match"))
+        etag = f'"{request.path_params["name"]}-v1"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304)
+        payload = [make_film(1)] if request.path_params["name"] == "films" else []
+        return JSONResponse(payload, headers={"ETag": etag})
+
+    base_url = serve_app(Starlette(routes=[Route("/api/{name}", resource)]))
+
+    stats = await run_sync(db, base_urls=[base_url])
+    assert stats["films"]["inserted"] == 1
+    assert db.get(SyncState, "films").etag == '"films-v1"'
+
+    stats = await run_sync(db, base_urls=[base_url])
+    assert stats == {name: {"not_modified": True} for name in ("films", "starships", "characters")}
+    assert sorted(requests[-3:]) == ['"films-v1"', '"people-v1"', '"starships-v1"']
+
+    stats = await run_sync(db, base_urls=[base_url], full=True)
+    assert stats["films"]["unchanged"] == 1
+
+def test_rows_created_after_sync_get_fresh_ids(db: Session, client):
+    upsert_films(db, [make_film(1), make_film(7)])
+    reset_id_sequences(db)
+    db.commit()
+
+    response = client.post("/api/v1/films/", json={"title": "New", "episode_id": 99})
+    assert response.status_code == 201
+    assert response.json()["id"] == 8